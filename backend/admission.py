@@ -0,0 +1,217 @@
+"""
+Admission control for summary work
+A request's cost is estimated from its page count, file size and algorithms before any heavy
+work starts. Each worker runs at most a budget of cost and a few requests per algorithm at once;
+the rest wait briefly in a small queue or are turned away with a retry hint, so request threads
+stay free for /health and for cheap (cached) requests
+"""
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# work per page on top of extracting it (one unit), measured with benchmarks.run at 100 pages
+ALGORITHM_WEIGHTS = {'frequency': 0.2, 'tfidf': 0.25, 'textrank': 0.6, 'llm': 0.1}
+BYTES_PER_UNIT = 1024 * 1024 # parsing cost that grows with the file rather than its text
+
+
+class OverloadedError(Exception):
+    """Raised when a request is not admitted; ``retry_after`` is a hint in whole seconds."""
+
+    def __init__(self, message, retry_after, reason):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+def estimate_cost(algorithms, pages, size_bytes):
+    """
+    Work units of summarizing ``pages`` pages of a ``size_bytes`` PDF with each of
+    ``algorithms`` (text is extracted once): about one unit per page extracted.
+    """
+    per_page = 1.0 + sum(ALGORITHM_WEIGHTS.get(algorithm, 1.0) for algorithm in algorithms)
+    return round(max(1, pages) * per_page + size_bytes / BYTES_PER_UNIT, 2)
+
+
+class AdmissionController:
+    """
+    Admits work while the running cost stays within ``budget``, at most ``max_active`` requests
+    run, and each algorithm stays under its entry in ``limits`` (absent or 0: no limit).
+
+    A request that does not fit waits up to ``queue_timeout`` seconds if fewer than
+    ``max_queued`` are already waiting, and is rejected with ``OverloadedError`` otherwise.
+    Background work (``wait=True``) waits as long as it takes and does not use the queue, which
+    bounds the request threads held by waiting; it runs in at most ``max_background`` of the
+    ``max_active`` slots (default: all but one, kept for requests). A request costing more than
+    the whole budget is admitted once nothing else runs, and then fills it. ``metrics``, when
+    given, receives the queue depth, the running cost, waits and rejections.
+    """
+
+    def __init__(self, budget=1000.0, max_active=2, limits=None, max_queued=1, queue_timeout=2.0,
+                 retry_after=5, metrics=None, max_background=None):
+        if budget <= 0 or max_active < 1:
+            raise ValueError("budget must be positive and max_active at least 1")
+        self.budget = budget
+        self.max_active = max_active
+        if max_background is None:
+            max_background = max_active - 1
+        self.max_background = max(1, min(max_active, max_background))
+        self.limits = {algorithm: limit for algorithm, limit in (limits or {}).items() if limit > 0}
+        self.max_queued = max(0, max_queued)
+        self.queue_timeout = max(0.0, queue_timeout)
+        self.retry_after = max(1, retry_after)
+        self.metrics = metrics
+        self._condition = threading.Condition()
+        self._running_cost = 0.0
+        self._active = 0
+        self._active_background = 0
+        self._by_algorithm = {}
+        self._queued = 0
+        self._background = 0
+        self._admitted = 0
+        self._rejected = {'queue_full': 0, 'timeout': 0}
+        self._seconds_per_unit = None # moving average over finished requests
+
+    def _fits(self, algorithms, cost, background=False):
+        if background and self._active_background >= self.max_background:
+            return False
+        if self._active == 0:
+            return True
+        if self._active >= self.max_active or self._running_cost + cost > self.budget:
+            return False
+        return all(
+            self._by_algorithm.get(algorithm, 0) < self.limits[algorithm]
+            for algorithm in algorithms if algorithm in self.limits
+        )
+
+    def _retry_hint(self):
+        if self._seconds_per_unit is None:
+            return self.retry_after
+        # about the time the work already running needs to finish
+        seconds = self._seconds_per_unit * min(self._running_cost, self.budget)
+        return max(1, min(60, math.ceil(seconds)))
+
+    def _reject(self, algorithms, reason):
+        with self._condition:
+            self._rejected[reason] += 1
+            retry_after = self._retry_hint()
+        label = '+'.join(algorithms)
+        logger.warning(f"Rejected a {label} request ({reason}); retry in {retry_after}s")
+        if self.metrics is not None:
+            self.metrics.inc('admission_rejections_total', algorithm=label, reason=reason)
+        return OverloadedError('Server is busy; retry shortly.', retry_after, reason)
+
+    def _take(self, algorithms, cost, background=False):
+        # called with the lock held
+        held = min(cost, self.budget) # an oversized request runs alone and fills the budget
+        self._running_cost += held
+        self._active += 1
+        self._active_background += background
+        for algorithm in algorithms:
+            self._by_algorithm[algorithm] = self._by_algorithm.get(algorithm, 0) + 1
+        self._admitted += 1
+        return {'algorithms': algorithms, 'cost': cost, 'held': held, 'background': background}
+
+    def _wait(self, algorithms, cost, deadline, background=False):
+        """Ticket once the work fits, or None at the deadline (None: no deadline)."""
+        with self._condition:
+            while not self._fits(algorithms, cost, background):
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            return self._take(algorithms, cost, background)
+
+    def acquire(self, algorithms, cost, wait=False):
+        """
+        Admit work of ``cost`` units with ``algorithms``; returns the ticket to ``release``
+        Raises OverloadedError when it cannot run now and (unless ``wait``) the queue is full or
+        it has waited ``queue_timeout`` seconds.
+        """
+        algorithms = list(algorithms)
+        started = time.perf_counter()
+        with self._condition:
+            if self._fits(algorithms, cost, wait):
+                ticket = self._take(algorithms, cost, wait)
+            elif not wait and self._queued >= self.max_queued:
+                ticket = None
+            else:
+                ticket = False # joins the queue
+                if wait:
+                    self._background += 1
+                else:
+                    self._queued += 1
+        if ticket is None:
+            raise self._reject(algorithms, 'queue_full')
+        if ticket is False:
+            if not wait and self.metrics is not None:
+                self.metrics.gauge_add('admission_queue_depth', 1)
+            deadline = None if wait else started + self.queue_timeout
+            try:
+                ticket = self._wait(algorithms, cost, deadline, wait)
+            finally:
+                with self._condition:
+                    if wait:
+                        self._background -= 1
+                    else:
+                        self._queued -= 1
+                if not wait and self.metrics is not None:
+                    self.metrics.gauge_add('admission_queue_depth', -1)
+            if ticket is None:
+                raise self._reject(algorithms, 'timeout')
+            if self.metrics is not None:
+                self.metrics.observe('admission_wait_seconds', time.perf_counter() - started)
+        if self.metrics is not None:
+            self.metrics.gauge_add('admission_running_cost', ticket['held'])
+        ticket['admitted_at'] = time.perf_counter()
+        return ticket
+
+    def release(self, ticket):
+        """Return a ticket's share of the budget and wake the requests waiting for it (once)."""
+        elapsed = time.perf_counter() - ticket['admitted_at']
+        with self._condition:
+            if ticket.get('released'):
+                return
+            ticket['released'] = True
+            self._running_cost = max(0.0, self._running_cost - ticket['held'])
+            self._active -= 1
+            self._active_background -= ticket['background']
+            for algorithm in ticket['algorithms']:
+                self._by_algorithm[algorithm] -= 1
+            if ticket['cost'] > 0:
+                rate = elapsed / ticket['cost']
+                previous = self._seconds_per_unit
+                self._seconds_per_unit = rate if previous is None else 0.8 * previous + 0.2 * rate
+            self._condition.notify_all()
+        if self.metrics is not None:
+            self.metrics.gauge_add('admission_running_cost', -ticket['held'])
+
+    @contextmanager
+    def admit(self, algorithms, cost, wait=False):
+        """``acquire`` for the enclosed block."""
+        ticket = self.acquire(algorithms, cost, wait)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                'running': self._active,
+                'running_cost': round(self._running_cost, 2),
+                'budget': self.budget,
+                'max_active': self.max_active,
+                'running_background': self._active_background,
+                'max_background': self.max_background,
+                'by_algorithm': {k: v for k, v in self._by_algorithm.items() if v},
+                'limits': dict(self.limits),
+                'queued': self._queued,
+                'max_queued': self.max_queued,
+                'waiting_background': self._background,
+                'admitted': self._admitted,
+                'rejected': dict(self._rejected),
+            }
@@ -1,113 +1,280 @@
 """
 Advanced summarization algorithms for better PDF summaries
 This module implements TF-IDF and TextRank algorithms alongside the basic frequency method
+NLTK, SciPy and the Gemini client are imported on first use (together they take seconds to
+import); call AdvSummarizer.warm_up() to load them ahead of the first request
 """
 import os
 import logging
 import re
+import threading
+import time
+from functools import cached_property
 from dotenv import load_dotenv
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.probability import FreqDist
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import google.generativeai as genai
 import numpy as np
-from collections import Counter
+
+from cleaning import TextCleaner
+from config import env_number
+from document import PreprocessedDocument
+from frequency import rank_sentences, term_frequencies
+from idf_store import IdfStore
+from llm import CHARS_PER_TOKEN, estimate_tokens, map_reduce
+from metrics import stage, timed_iter
+from textrank import TextRank
+from tfidf import tfidf_matrix
+from tokenization import get_tokenizer
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+LLM_FAILURE_PREFIX = "Failed to generate summary"
+MAX_CARRY_CHARS = 10_000
+_SENTENCE_END = re.compile(r'[.!?]["\')\]]*$')
+
+
+WARM_UP_TEXT = (
+    "Solar panels convert sunlight into electricity. Wind turbines turn moving air into power. "
+    "Batteries store renewable electricity for later use. Grid operators balance supply and demand."
+)
+
+
+
+def _llm_stats(mode, chunks=()):
+    return {'mode': mode, 'chunks': list(chunks), 'failed_chunks': 0, 'timings': {}}
+
 
 class AdvSummarizer:
     def __init__(self):
         try:
-            self.stop_words = set(stopwords.words('english'))
+            self.textrank = TextRank(
+                damping=env_number("TEXTRANK_DAMPING", 0.5),
+                tolerance=env_number("TEXTRANK_TOLERANCE", 1e-4),
+                max_iter=env_number("TEXTRANK_MAX_ITER", 50, int),
+                threshold=env_number("TEXTRANK_SIMILARITY_THRESHOLD", 0.0),
+                large_size=env_number("TEXTRANK_LARGE_SIZE", 2000, int),
+                large_threshold=env_number("TEXTRANK_LARGE_THRESHOLD", 0.1),
+                large_max_neighbors=env_number("TEXTRANK_MAX_NEIGHBORS", 50, int),
+                approximate_size=env_number("TEXTRANK_APPROXIMATE_SIZE", 20000, int) or None,
+                lsh_permutations=env_number("TEXTRANK_LSH_PERMUTATIONS", 4, int),
+                lsh_block=env_number("TEXTRANK_LSH_BLOCK", 512, int),
+            )
+        except ValueError as e:
+            logger.warning(f"Invalid TextRank settings ({e}); using defaults")
+            self.textrank = TextRank()
+
+        # Gemini is configured once, on the first LLM request
+        self.google_api_key = os.getenv("GOOGLE_API_KEY")
+        self._model = None
+        self._model_ready = False
+        self._model_lock = threading.Lock()
+
+        # Documents longer than one prompt are summarized chunk by chunk, then reduced
+        self.llm_chunk_chars = max(1000, env_number("LLM_CHUNK_CHARS", 3_000_000, int))
+        self.llm_max_concurrency = max(1, env_number("LLM_MAX_CONCURRENCY", 4, int))
+        self.llm_token_budget = max(1, env_number("LLM_TOKEN_BUDGET", 8000, int))
+
+        # One-pass artifact removal; header/footer stripping and hyphenation fixes are opt-in
+        self.cleaner = TextCleaner.from_env()
+
+        # Punkt/Treebank by default; TOKENIZER=regex trades some accuracy for a faster split
+        self.tokenizer = get_tokenizer()
+
+        # Corpus-wide IDF for TF-IDF scoring, learned from every document summarized here
+        self.idf_store = IdfStore.from_env()
+        self.idf_learn = os.getenv("IDF_LEARN", "True").lower() == "true"
+        
+    @cached_property
+    def stop_words(self):
+        from nltk.corpus import stopwords
+        try:
+            stop_words = set(stopwords.words('english'))
         except LookupError:
+            import nltk
             nltk.download('stopwords')
             nltk.download('punkt')
             nltk.download('punkt_tab')
-            self.stop_words = set(stopwords.words('english'))
-            
+            stop_words = set(stopwords.words('english'))
+
         custom_stops = {'said', 'say', 'also', 'would', 'could', 'one', 'two', 'first', 'may', 'way', 'get', 'go'}
-        self.stop_words.update(custom_stops)
+        stop_words.update(custom_stops)
+        return stop_words
+
+    @property
+    def llm_configured(self):
+        return bool(self.google_api_key) or self._model is not None
+
+    @property
+    def model(self):
+        """The Gemini model, created on first use (None without a GOOGLE_API_KEY)."""
+        if not self._model_ready:
+            with self._model_lock:
+                if not self._model_ready and self.google_api_key:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.google_api_key)
+                    self._model = genai.GenerativeModel("gemini-2.0-flash-exp")
+                self._model_ready = True
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+        self._model_ready = True
+
+    def warm_up(self):
+        """
+        Import NLTK and SciPy and load the stop words and Punkt data now, by summarizing a
+        short text with each extractive algorithm. The Gemini client stays lazy: its gRPC channel
+        must not be created before gunicorn forks.
+        """
+        started = time.perf_counter()
+        for method in ('frequency', 'tfidf', 'textrank'):
+            self.generate_summary(WARM_UP_TEXT, method=method, num_sentences=2)
+        logger.info(f"Summarizer warmed up in {time.perf_counter() - started:.2f}s")
 
-        # Initialize Gemini once
-        self.google_api_key = os.getenv("GOOGLE_API_KEY")
-        self.model = None
-        if self.google_api_key:
-            genai.configure(api_key=self.google_api_key)
-            self.model = genai.GenerativeModel("gemini-2.0-flash-exp")
-        
     def clean_text(self,text):
         # white space, PDF artifacts, page numbers removed
-        text = re.sub(r'\s+',' ',text.strip())
-        text = re.sub(r'page \d+', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'\d+/\d+', '', text)
-        
-        return text
-
-    def _prepare_sentences(self, sentences):
-        cleaned = []
-        for sentence in sentences:
-            clean = re.sub(r'[^\w\s]', '', sentence.lower())
-            words = word_tokenize(clean)
-            filtered = [w for w in words if w not in self.stop_words and w.isalpha()]
-            cleaned.append(' '.join(filtered))
-        return cleaned
-    
+        return self.cleaner.clean(text)
+
+    def preprocess(self, text):
+        """
+        Clean and sentence-split the text once; every algorithm reads from the result
+        """
+        if isinstance(text, PreprocessedDocument):
+            return text
+        with stage('cleaning'):
+            cleaned = self.clean_text(text)
+        with stage('sentence_split'):
+            sentences = self.tokenizer.sentences(cleaned) #Returns sentence-tokenized copy of text ; splits text into sentences
+        logger.info(f"Found {len(sentences)} sentences in the document")
+        return PreprocessedDocument(text, cleaned, sentences, self.stop_words, self.tokenizer)
+
+    def preprocess_pages(self, pages):
+        """
+        Build the document from an iterable of page texts, consuming it one page at a time
+        A sentence cut off at the end of a page is carried over and completed by the next page
+        """
+        raw_pages, cleaned_pages, sentences = [], [], []
+        carry = ''
+        for page, cleaned in timed_iter(self.cleaner.clean_pages(pages), 'cleaning'):
+            if not page:
+                continue
+            raw_pages.append(page)
+            if not cleaned:
+                continue
+            cleaned_pages.append(cleaned)
+            with stage('sentence_split'):
+                page_sentences = self.tokenizer.sentences(
+                    f"{carry} {cleaned}" if carry else cleaned
+                )
+            carry = ''
+            if page_sentences and not _SENTENCE_END.search(page_sentences[-1]):
+                carry = page_sentences.pop()
+                if len(carry) > MAX_CARRY_CHARS: # no sentence punctuation at all; don't regrow it
+                    sentences.append(carry)
+                    carry = ''
+            sentences.extend(page_sentences)
+        if carry:
+            sentences.append(carry)
+        logger.info(f"Found {len(sentences)} sentences in {len(raw_pages)} pages")
+        return PreprocessedDocument(
+            '\n'.join(raw_pages), ' '.join(cleaned_pages), sentences, self.stop_words,
+            self.tokenizer,
+        )
+
+    def tfidf_scores(self, doc):
+        """
+        Sum of each sentence's TF-IDF weights
+        IDF comes from the corpus store once it has enough documents, else from the document
+        """
+        idf = self.idf_store.idf if self.idf_store is not None else None
+        with stage('tokenize'):
+            terms = doc.sentence_terms
+        with stage('scoring'):
+            #TF-IDF matrix calculation
+            tfidf = tfidf_matrix(terms, max_features=100, idf=idf) #Limit features for performance
+            return np.asarray(tfidf.sum(axis=1)).ravel()
+
+    def textrank_scores(self, doc):
+        """TextRank centrality of each sentence."""
+        with stage('tokenize'):
+            terms = doc.sentence_terms
+        with stage('scoring'):
+            # TFIDF vectors for similarity calc
+            tfidf = tfidf_matrix(terms)
+        with stage('graph'):
+            graph = self.textrank.similarity_graph(tfidf) # sparse, pruned for large inputs
+        with stage('ranking'):
+            return self.textrank.rank(graph) # power iteration
+
+    def sentence_ranking(self, doc, method):
+        """
+        Indices of the document's sentences, best first, by the 'frequency', 'tfidf' or
+        'textrank' scores; kept on the document so the pipeline can persist it
+        """
+        if method not in doc.rankings:
+            if method == 'frequency':
+                with stage('tokenize'):
+                    sentence_tokens = doc.sentence_tokens
+                with stage('scoring'):
+                    word_freq = term_frequencies(sentence_tokens, self.stop_words)
+                    logger.info(
+                        f"Filtered {doc.token_count} words down to "
+                        f"{word_freq.total()} meaningful words"
+                    )
+                    # most common words, probably the most important topics
+                    logger.debug(f"Most common words: {word_freq.most_common(10)}")
+                with stage('ranking'):
+                    ranking = rank_sentences(doc.sentences, sentence_tokens, word_freq)
+            else:
+                scores = self.tfidf_scores(doc) if method == 'tfidf' else self.textrank_scores(doc)
+                ranking = scores.argsort()[::-1].tolist() # the top k is argsort()[-k:]
+            doc.rankings[method] = ranking
+        return doc.rankings[method]
+
+    def learn_document(self, *docs, key=None):
+        """
+        Add a summarized document, given whole or as its sections, to the corpus IDF store.
+        Only parts that were already tokenized count (every algorithm but a plain LLM summary),
+        so this never tokenizes. A document with a ``key`` (its content digest) is learned once.
+        """
+        docs = [doc for doc in docs if 'sentence_tokens' in doc.__dict__]
+        if self.idf_store is None or not self.idf_learn or not docs:
+            return
+        try:
+            self.idf_store.add_document(
+                (term for doc in docs for terms in doc.sentence_terms for term in terms), key=key
+            )
+        except OSError as e:
+            logger.warning(f"Could not update corpus IDF: {e}")
+
+    def prefilter_sentences(self, doc, ranker, token_budget):
+        """
+        The most central sentences by the 'tfidf' or 'textrank' ranker that fit within
+        token_budget (estimated) tokens, in original order
+        """
+        scores = self.tfidf_scores(doc) if ranker == 'tfidf' else self.textrank_scores(doc)
+        selected, used = [], 0
+        for i in np.argsort(-scores, kind='stable'):
+            tokens = estimate_tokens(doc.sentences[i]) + 1 # joining space
+            if used + tokens <= token_budget: # a long sentence may not fit; shorter ones still can
+                selected.append(i)
+                used += tokens
+        return [doc.sentences[i] for i in sorted(selected)]
+
     def frequency_summarize(self,text,num_sentences =3):
         """
         enhanced freq based method from app.py
         """
-    
         try:
-            # clean text 
-            text= self.clean_text(text)
-            sentences = sent_tokenize(text) #Returns sentence-tokenized copy of text ; splits text into sentences
-            logger.info(f"Found {len(sentences)} sentences in the document")
+            doc = self.preprocess(text)
+            sentences = doc.sentences
 
             if len(sentences)<= num_sentences:
                 return ' '.join(sentences)
             
-            #tokenize and filter
-            words = word_tokenize(text.lower()) #splits text into individual words 
-            filtered_words = [word for word in words if word.isalpha() and word not in self.stop_words]
-            logger.info(f"Filtered {len(words)} words down to {len(filtered_words)} meaningful words")
-            
-            #Calculate word frequencies
-            word_freq = FreqDist(filtered_words)
-            most_common_words = word_freq.most_common(10) #most common words , probably most imp topic
-            logger.debug(f"Most common words: {most_common_words}")
-
-            #sentence scoring based on imp words
-            sentence_scores = {}
-            for sentence in sentences:
-                sentence_words = word_tokenize(sentence.lower())
-                score = 0
-                word_count=0
-                for word in sentence_words:
-                    if word in word_freq:
-                        score +=word_freq[word] #Add the frequency of this word to the sentence score
-                        word_count+=1
-                   
-                if word_count>0:
-                    sentence_scores[sentence] = score/word_count #store the score for this sentence
-                else:
-                    sentence_scores[sentence]=0
-            
-            #Get top sentences
-            ranked_sentences = sorted(sentence_scores.items(),key=lambda x:x[1],reverse=True) #sorting sentences by score (highest first)
-            top_sentences = [sentence for sentence,score in ranked_sentences[:num_sentences]]
-            
-            #Maintain original order of sentences in the summary
-            ordered_sentences=[]
-            for sentence in sentences:
-                if sentence in top_sentences:
-                    ordered_sentences.append(sentence)
-
-            return ' '.join(ordered_sentences)
+            #Top sentences by mean word frequency, in original order
+            top_indices = sorted(self.sentence_ranking(doc, 'frequency')[:num_sentences])
+            return ' '.join(sentences[i] for i in top_indices)
 
         except Exception as e:
             logger.error(f"Error in summarization: {str(e)}")
@@ -121,24 +288,14 @@ class AdvSummarizer:
         """
         
         try:
-            text = self.clean_text(text)
-            sentences = sent_tokenize(text)
+            doc = self.preprocess(text)
+            sentences = doc.sentences
             
             if len(sentences)<= num_sentences:
                 return ' '.join(sentences)
             
-            cleaned_sentences = self._prepare_sentences(sentences)
-            
-            #TF-IDF matrix calculation
-            vectorizer = TfidfVectorizer(max_features=100) #Limit features for performance
-            tfidf_matrix = vectorizer.fit_transform(cleaned_sentences)
-            
-            #sentence scores (sum of TF-IDF values) calculation
-            sentence_scores = np.array(tfidf_matrix.sum(axis=1)).flatten()
-            
             #sorted top indices in orginal order
-            top_indices = sentence_scores.argsort()[-num_sentences:][::-1]
-            top_indices = sorted(top_indices)
+            top_indices = sorted(self.sentence_ranking(doc, 'tfidf')[:num_sentences])
             
             summary_sentences = [sentences[i] for i in top_indices]
             return ' '.join(summary_sentences)
@@ -153,40 +310,14 @@ class AdvSummarizer:
         """           
             
         try:
-            text = self.clean_text(text)
-            sentences = sent_tokenize(text)
+            doc = self.preprocess(text)
+            sentences = doc.sentences
             
             if len(sentences) <= num_sentences:
                 return ' '.join(sentences)
             
-            cleaned_sentences = self._prepare_sentences(sentences)
-            
-            # TFIDF vectors for similarity calc
-            vectorizer = TfidfVectorizer()
-            tfidf_matrix = vectorizer.fit_transform(cleaned_sentences)
-            
-            similarity_matrix = cosine_similarity(tfidf_matrix) #cosine similarity between sentences
-            
-            scores = np.ones(len(sentences)) #TextRank algo
-            
-            ## Iterate to convergence (simplified PageRank)
-            for _ in range(50):
-                new_scores = np.ones(len(sentences))
-                for i in range(len(sentences)):
-                    for j in range(len(sentences)):
-                        if i!=j:
-                            new_scores[i] += similarity_matrix[i][j]*scores[j]
-            
-                new_scores = new_scores/np.sum(new_scores) # normalize scores
-                
-                #convergence test
-                if np.allclose(scores,new_scores,atol=1e-4):
-                    break
-                scores = new_scores
-            
             #get top sentences in original order
-            top_indices = scores.argsort()[-num_sentences:][::-1]
-            top_indices = sorted(top_indices)
+            top_indices = sorted(self.sentence_ranking(doc, 'textrank')[:num_sentences])
             
             summary_sentences = [sentences[i] for i in top_indices]
             return ' '.join(summary_sentences)
@@ -195,7 +326,26 @@ class AdvSummarizer:
             raise Exception(f"TextRank summarization failed : {str(e)}")
     
         
-    def llm_summarizer(self, text, num_sentences=3):
+    def _generate(self, prompt, max_output_tokens, on_text=None):
+        """
+        The model's answer to prompt; with on_text the response is streamed and each piece of
+        text is passed to on_text as it arrives
+        """
+        generation_config = { # dict form of genai.GenerationConfig
+            'temperature': 0.4,
+            'max_output_tokens': max_output_tokens,
+        }
+        if on_text is None:
+            return self.model.generate_content(prompt, generation_config=generation_config).text
+        parts = []
+        for chunk in self.model.generate_content(
+            prompt, generation_config=generation_config, stream=True
+        ):
+            parts.append(chunk.text)
+            on_text(chunk.text)
+        return ''.join(parts)
+
+    def llm_summarizer(self, text, num_sentences=3, on_text=None):
         if not self.model:
             return "Neural summarization is not configured. Please provide a GOOGLE_API_KEY."
 
@@ -205,53 +355,128 @@ class AdvSummarizer:
                         Organize the summary into clear, readable paragraphs. Be direct — avoid phrases like 'here is a summary'.
                         {text}
                         """
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    temperature=0.4,
-                    max_output_tokens=1024 * num_sentences,
-                ),
-            )
-            return response.text
+            return self._generate(prompt, 1024 * num_sentences, on_text)
         except Exception as e:
             logger.error(f"Error summarizing text with Gemini: {e}")
-            return f"Failed to generate summary due to an API error: {e}"
-   
-    
-    def generate_summary(self,text,method='frequency',num_sentences=3):
+            return f"{LLM_FAILURE_PREFIX} due to an API error: {e}"
+
+    def llm_map_reduce(self, sentences, num_sentences=3, on_text=None):
+        """
+        Summarize text too long for one prompt: sentence-aligned chunks are summarized
+        concurrently, then the chunk summaries are combined (streamed to on_text, if given).
+        Returns (summary, stats).
+        """
+        if not self.model:
+            return self.llm_summarizer(' '.join(sentences), num_sentences), _llm_stats('map_reduce')
+
+        def summarize_chunk(chunk):
+            prompt = (
+                "The following text is one section of a longer document.\n"
+                "Summarize its main points, findings and significant data points in a short "
+                "paragraph.\n"
+                "Be direct — avoid phrases like 'this section'.\n"
+                f"{chunk}\n"
+            )
+            return self._generate(prompt, 512)
+
+        def combine(summaries):
+            prompt = (
+                "The following are summaries of consecutive sections of one document.\n"
+                "Combine them into a comprehensive, concise summary of the whole document.\n"
+                "Highlight the main arguments, key findings, important conclusions, and any "
+                "significant data points.\n"
+                "Organize the summary into clear, readable paragraphs. Be direct — avoid phrases "
+                "like 'here is a summary'.\n"
+                f"{summaries}\n"
+            )
+            return self._generate(prompt, 1024 * num_sentences, on_text)
+
+        try:
+            return map_reduce(
+                summarize_chunk, combine, sentences,
+                self.llm_chunk_chars, self.llm_max_concurrency,
+            )
+        except Exception as e:
+            logger.error(f"Error summarizing chunked text with Gemini: {e}")
+            return f"{LLM_FAILURE_PREFIX} due to an API error: {e}", _llm_stats('map_reduce')
+
+    def generate_summary(self,text,method='frequency',num_sentences=3,llm_prefilter=None,
+                         llm_token_budget=None,on_text=None):
         """
          Main method to generate summary using specified algorithm
+         For 'llm', llm_prefilter ('tfidf' or 'textrank') first keeps only the most central
+         sentences that fit llm_token_budget, so less text is sent to the model, and on_text
+         receives the summary text as the model streams it
         """
         
         #input validation
         num_sentences = max(2,min(10,num_sentences)) #clamping
+        failed = False # only the LLM reports errors in the summary text instead of raising
+        llm_stats = None
+        try:
+            with stage('preprocess'):
+                doc = self.preprocess(text) # tokenized once, shared by the algorithm and the statistics
+        except Exception as e:
+            raise Exception(f"Text preprocessing failed: {str(e)}")
        
         if method == 'tfidf':
-            summary = self.tfidf_summarize(text,num_sentences)
+            summary = self.tfidf_summarize(doc,num_sentences)
             algorithm_used = "TF-IDF"
         elif method == 'textrank':
-            summary = self.textrank_summarizer(text,num_sentences)
+            summary = self.textrank_summarizer(doc,num_sentences)
             algorithm_used = "TextRank"
         elif method == 'frequency':
-            summary = self.frequency_summarize(text,num_sentences)
+            summary = self.frequency_summarize(doc,num_sentences)
             algorithm_used = "Frequency Analysis"
         else:
-            summary = self.llm_summarizer(text,num_sentences)
+            started = time.perf_counter()
+            sentences, llm_text = doc.sentences, doc.raw_text
+            if llm_prefilter and llm_prefilter != 'none':
+                # capped so the pre-filtered text is always sent in a single prompt
+                token_budget = min(llm_token_budget or self.llm_token_budget,
+                                   self.llm_chunk_chars // CHARS_PER_TOKEN)
+                try:
+                    with stage('prefilter'):
+                        sentences = self.prefilter_sentences(doc, llm_prefilter, token_budget)
+                    llm_text = ' '.join(sentences)
+                except ValueError as e: # e.g. only stop words left to vectorize
+                    logger.warning(f"LLM pre-filter skipped: {e}")
+            prefilter_seconds = round(time.perf_counter() - started, 3)
+
+            with stage('llm'):
+                if len(llm_text) > self.llm_chunk_chars:
+                    summary, llm_stats = self.llm_map_reduce(sentences,num_sentences,on_text)
+                else:
+                    summary = self.llm_summarizer(llm_text,num_sentences,on_text)
+                    llm_stats = _llm_stats('single', chunks=[1])
+            llm_stats.update(
+                prefilter=llm_prefilter or 'none',
+                sentences_sent=len(sentences),
+                input_tokens=estimate_tokens(llm_text),
+                full_tokens=estimate_tokens(doc.raw_text),
+            )
+            llm_stats['timings']['prefilter_seconds'] = prefilter_seconds
+            llm_stats['timings']['total_seconds'] = round(time.perf_counter() - started, 3)
             algorithm_used = "llm"
+            failed = self.model is None or summary.startswith(LLM_FAILURE_PREFIX)
             
         # calc compression ratio
-        original_sentences = len(sent_tokenize(text))
-        compression_ratio = (len(summary)/len(text))*100 if original_sentences>0 else 0
+        original_sentences = len(doc.sentences)
+        compression_ratio = (len(summary)/len(doc.raw_text))*100 if original_sentences>0 else 0
                 
-        return {
+        result = {
             'summary': summary,
             'algorithm': algorithm_used,
             'sentences_requested': num_sentences,
             'original_sentences': original_sentences,
             'compression_ratio': round(compression_ratio, 2),
             'summary_word_count': len(summary.split()),
-            'original_word_count': len(text.split())
-        }    
+            'original_word_count': doc.word_count,
+            'failed': failed
+        }
+        if llm_stats is not None:
+            result['llm'] = llm_stats # chunk counts and per-stage timings
+        return result    
             
             
             
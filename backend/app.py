@@ -1,15 +1,47 @@
 import os
-import io
 import sys
+import json
 import logging
 import datetime
-from flask import Flask, request, jsonify
+import queue
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import as_completed
+from contextlib import contextmanager, nullcontext
+from functools import partial, wraps
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import pypdf
 from dotenv import load_dotenv
 
+from admission import AdmissionController, OverloadedError, estimate_cost
 from adv_summ import AdvSummarizer
-from schemas import SummarizeRequest, FileValidation
+from cache import ResultCache, content_hash
+from config import env_number
+from extraction import (  # noqa: F401
+    apply_char_budget,
+    extract_pages,
+    extract_text_from_pdf,
+    count_pages,
+    iter_pages,
+    select_pages,
+)
+from jobs import JobManager, QueueFullError
+from metrics import Metrics, collect, size_bucket, stage, timed_iter
+from pipeline import (
+    InsufficientTextError,
+    batch_workers,
+    compare_pages,
+    get_batch_pool,
+    rank_pages,
+    summarize_pages,
+    summarize_pdf_bytes,
+    summarize_sections,
+)
+from ranking import RANKED_ALGORITHMS, ranked_summary
+from schemas import CompareRequest, SummarizeRequest, FileValidation
+from uploads import SpoolingRequest, discard_upload, keep_upload, upload_source
 
 load_dotenv()
 
@@ -24,6 +56,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+# large uploads go to a temporary file that is summarized in place instead of read into memory
+app.request_class = SpoolingRequest
 
 # Security: In production, you should restrict origins
 allowed_origins = os.environ.get('ALLOWED_ORIGINS', '*').split(',')
@@ -31,6 +65,108 @@ CORS(app, resources={r"/*": {"origins": allowed_origins}})
 
 summarizer = AdvSummarizer()
 
+# Summaries keyed by upload hash + algorithm + sentence count
+# CACHE_DB_PATH shares them across workers
+summary_cache = ResultCache(
+    'summaries',
+    max_entries=env_number('SUMMARY_CACHE_SIZE', 256, int),
+    ttl=env_number('SUMMARY_CACHE_TTL', 86400),
+    db_path=os.environ.get('CACHE_DB_PATH'),
+)
+
+# Extracted per-page text keyed by upload hash alone, so switching algorithm skips pypdf
+extraction_cache = ResultCache(
+    'extracted_pages',
+    max_entries=env_number('EXTRACTION_CACHE_SIZE', 32, int),
+    ttl=env_number('EXTRACTION_CACHE_TTL', 86400),
+    db_path=os.environ.get('CACHE_DB_PATH'),
+    compress=True,
+)
+
+# Full sentence rankings keyed by upload hash + algorithm + page budget; any other num_sentences
+# for the same document is sliced from them without tokenizing or scoring again
+ranking_cache = ResultCache(
+    'sentence_rankings',
+    max_entries=env_number('RANKING_CACHE_SIZE', 64, int),
+    ttl=env_number('SUMMARY_CACHE_TTL', 86400),
+    db_path=os.environ.get('CACHE_DB_PATH'),
+    compress=True,
+)
+
+# Background summaries (POST /jobs); records always go to SQLite, in the temp dir unless a path is
+# set, so a status poll answered by any gunicorn worker on the host finds the job
+JOB_DB_PATH = (
+    os.environ.get('JOB_DB_PATH')
+    or os.environ.get('CACHE_DB_PATH')
+    or os.path.join(tempfile.gettempdir(), 'pdf-summarizer-jobs.db')
+)
+job_manager = JobManager(
+    max_workers=env_number('JOB_WORKERS', 2, int),
+    max_pending=env_number('JOB_QUEUE_SIZE', 16, int),
+    retention=env_number('JOB_RETENTION', 3600),
+    db_path=JOB_DB_PATH,
+)
+JOB_RETRY_AFTER = 5
+
+# Prometheus-style metrics for GET /metrics; summed across workers through the SQLite file
+metrics = Metrics(db_path=os.environ.get('METRICS_DB_PATH') or os.environ.get('CACHE_DB_PATH'))
+
+# Summaries that miss the cache run within each worker's work budget (about a page extracted per
+# unit) and per-algorithm limits; the rest wait briefly or get 503, so threads stay free for /health
+admission = AdmissionController(
+    budget=max(1.0, env_number('ADMISSION_BUDGET', 1000.0)),
+    max_active=max(1, env_number('ADMISSION_MAX_ACTIVE', 2, int)),
+    limits={
+        algorithm: env_number(f'ADMISSION_MAX_{algorithm.upper()}', default, int)
+        for algorithm, default in (('frequency', 0), ('tfidf', 0), ('textrank', 1), ('llm', 2))
+    },
+    max_queued=env_number('ADMISSION_QUEUE_SIZE', 1, int),
+    queue_timeout=env_number('ADMISSION_QUEUE_TIMEOUT', 2.0),
+    retry_after=env_number('ADMISSION_RETRY_AFTER', 5, int),
+    metrics=metrics,
+    max_background=env_number('ADMISSION_MAX_BACKGROUND', None, int),
+)
+
+ZIP_EXTENSIONS = ('.zip',)
+
+def instrumented(endpoint):
+    """Count requests, requests in flight and their latency for an endpoint."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            metrics.gauge_add('requests_in_flight', 1, endpoint=endpoint)
+            started = time.perf_counter()
+            status = 500
+            try:
+                response = app.make_response(view(*args, **kwargs))
+                status = response.status_code
+                return response
+            finally:
+                metrics.gauge_add('requests_in_flight', -1, endpoint=endpoint)
+                metrics.inc('requests_total', endpoint=endpoint, status=str(status))
+                metrics.observe('request_duration_seconds', time.perf_counter() - started,
+                                endpoint=endpoint)
+        return wrapper
+    return decorator
+
+def cache_lookup(cache, key):
+    """ResultCache.get that also counts hits and misses for /metrics."""
+    value = cache.get(key)
+    metrics.inc('cache_requests_total', cache=cache.name,
+                result='miss' if value is None else 'hit')
+    return value
+
+def record_summary(body, result, timings, from_cache):
+    """Export one summary's latency (by algorithm and document size) and stage timings."""
+    metrics.observe(
+        'summary_duration_seconds', timings.get('total', 0.0),
+        algorithm=body.algorithm, size=size_bucket(result['original_length']),
+        cached=str(from_cache).lower(),
+    )
+    for name, seconds in timings.items():
+        if name != 'total':
+            metrics.observe('stage_duration_seconds', seconds, stage=name)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Service health check for monitoring tools."""
@@ -40,93 +176,791 @@ def health_check():
         "service": "pdf-summarizer-backend"
     })
 
-def extract_text_from_pdf(pdf_stream):
-    """Surgical extraction of text from PDF bytes with fallback and cleaning."""
+@app.route('/status', methods=['GET'])
+def server_status():
+    """Extended status: available algorithms and cache counters."""
+    return jsonify({
+        "status": "healthy",
+        "timestamp": datetime.datetime.now().isoformat(),
+        "algorithms": ["frequency", "tfidf", "textrank", "llm"],
+        "llm_configured": summarizer.llm_configured,
+        "cache": {
+            "summaries": summary_cache.stats(),
+            "extraction": extraction_cache.stats(),
+            "rankings": ranking_cache.stats(),
+        },
+        "jobs": job_manager.stats(),
+        "admission": admission.stats(),
+        "idf": summarizer.idf_store.stats() if summarizer.idf_store is not None else None,
+    })
+
+def cap(requested, limit):
+    if requested and limit:
+        return min(requested, limit)
+    return requested or limit or None
+
+def page_budget(body):
+    """Effective (max_pages, max_chars): the request's budget, capped by MAX_PAGES / MAX_CHARS."""
+    return (
+        cap(body.max_pages, env_number('MAX_PAGES', 0, int)),
+        cap(body.max_chars, env_number('MAX_CHARS', 0, int)),
+    )
+
+def section_budget(body):
+    """Total summary sentences of a section-aware summary (None when not summarizing by section)."""
+    if not body.sections:
+        return None
+    return cap(body.section_budget, max(2, env_number('SECTION_SENTENCE_BUDGET', 50, int)))
+
+def document_pages(pdf_content, digest, max_pages=None, max_chars=None, sampling='first'):
+    """
+    Page texts for an upload under a page/character budget
+    Fully extracted documents come from (and go to) the extraction cache; budgeted extraction of an
+    unseen document streams only the selected pages instead.
+    """
+    pages = cache_lookup(extraction_cache, digest)
+    if pages is not None:
+        selected = [pages[i] for i in select_pages(len(pages), max_pages, sampling)]
+        return apply_char_budget(selected, max_chars)
+    if not max_pages and not max_chars:
+        pages = extract_pages(pdf_content)
+        extraction_cache.set(digest, pages)
+        return pages
+    return iter_pages(pdf_content, max_pages, max_chars, sampling)
+
+def upload_cost(pdf_content, algorithms, max_pages=None):
+    """Admission cost of summarizing an upload (bytes or spool file path) with ``algorithms``."""
+    if isinstance(pdf_content, str):
+        size = os.path.getsize(pdf_content)
+    else:
+        size = len(pdf_content)
     try:
-        reader = pypdf.PdfReader(io.BytesIO(pdf_stream))
-        text = []
-        for page_num, page in enumerate(reader.pages):
-            try:
-                page_text = page.extract_text()
-                if page_text:
-                    # Basic cleaning of common PDF artifacts
-                    page_text = page_text.replace('\0', '') # remove null bytes
-                    text.append(page_text)
-                    logger.debug(f"Extracted {len(page_text)} chars from page {page_num + 1}")
-            except Exception as page_err:
-                logger.warning(f"Failed to extract text from page {page_num + 1}: {page_err}")
-        
-        full_text = "\n".join(text)
-        logger.info(f"Total text extracted: {len(full_text)} characters from {len(reader.pages)} pages")
-        return full_text
-    except Exception as e:
-        logger.error(f"PDF extraction failed: {str(e)}")
-        raise RuntimeError(f"Failed to extract text from PDF: {str(e)}")
+        pages = count_pages(pdf_content)
+    except Exception:
+        pages = size // 100_000 # unreadable PDFs fail in extraction; guess from the size
+    return estimate_cost(algorithms, cap(pages, max_pages) or 0, size)
+
+@contextmanager
+def admitted(pdf_content, algorithms, max_pages=None, wait=False):
+    """Run the enclosed summary within the admission budget; the wait is timed as `admission`."""
+    with stage('admission'):
+        ticket = admission.acquire(algorithms, upload_cost(pdf_content, algorithms, max_pages),
+                                   wait)
+    try:
+        yield ticket
+    finally:
+        admission.release(ticket)
+
+def admit_stream(pdf_content, body):
+    """
+    Admission ticket for a streamed summary, taken before the stream starts so a busy worker can
+    still answer 503; None when the summary is cached (or the caller should admit it later).
+    """
+    with stage('cache'):
+        digest = content_hash(pdf_content)
+        max_pages, max_chars = page_budget(body)
+        cache_key = summary_cache_key(digest, body, max_pages, max_chars)
+        ranked = body.algorithm in RANKED_ALGORITHMS and not section_budget(body)
+        if summary_cache.get(cache_key) is not None or ranked and ranking_cache.get(
+            ranking_cache_key(digest, body.algorithm, body, max_pages, max_chars)
+        ) is not None:
+            return None
+    with stage('admission'):
+        return admission.acquire([body.algorithm],
+                                 upload_cost(pdf_content, [body.algorithm], max_pages))
+
+def overloaded(e):
+    return jsonify({'error': str(e)}), 503, {'Retry-After': str(e.retry_after)}
+
+def optional_int(name):
+    value = request.form.get(name)
+    return int(value) if value not in (None, '') else None
+
+def build_response(filename, body, result, from_cache):
+    """Shape a summary result (fresh or cached) into the /summarize response body."""
+    summary_result = result['summary_result']
+    response = {
+        'success': True,
+        'filename': filename,
+        'summary': summary_result['summary'],
+        'algorithm_used': summary_result['algorithm'],
+        'cached': from_cache,
+        'statistics': {
+            'original_length': result['original_length'],
+            'summary_length': len(summary_result['summary']),
+            'original_word_count': summary_result['original_word_count'],
+            'summary_word_count': summary_result['summary_word_count'],
+            'original_sentences': summary_result['original_sentences'],
+            'summary_sentences': summary_result['sentences_requested'],
+            'compression_ratio': summary_result['compression_ratio']
+        },
+        'parameters': {
+            'algorithm': body.algorithm,
+            'num_sentences': body.num_sentences,
+            'max_pages': result.get('max_pages'),
+            'max_chars': result.get('max_chars'),
+            'page_sampling': body.page_sampling,
+            'llm_prefilter': body.llm_prefilter,
+            'llm_token_budget': body.llm_token_budget,
+            'sections': body.sections,
+            'section_budget': result.get('section_budget'),
+        }
+    }
+    if 'llm' in summary_result:
+        response['llm'] = summary_result['llm']
+    if 'sections' in result:
+        response['sections'] = result['sections'] # per-section summaries with page ranges
+    return response
+
+class UploadError(Exception):
+    """A problem with the client's upload or parameters, reported as HTTP 400."""
+
+def parse_params():
+    """Summarization parameters from the multipart form."""
+    try:
+        return SummarizeRequest(
+            algorithm=request.form.get('algorithm', 'llm'),
+            num_sentences=int(request.form.get('num_sentences', 3)),
+            max_pages=optional_int('max_pages'),
+            max_chars=optional_int('max_chars'),
+            page_sampling=request.form.get('page_sampling', 'first'),
+            llm_prefilter=request.form.get('llm_prefilter', 'none'),
+            llm_token_budget=optional_int('llm_token_budget'),
+            sections=request.form.get('sections', False),
+            section_budget=optional_int('section_budget'),
+            timings=request.values.get('timings', False),
+        )
+    except (ValueError, TypeError):
+        raise UploadError('Invalid request parameters')
+
+def parse_upload():
+    """Validate the multipart form of a summarize request; returns (file, body)."""
+    if 'file' not in request.files:
+        raise UploadError('No file uploaded')
+
+    file = request.files['file']
+    body = parse_params()
+
+    try:
+        FileValidation.validate_file(
+            file.filename,
+            file.seek(0, 2),
+            file.content_type,
+        )
+        file.seek(0)
+    except ValueError as ve:
+        raise UploadError(str(ve))
+
+    logger.info(f"Processing request: File={file.filename}, Algo={body.algorithm}, Sentences={body.num_sentences}")
+    return file, body
+
+def track_pages(pages, total, progress):
+    """Report extraction progress (first half of the job) as pages are consumed."""
+    for count, page in enumerate(pages, start=1):
+        progress('extracting', 0.5 * count / max(total, 1))
+        yield page
+
+def summary_cache_key(digest, body, max_pages, max_chars):
+    return (
+        f"{digest}:{body.algorithm}:{body.num_sentences}:"
+        f"{max_pages}:{max_chars}:{body.page_sampling}:"
+        f"{body.llm_prefilter}:{body.llm_token_budget}:{summarizer.tokenizer.name}:"
+        f"{section_budget(body)}"
+    )
+
+def ranking_cache_key(digest, algorithm, body, max_pages, max_chars):
+    return (
+        f"{digest}:{algorithm}:{max_pages}:{max_chars}:{body.page_sampling}:"
+        f"{summarizer.tokenizer.name}"
+    )
+
+def cached_summary(cache_key, digest, body, max_pages, max_chars):
+    """
+    A cached summary result, or one sliced from the document's cached sentence ranking when
+    only the sentence count changed; None when the document must be summarized
+    """
+    result = cache_lookup(summary_cache, cache_key)
+    if result is not None or body.algorithm not in RANKED_ALGORITHMS or section_budget(body):
+        return result
+    record = cache_lookup(
+        ranking_cache, ranking_cache_key(digest, body.algorithm, body, max_pages, max_chars)
+    )
+    if record is None:
+        return None
+    return {
+        'summary_result': ranked_summary(record, body.num_sentences),
+        'original_length': record['original_length'],
+        'max_pages': max_pages,
+        'max_chars': max_chars,
+        'section_budget': None,
+    }
+
+def store_summary(cache_key, digest, body, result):
+    """Cache a fresh summary result, and the sentence ranking it carries separately."""
+    record = result.pop('ranking', None)
+    if result['summary_result']['failed']:
+        return
+    summary_cache.set(cache_key, result)
+    if record is not None:
+        ranking_cache.set(
+            ranking_cache_key(digest, body.algorithm, body, result['max_pages'],
+                              result['max_chars']),
+            record,
+        )
+
+def summarize_upload(pdf_content, filename, body, progress=None, on_text=None, wait=False,
+                     admit=True):
+    """
+    Summarize uploaded PDF bytes (or fetch the cached result); returns the /summarize body
+    on_text receives an LLM summary's text as the model streams it. A summary that is not cached
+    is admitted first: background work ``wait``s for room, requests may get OverloadedError;
+    ``admit=False`` when the caller already holds admission.
+    """
+    with collect() as timings:
+        with stage('cache'):
+            digest = content_hash(pdf_content)
+            max_pages, max_chars = page_budget(body)
+            cache_key = summary_cache_key(digest, body, max_pages, max_chars)
+            result = cached_summary(cache_key, digest, body, max_pages, max_chars)
+        from_cache = result is not None
+        if from_cache:
+            logger.info(f"Serving cached summary for {filename}")
+        else:
+            scope = admitted(pdf_content, [body.algorithm], max_pages, wait) if admit else None
+            with scope or nullcontext():
+                result = run_summary(pdf_content, digest, body, max_pages, max_chars, progress,
+                                     on_text)
+            store_summary(cache_key, digest, body, result)
+
+    stage_timings = timings.as_dict()
+    record_summary(body, result, stage_timings, from_cache)
+    response = build_response(filename, body, result, from_cache=from_cache)
+    if body.timings:
+        response['timings'] = stage_timings
+    return response
+
+def run_summary(pdf_content, digest, body, max_pages, max_chars, progress=None, on_text=None):
+    with stage('extraction'):
+        pages = document_pages(pdf_content, digest, max_pages, max_chars, body.page_sampling)
+    sentence_budget = section_budget(body)
+    page_numbers = None
+    if progress is not None or sentence_budget:
+        page_count = len(pages) if isinstance(pages, list) else count_pages(pdf_content)
+        page_numbers = select_pages(page_count, max_pages, body.page_sampling)
+    if progress is not None:
+        pages = track_pages(pages, len(page_numbers), progress)
+    pages = timed_iter(pages, 'extraction')
+    try:
+        if sentence_budget:
+            result = summarize_sections(
+                summarizer, pdf_content, pages, page_numbers, body.algorithm,
+                body.num_sentences, sentence_budget, progress=progress,
+                llm_prefilter=body.llm_prefilter, llm_token_budget=body.llm_token_budget,
+                digest=digest,
+            )
+        else:
+            result = summarize_pages(
+                summarizer, pages, body.algorithm, body.num_sentences,
+                progress=progress, llm_prefilter=body.llm_prefilter,
+                llm_token_budget=body.llm_token_budget, on_text=on_text, digest=digest,
+            )
+    except InsufficientTextError as e:
+        raise UploadError(str(e))
+    result.update(max_pages=max_pages, max_chars=max_chars, section_budget=sentence_budget)
+    return result
+
+def summary_events(pdf_content, filename, body, ticket=None):
+    """
+    NDJSON lines of a streamed /summarize: a start line right away, extraction and summarizing
+    progress, an LLM summary's text as the model streams it, then the result (or an error)
+    The summary starts on its own thread right away and removes its copy of the upload when it
+    is done, so a client that disconnects early still leaves the finished summary in the cache.
+    The thread releases ``ticket``, the summary's admission taken by the request, when done.
+    """
+    events = queue.Queue()
+
+    def progress(stage_name, fraction):
+        events.put({'event': 'progress', 'stage': stage_name, 'fraction': round(fraction, 3)})
+
+    def on_text(text):
+        events.put({'event': 'token', 'text': text})
+
+    def run():
+        try:
+            result = summarize_upload(pdf_content, filename, body, progress, on_text,
+                                      admit=ticket is None)
+            events.put({'event': 'result', **result})
+        except UploadError as e:
+            events.put({'event': 'error', 'error': str(e)})
+        except OverloadedError as e:
+            # only when a cached summary was evicted before the thread ran: the stream has
+            # already started with 200, so the client retries like after a 503
+            events.put({'event': 'error', 'error': str(e), 'status': 503,
+                        'retry_after': e.retry_after})
+        except Exception as e:
+            logger.exception("Internal error during streamed summarization")
+            events.put({'event': 'error', 'error': f'Server error: {str(e)}'})
+        finally:
+            if ticket is not None:
+                admission.release(ticket)
+            discard_upload(pdf_content)
+            events.put(None)
+
+    def lines():
+        started = {'event': 'started', 'filename': filename, 'algorithm': body.algorithm}
+        yield json.dumps(started) + '\n'
+        while (event := events.get()) is not None:
+            yield json.dumps(event) + '\n'
+
+    threading.Thread(target=run, name='summary-stream', daemon=True).start()
+    return lines()
 
 @app.route('/summarize', methods=['POST'])
+@instrumented('summarize')
 def summarize_pdf():
-    """Main endpoint for PDF summarization."""
+    """Main endpoint for PDF summarization; streamed as NDJSON events when asked to."""
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file uploaded'}), 400
+        with collect():
+            with stage('upload'):
+                file, body = parse_upload()
+                pdf_content = upload_source(file) # the spool file's path for large uploads
+            if wants_ndjson():
+                ticket = admit_stream(pdf_content, body) # a busy worker answers 503 here
+                try:
+                    # the stream's thread outlives the request, and with it the spool file
+                    events = summary_events(keep_upload(pdf_content), file.filename, body, ticket)
+                except Exception:
+                    if ticket is not None:
+                        admission.release(ticket)
+                    raise
+                return Response(stream_with_context(events), mimetype='application/x-ndjson')
+            return jsonify(summarize_upload(pdf_content, file.filename, body))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
+    except OverloadedError as e:
+        return overloaded(e)
+    except Exception as e:
+        logger.exception("Internal error during summarization")
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+def rank_upload(pdf_content, filename, body):
+    """The cached or freshly computed sentence ranking of an upload; returns the response body."""
+    with collect() as timings:
+        with stage('cache'):
+            digest = content_hash(pdf_content)
+            max_pages, max_chars = page_budget(body)
+            cache_key = ranking_cache_key(digest, body.algorithm, body, max_pages, max_chars)
+            record = cache_lookup(ranking_cache, cache_key)
+        from_cache = record is not None
+        if not from_cache:
+            with admitted(pdf_content, [body.algorithm], max_pages):
+                with stage('extraction'):
+                    pages = document_pages(
+                        pdf_content, digest, max_pages, max_chars, body.page_sampling
+                    )
+                try:
+                    record = rank_pages(
+                        summarizer, timed_iter(pages, 'extraction'), body.algorithm, digest=digest
+                    )
+                except InsufficientTextError as e:
+                    raise UploadError(str(e))
+            ranking_cache.set(cache_key, record)
 
-        file = request.files['file']
+    response = {
+        'success': True,
+        'filename': filename,
+        'algorithm_used': record['algorithm'],
+        'cached': from_cache,
+        'sentences': record['sentences'],
+        'offsets': record['offsets'],
+        'ranking': record['ranking'],
+        'statistics': {
+            'original_length': record['original_length'],
+            'original_word_count': record['original_word_count'],
+            'original_sentences': len(record['sentences']),
+        },
+        'parameters': {
+            'algorithm': body.algorithm,
+            'max_pages': max_pages,
+            'max_chars': max_chars,
+            'page_sampling': body.page_sampling,
+        },
+    }
+    if body.timings:
+        response['timings'] = timings.as_dict()
+    return response
 
+@app.route('/summarize/ranking', methods=['POST'])
+@instrumented('ranking')
+def sentence_ranking():
+    """Every sentence of a PDF ranked by an extractive algorithm, to slice summaries client-side."""
+    try:
+        with collect():
+            with stage('upload'):
+                file, body = parse_upload()
+                if body.algorithm not in RANKED_ALGORITHMS:
+                    raise UploadError(
+                        f"Rankings are available for {', '.join(RANKED_ALGORITHMS)} only."
+                    )
+                pdf_content = upload_source(file)
+            return jsonify(rank_upload(pdf_content, file.filename, body))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
+    except OverloadedError as e:
+        return overloaded(e)
+    except Exception as e:
+        logger.exception("Internal error while ranking sentences")
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+def parse_compare():
+    """Validate a /summarize/compare form; returns (file, body) with body a CompareRequest."""
+    file, body = parse_upload()
+    # repeated `algorithms` fields and/or one comma-separated list
+    algorithms = [
+        name.strip()
+        for value in request.form.getlist('algorithms')
+        for name in value.split(',')
+        if name.strip()
+    ]
+    try:
+        if algorithms:
+            body = CompareRequest(**body.model_dump(), algorithms=algorithms)
+        else:
+            body = CompareRequest(**body.model_dump())
+    except ValueError:
+        raise UploadError('Invalid request parameters')
+    if body.sections:
+        raise UploadError('Section summaries cannot be compared.')
+    return file, body
+
+def compare_upload(pdf_content, filename, body):
+    """
+    Summarize one upload with each of body.algorithms; returns the /summarize/compare body
+    Cached summaries are answered first; the rest share one extraction and tokenization and run
+    at the same time, so the request takes about as long as its slowest algorithm.
+    """
+    started = time.perf_counter()
+    with collect() as timings:
+        with stage('cache'):
+            digest = content_hash(pdf_content)
+            max_pages, max_chars = page_budget(body)
+            bodies, keys, results = {}, {}, {}
+            for algorithm in body.algorithms:
+                bodies[algorithm] = SummarizeRequest(
+                    **body.model_dump(exclude={'algorithms'}) | {'algorithm': algorithm}
+                )
+                keys[algorithm] = summary_cache_key(digest, bodies[algorithm], max_pages,
+                                                    max_chars)
+                results[algorithm] = cached_summary(keys[algorithm], digest, bodies[algorithm],
+                                                    max_pages, max_chars)
+        cached = {algorithm for algorithm, result in results.items() if result is not None}
+        missing = [algorithm for algorithm in body.algorithms if algorithm not in cached]
+        if missing:
+            with admitted(pdf_content, missing, max_pages):
+                with stage('extraction'):
+                    pages = document_pages(
+                        pdf_content, digest, max_pages, max_chars, body.page_sampling
+                    )
+                try:
+                    fresh = compare_pages(
+                        summarizer, timed_iter(pages, 'extraction'), missing,
+                        body.num_sentences, llm_prefilter=body.llm_prefilter,
+                        llm_token_budget=body.llm_token_budget, digest=digest,
+                    )
+                except InsufficientTextError as e:
+                    raise UploadError(str(e))
+            for algorithm, result in fresh.items():
+                results[algorithm] = result
+                if 'error' not in result:
+                    result.update(max_pages=max_pages, max_chars=max_chars, section_budget=None)
+                    seconds = result.pop('seconds')
+                    store_summary(keys[algorithm], digest, bodies[algorithm], result)
+                    result['seconds'] = seconds
+
+    entries = []
+    for algorithm in body.algorithms:
+        result = results[algorithm]
+        if 'error' in result:
+            entries.append({'success': False, 'algorithm': algorithm, 'error': result['error'],
+                            'seconds': result['seconds']})
+            continue
+        from_cache = algorithm in cached
+        seconds = 0.0 if from_cache else result.pop('seconds')
+        record_summary(bodies[algorithm], result, {'total': seconds}, from_cache)
+        response = build_response(filename, bodies[algorithm], result, from_cache)
+        response['seconds'] = seconds
+        entries.append(response)
+    response = {
+        'success': True,
+        'filename': filename,
+        'algorithms': body.algorithms,
+        'results': entries,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+    if body.timings:
+        response['timings'] = timings.as_dict()
+    return response
+
+@app.route('/summarize/compare', methods=['POST'])
+@instrumented('compare')
+def compare_summaries():
+    """Summarize one PDF with several algorithms at once (form field `algorithms`)."""
+    try:
+        with collect():
+            with stage('upload'):
+                file, body = parse_compare()
+                pdf_content = upload_source(file)
+            return jsonify(compare_upload(pdf_content, file.filename, body))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
+    except OverloadedError as e:
+        return overloaded(e)
+    except Exception as e:
+        logger.exception("Internal error while comparing summaries")
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+@app.route('/jobs', methods=['POST'])
+@instrumented('jobs')
+def submit_job():
+    """Queue a summary in the background; poll GET /jobs/<job_id> for the result."""
+    try:
+        file, body = parse_upload()
+        pdf_content = keep_upload(upload_source(file)) # the request's spool file is removed
         try:
-            body = SummarizeRequest(
-                algorithm=request.form.get('algorithm', 'llm'),
-                num_sentences=int(request.form.get('num_sentences', 3)),
-            )
-        except (ValueError, TypeError):
-            return jsonify({'error': 'Invalid request parameters'}), 400
+            job_id = job_manager.submit(summarize_job, pdf_content, file.filename, body)
+        except Exception:
+            discard_upload(pdf_content)
+            raise
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(JOB_RETRY_AFTER)}
+    except Exception as e:
+        logger.exception("Internal error while queueing a summary job")
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+    return jsonify({
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': f'/jobs/{job_id}',
+    }), 202
 
+def summarize_job(pdf_content, filename, body, progress=None):
+    """Background job: summarize_upload, then remove the job's copy of the upload."""
+    try:
+        # the job's thread isn't a request thread, so it waits for room instead of failing
+        return summarize_upload(pdf_content, filename, body, progress, wait=True)
+    finally:
+        discard_upload(pdf_content)
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Status, progress and (once finished) the /summarize result of a background job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+def batch_limits():
+    """(max files, max total bytes) for one /summarize/batch request."""
+    return (
+        max(1, env_number('BATCH_MAX_FILES', 20, int)),
+        int(env_number('BATCH_MAX_TOTAL_MB', 50) * 1024 * 1024),
+    )
+
+def zip_members(archive, max_files, max_bytes):
+    """Yield (filename, size, content_type, read) for each file of an uploaded zip."""
+    try:
+        bundle = zipfile.ZipFile(archive)
+        members = [
+            info for info in bundle.infolist()
+            if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+        ]
+    except zipfile.BadZipFile:
+        raise UploadError(f'{archive.filename}: not a valid zip archive')
+    if len(members) > max_files:
+        raise UploadError(f'Too many files in batch. Maximum is {max_files}.')
+    # uncompressed sizes are checked before anything is inflated
+    if sum(info.file_size for info in members) > max_bytes:
+        raise UploadError(f'Batch too large. Maximum total size is {max_bytes // (1024 * 1024)}MB.')
+    for info in members:
+        yield os.path.basename(info.filename), info.file_size, '', partial(bundle.read, info)
+
+def parse_batch():
+    """
+    Validate a /summarize/batch form; returns (entries, body)
+    Each entry is a dict with the filename and either the PDF bytes or the validation error, so one
+    bad file is reported in its own result instead of failing the whole batch.
+    """
+    uploads = request.files.getlist('files') + request.files.getlist('file')
+    if not uploads:
+        raise UploadError('No files uploaded')
+    body = parse_params()
+    max_files, max_bytes = batch_limits()
+
+    candidates = []
+    for upload in uploads:
+        size = upload.seek(0, 2)
+        upload.seek(0)
+        if (upload.filename or '').lower().endswith(ZIP_EXTENSIONS):
+            candidates.extend(zip_members(upload, max_files, max_bytes))
+        else:
+            candidates.append((upload.filename, size, upload.content_type, upload.read))
+    if len(candidates) > max_files:
+        raise UploadError(f'Too many files in batch. Maximum is {max_files}.')
+    if sum(size for _, size, _, _ in candidates) > max_bytes:
+        raise UploadError(f'Batch too large. Maximum total size is {max_bytes // (1024 * 1024)}MB.')
+
+    entries = []
+    for filename, size, content_type, read in candidates:
         try:
-            FileValidation.validate_file(
-                file.filename,
-                file.seek(0, 2),
-                file.content_type,
-            )
-            file.seek(0)
+            FileValidation.validate_file(filename, size, content_type)
+            entries.append({'filename': filename, 'content': read()})
         except ValueError as ve:
-            return jsonify({'error': str(ve)}), 400
+            entries.append({'filename': filename, 'error': str(ve)})
 
-        logger.info(f"Processing request: File={file.filename}, Algo={body.algorithm}, Sentences={body.num_sentences}")
+    logger.info(
+        f"Processing batch: Files={len(entries)}, Algo={body.algorithm}, "
+        f"Sentences={body.num_sentences}"
+    )
+    return entries, body
 
-        pdf_content = file.read()
-        extracted_text = extract_text_from_pdf(pdf_content)
+def batch_error(filename, error):
+    return {'success': False, 'filename': filename, 'error': error}
 
-        if not extracted_text or len(extracted_text.strip()) < 50:
-            return jsonify({'error': 'Insufficient text content in PDF for summarization.'}), 400
+def run_batch(entries, body):
+    """
+    Summarize a batch; yields (index, result) as files finish
+    Cache hits are answered here; the rest run on the batch process pool (or inline with
+    BATCH_WORKERS <= 1) and their results are cached like single uploads.
+    """
+    max_pages, max_chars = page_budget(body)
+    workers = batch_workers()
+    pending = {}
+    for index, entry in enumerate(entries):
+        filename = entry['filename']
+        if 'error' in entry:
+            yield index, batch_error(filename, entry['error'])
+            continue
+        if workers <= 1:
+            try:
+                yield index, summarize_upload(entry['content'], filename, body, admit=False)
+            except Exception as e:
+                logger.warning(f"Batch item {filename} failed: {e}")
+                yield index, batch_error(filename, str(e))
+            continue
 
-        summary_result = summarizer.generate_summary(
-            text=extracted_text,
-            method=body.algorithm,
-            num_sentences=body.num_sentences
+        digest = content_hash(entry['content'])
+        cache_key = summary_cache_key(digest, body, max_pages, max_chars)
+        cached = cached_summary(cache_key, digest, body, max_pages, max_chars)
+        if cached is not None:
+            yield index, build_response(filename, body, cached, from_cache=True)
+            continue
+        future = get_batch_pool().submit(
+            summarize_pdf_bytes, entry['content'], body.algorithm, body.num_sentences,
+            max_pages, max_chars, body.page_sampling, body.llm_prefilter, body.llm_token_budget,
+            section_budget(body), digest,
         )
+        pending[future] = (index, filename, digest, cache_key)
 
-        return jsonify({
-            'success': True,
-            'filename': file.filename,
-            'summary': summary_result['summary'],
-            'algorithm_used': summary_result['algorithm'],
-            'statistics': {
-                'original_length': len(extracted_text),
-                'summary_length': len(summary_result['summary']),
-                'original_word_count': summary_result['original_word_count'],
-                'summary_word_count': summary_result['summary_word_count'],
-                'original_sentences': summary_result['original_sentences'],
-                'summary_sentences': summary_result['sentences_requested'],
-                'compression_ratio': summary_result['compression_ratio']
-            },
-            'parameters': {
-                'algorithm': body.algorithm,
-                'num_sentences': body.num_sentences
-            }
-        })
+    try:
+        for future in as_completed(pending):
+            index, filename, digest, cache_key = pending[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning(f"Batch item {filename} failed: {e}")
+                yield index, batch_error(filename, str(e))
+                continue
+            timings = result.pop('timings') # measured in the worker process; not cached
+            record_summary(body, result, timings, from_cache=False)
+            result.update(
+                max_pages=max_pages, max_chars=max_chars, section_budget=section_budget(body)
+            )
+            store_summary(cache_key, digest, body, result)
+            response = build_response(filename, body, result, from_cache=False)
+            if body.timings:
+                response['timings'] = timings
+            yield index, response
+    finally:
+        # a streaming client may disconnect mid-batch
+        for future in pending:
+            future.cancel()
+
+def wants_ndjson():
+    return (
+        request.form.get('stream', '').lower() in ('1', 'true')
+        or request.accept_mimetypes.best == 'application/x-ndjson'
+    )
 
+@app.route('/summarize/batch', methods=['POST'])
+@instrumented('batch')
+def summarize_batch():
+    """Summarize many PDFs (multiple `files` fields and/or zip archives) in one request."""
+    try:
+        entries, body = parse_batch()
+        # the whole batch is admitted at once, cached files included
+        cost = sum(
+            upload_cost(entry['content'], [body.algorithm], page_budget(body)[0])
+            for entry in entries if 'content' in entry
+        )
+        ticket = admission.acquire([body.algorithm], cost)
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
+    except OverloadedError as e:
+        return overloaded(e)
     except Exception as e:
-        logger.exception("Internal error during summarization")
+        logger.exception("Internal error while reading a batch upload")
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+    if wants_ndjson():
+        def lines():
+            try:
+                for index, result in run_batch(entries, body):
+                    yield json.dumps({'index': index, **result}) + '\n'
+            finally:
+                admission.release(ticket)
+        response = Response(stream_with_context(lines()), mimetype='application/x-ndjson')
+        # a generator that never started has no finally to run
+        response.call_on_close(partial(admission.release, ticket))
+        return response
+
+    try:
+        results = [None] * len(entries)
+        for index, result in run_batch(entries, body):
+            results[index] = result
+    except Exception as e:
+        logger.exception("Internal error during batch summarization")
         return jsonify({'error': f'Server error: {str(e)}'}), 500
+    finally:
+        admission.release(ticket)
+
+    succeeded = sum(1 for result in results if result['success'])
+    return jsonify({
+        'success': True,
+        'count': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results,
+    })
+
+def warm_up():
+    """Load the summarizer's libraries and data now; gunicorn.conf.py runs this before forking."""
+    summarizer.warm_up()
+
+def cache_hit_ratios(total):
+    ratios = {}
+    for cache in (summary_cache, extraction_cache, ranking_cache):
+        hits = total('cache_requests_total', cache=cache.name, result='hit')
+        lookups = hits + total('cache_requests_total', cache=cache.name, result='miss')
+        ratios[('cache_hit_ratio', (('cache', cache.name),))] = hits / lookups if lookups else 0.0
+    return ratios
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus text-format metrics, summed over every worker sharing the metrics database."""
+    return Response(metrics.render(derived=cache_hit_ratios),
+                    mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     # Use environment variable for port, default to 5000
@@ -0,0 +1 @@
+"""Offline benchmark harness: synthetic documents, a fake LLM and the stage timer (run.py)."""
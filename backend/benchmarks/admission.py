@@ -0,0 +1,100 @@
+"""
+Benchmark admission control: /health latency while a worker is flooded with large summaries
+    python -m benchmarks.admission --requests 12 --pages 200
+
+One gunicorn gthread worker is modelled by a fixed pool of ``--threads`` request threads running
+the Flask app in-process. ``--requests`` distinct (uncached) PDFs are posted at once, and a /health
+probe is queued every ``--probe-interval`` seconds until they are all answered. Each run is done
+without admission control and with the defaults from the environment. Reported per run: /health
+latency (median and max, including time waiting for a free thread), summaries answered and
+rejected with 503, and the wall time until every request was answered.
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import build_pdf, synthetic_pages  # noqa: E402
+
+
+def post(client, pdf, algorithm):
+    data = {'file': (io.BytesIO(pdf), 'load.pdf', 'application/pdf'), 'algorithm': algorithm}
+    return client.post('/summarize', data=data, content_type='multipart/form-data').status_code
+
+
+def probe(client, queued_at):
+    client.get('/health')
+    return time.perf_counter() - queued_at
+
+
+def flood(app_module, pdfs, algorithm, threads, probe_interval):
+    for cache in (app_module.summary_cache, app_module.extraction_cache, app_module.ranking_cache):
+        cache.clear()
+    client = app_module.app.test_client()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        summaries = [pool.submit(post, client, pdf, algorithm) for pdf in pdfs]
+        probes = []
+        while not all(future.done() for future in summaries):
+            probes.append(pool.submit(probe, client, time.perf_counter()))
+            time.sleep(probe_interval)
+        statuses = [future.result() for future in summaries]
+        latencies = [future.result() for future in probes]
+    latencies = latencies or [0.0]
+    return {
+        'health_p50_seconds': round(statistics.median(latencies), 4),
+        'health_max_seconds': round(max(latencies), 4),
+        'health_probes': len(latencies),
+        'answered': statuses.count(200),
+        'rejected_503': statuses.count(503),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def run(requests=12, pages=200, algorithm='textrank', threads=4, probe_interval=0.1):
+    import app as app_module
+    from admission import AdmissionController
+
+    pdfs = [build_pdf(synthetic_pages(pages, seed=seed)) for seed in range(requests)]
+    admission = app_module.admission
+    unlimited = AdmissionController(budget=float('inf'), max_active=10**6, max_queued=10**6)
+    results = {}
+    try:
+        for name, controller in (('unlimited', unlimited), ('admission', admission)):
+            app_module.admission = controller
+            results[name] = flood(app_module, pdfs, algorithm, threads, probe_interval)
+    finally:
+        app_module.admission = admission
+    return {
+        'requests': requests,
+        'pages': pages,
+        'algorithm': algorithm,
+        'threads': threads,
+        'admission': admission.stats(),
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=12, help='summaries posted at once')
+    parser.add_argument('--pages', type=int, default=200, help='pages per PDF')
+    parser.add_argument('--algorithm', default='textrank', help='algorithm of every summary')
+    parser.add_argument('--threads', type=int, default=4, help='request threads (GUNICORN_THREADS)')
+    parser.add_argument('--probe-interval', type=float, default=0.1, help='seconds between probes')
+    args = parser.parse_args(argv)
+    report = run(max(1, args.requests), max(1, args.pages), args.algorithm, max(1, args.threads),
+                 max(0.01, args.probe_interval))
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""A local stand-in for the Gemini model: same ``generate_content`` interface, no network."""
+import threading
+import time
+from types import SimpleNamespace
+
+
+class FakeModel:
+    """
+    Answers every prompt with a short canned summary and records the calls.
+
+    ``delay`` seconds are slept per call, so concurrency can be observed through
+    ``max_in_flight``; prompts containing ``fail_on`` raise like an API error would. With
+    ``stream=True`` the reply comes back word by word, ``delay`` spread over the words, like
+    Gemini's streaming responses.
+    """
+
+    def __init__(self, delay=0.0, fail_on=None, reply="Summary of {chars} characters."):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.reply = reply
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        if stream:
+            return self._stream(prompt)
+        with self._lock:
+            self.prompts.append(prompt)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            if self.fail_on and self.fail_on in prompt:
+                raise RuntimeError("quota exceeded")
+            return SimpleNamespace(text=self.reply.format(chars=len(prompt)))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _stream(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+        if self.fail_on and self.fail_on in prompt:
+            raise RuntimeError("quota exceeded")
+        words = self.reply.format(chars=len(prompt)).split(' ')
+        for index, word in enumerate(words):
+            if self.delay:
+                time.sleep(self.delay / len(words))
+            yield SimpleNamespace(text=word if index == 0 else f" {word}")
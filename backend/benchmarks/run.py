@@ -0,0 +1,200 @@
+"""
+Benchmark extraction and every summarization algorithm across document sizes
+
+    python -m benchmarks.run --sizes 1 10 100 --output bench_results.json
+    python -m benchmarks.run --baseline bench_results.json
+
+Synthetic PDFs are generated locally and the LLM path runs against a fake model, so no network
+access is needed. Each stage reports the median wall time of ``--repeat`` runs and the peak
+Python/NumPy allocation of one extra traced run.
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adv_summ import AdvSummarizer  # noqa: E402
+from benchmarks.fake_llm import FakeModel  # noqa: E402
+from benchmarks.synthetic import build_pdf, synthetic_pages  # noqa: E402
+from document import PreprocessedDocument  # noqa: E402
+from extraction import extract_pages  # noqa: E402
+from tfidf import tfidf_matrix  # noqa: E402
+
+DEFAULT_SIZES = (1, 10, 100, 500, 2000)
+QUICK_SIZES = (1, 10, 100)
+ALGORITHMS = ('frequency', 'tfidf', 'textrank', 'llm')
+
+
+def measure(fn, repeat):
+    """Median/min seconds over ``repeat`` calls, then the peak traced allocation of one more."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'seconds': round(statistics.median(times), 6),
+        'min_seconds': round(min(times), 6),
+        'peak_mb': round(peak / (1024 * 1024), 3),
+    }
+
+
+def fresh(doc):
+    """The same sentences without cached token lists, so tokenization is measured again."""
+    return PreprocessedDocument(
+        doc.raw_text, doc.text, doc.sentences, doc.stop_words, doc.tokenizer
+    )
+
+
+def bench_size(summarizer, page_count, repeat, llm_latency):
+    pages = synthetic_pages(page_count)
+    pdf = build_pdf(pages)
+    doc = summarizer.preprocess_pages(pages)
+    doc.sentence_terms  # warm the token caches for the scoring stages
+    summarizer.model = FakeModel(delay=llm_latency)
+    vectors = None
+
+    def tfidf_vectors():
+        nonlocal vectors
+        vectors = tfidf_matrix(doc.sentence_terms)
+
+    tfidf_vectors()
+    graph = summarizer.textrank.similarity_graph(vectors)
+
+    stages = {
+        'extraction': lambda: extract_pages(pdf),
+        'cleaning': lambda: [summarizer.clean_text(page) for page in pages],
+        'sentence_split': lambda: summarizer.preprocess_pages(pages),
+        'word_tokenize': lambda: fresh(doc).sentence_terms,
+        'frequency_scoring': lambda: summarizer.frequency_summarize(doc, 3),
+        'tfidf_scoring': lambda: summarizer.tfidf_scores(doc),
+        'textrank_vectors': tfidf_vectors,
+        'textrank_graph': lambda: summarizer.textrank.similarity_graph(vectors),
+        'textrank_ranking': lambda: summarizer.textrank.rank(graph),
+    }
+    text = '\n'.join(pages)
+    for algorithm in ALGORITHMS:
+        stages[f'summarize_{algorithm}'] = (
+            lambda algorithm=algorithm: summarizer.generate_summary(text, algorithm, 3)
+        )
+
+    results = {}
+    for name, fn in stages.items():
+        results[name] = measure(fn, repeat)
+        print(f"  {page_count:>5} pages  {name:<20} {results[name]['seconds']:>10.4f}s "
+              f"{results[name]['peak_mb']:>9.1f} MB", file=sys.stderr)
+    return {
+        'pages': page_count,
+        'chars': len(text),
+        'sentences': len(doc.sentences),
+        'stages': results,
+    }
+
+
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / (1024 * 1024), 1)
+
+
+def run(sizes, repeat=3, llm_latency=0.0):
+    summarizer = AdvSummarizer()
+    results = [bench_size(summarizer, size, repeat, llm_latency) for size in sizes]
+    return {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+            'llm_latency': llm_latency,
+            'max_rss_mb': max_rss_mb(),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance=0.25, min_seconds=0.005):
+    """
+    Stages that got slower than the baseline by more than ``tolerance`` (a fraction)
+    Stages faster than ``min_seconds`` in both runs are timer noise and never flagged.
+    """
+    previous = {entry['pages']: entry['stages'] for entry in baseline['results']}
+    regressions = []
+    for entry in current['results']:
+        for stage, stats in entry['stages'].items():
+            old = previous.get(entry['pages'], {}).get(stage)
+            if old is None or max(old['seconds'], stats['seconds']) < min_seconds:
+                continue
+            ratio = stats['seconds'] / max(old['seconds'], 1e-9)
+            if ratio > 1 + tolerance:
+                regressions.append({
+                    'pages': entry['pages'],
+                    'stage': stage,
+                    'baseline_seconds': old['seconds'],
+                    'seconds': stats['seconds'],
+                    'ratio': round(ratio, 2),
+                })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', help='page counts to benchmark')
+    parser.add_argument('--quick', action='store_true', help=f'shorthand for --sizes {QUICK_SIZES}')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage')
+    parser.add_argument('--llm-latency', type=float, default=0.0,
+                        help='seconds the fake model sleeps per call')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='compare against a previous results file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown against the baseline (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline: # read first: --output may overwrite the same file
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    report = run(sizes, max(1, args.repeat), args.llm_latency)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['pages']} pages {r['stage']}: {r['baseline_seconds']:.4f}s -> "
+                  f"{r['seconds']:.4f}s (x{r['ratio']})", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} of {args.baseline}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Measure worker startup: the time to import the app and its max RSS, cold and after warm-up
+
+    python -m benchmarks.startup --runs 5
+
+Each run is a fresh interpreter, like a gunicorn worker without preload.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter() - started
+if {warm}:
+    app.warm_up()
+scale = 1 if sys.platform == 'darwin' else 1024
+print(json.dumps({{
+    'import_seconds': imported,
+    'ready_seconds': time.perf_counter() - started,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / (1024 * 1024),
+}}))
+"""
+
+
+def probe(warm):
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE.format(warm=warm)],
+        cwd=BACKEND, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def measure(runs):
+    report = {}
+    for name, warm in (('import', False), ('import_and_warm_up', True)):
+        samples = [probe(warm) for _ in range(runs)]
+        report[name] = {
+            key: round(statistics.median(sample[key] for sample in samples), 3)
+            for key in samples[0]
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per measurement')
+    args = parser.parse_args(argv)
+    json.dump(measure(max(1, args.runs)), sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
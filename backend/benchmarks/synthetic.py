@@ -0,0 +1,81 @@
+"""
+Synthetic documents for benchmarks and tests
+Deterministic English-like text and minimal text PDFs, built without any PDF-writing dependency
+"""
+import itertools
+import random
+import textwrap
+
+# Frequent function words plus a Zipf-distributed content vocabulary, so term statistics look like
+# real prose (a few very common words, a long tail of rare ones)
+FUNCTION_WORDS = (
+    "the of and to in a is that for it as was with be by on not he this are or his from at "
+    "which but have an they you were her she there been one all we their has would when"
+).split()
+SYLLABLES = ("ka", "ro", "mi", "tan", "el", "vor", "is", "pe", "lu", "dra", "on", "sel", "ti",
+             "mar", "ex", "qua", "ben", "hol", "ri", "ust")
+
+
+def _vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def synthetic_pages(page_count, chars_per_page=2500, seed=0, vocabulary_size=5000):
+    """``page_count`` pages of sentences, each about ``chars_per_page`` long, wrapped in lines."""
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(rng, vocabulary_size)
+    cum_weights = list(itertools.accumulate(1.0 / rank for rank in range(1, vocabulary_size + 1)))
+    pages = []
+    for _ in range(page_count):
+        sentences, size = [], 0
+        while size < chars_per_page:
+            words = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(8, 24))
+            words = [rng.choice(FUNCTION_WORDS) if rng.random() < 0.4 else w for w in words]
+            sentence = " ".join(words).capitalize() + "."
+            sentences.append(sentence)
+            size += len(sentence) + 1
+        pages.append("\n".join(textwrap.wrap(" ".join(sentences), width=90)))
+    return pages
+
+
+def build_pdf(pages, padding_bytes=0):
+    """
+    Minimal single-font PDF with one text page per entry in ``pages``. ``padding_bytes`` adds a
+    binary stream of that size that text extraction never reads, like an embedded image.
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    if padding_bytes:
+        block = random.Random(0).randbytes(min(padding_bytes, 1 << 20))
+        padding = (block * (padding_bytes // len(block) + 1))[:padding_bytes].decode("latin-1")
+        objects.append(f"<< /Length {padding_bytes} >>\nstream\n{padding}\nendstream")
+    kids = []
+    for text in pages:
+        lines = []
+        for line in text.splitlines() or [""]:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            lines.append(f"({escaped}) Tj T*")
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n".encode()
+    out += f"startxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
@@ -0,0 +1,97 @@
+"""
+Benchmark TextRank's LSH similarity graph against the exact one on large documents
+    python -m benchmarks.textrank_lsh --pages 400,2000
+
+Each document is ranked twice, once with every sentence pair compared and once with the SimHash
+approximation (see ``lsh``). Reported per document: the time to build each graph, its edges, and
+how far the approximate ranking agrees with the exact one: the overlap of the top 10 sentences
+(a 10-sentence summary) and of the top 1%, and the Spearman correlation of all scores. The
+documents are synthetic pages plus the prose of Python's documentation topics joined into one.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from benchmarks.synthetic import synthetic_pages  # noqa: E402
+from benchmarks.tokenization import prose_documents  # noqa: E402
+from textrank import TextRank  # noqa: E402
+from tfidf import tfidf_matrix  # noqa: E402
+
+
+def overlap(exact, approximate, k):
+    """Share of the exact ranking's top ``k`` sentences that the approximate top ``k`` has too."""
+    k = max(1, min(k, len(exact)))
+    top = set(np.argsort(-exact, kind='stable')[:k].tolist())
+    return len(top & set(np.argsort(-approximate, kind='stable')[:k].tolist())) / k
+
+
+def spearman(a, b):
+    ranks_a = np.argsort(np.argsort(a, kind='stable')).astype(float)
+    ranks_b = np.argsort(np.argsort(b, kind='stable')).astype(float)
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+def timed_graph(textrank, vectors):
+    started = time.perf_counter()
+    graph = textrank.similarity_graph(vectors)
+    return graph, time.perf_counter() - started
+
+
+def compare(name, text, permutations, block):
+    from adv_summ import AdvSummarizer
+    from tokenization import RegexTokenizer
+    summarizer = AdvSummarizer()
+    summarizer.tokenizer = RegexTokenizer()
+    doc = summarizer.preprocess(text)
+    vectors = tfidf_matrix(doc.sentence_terms)
+    exact = TextRank(approximate_size=None)
+    approximate = TextRank(approximate_size=0, lsh_permutations=permutations, lsh_block=block)
+    exact_graph, exact_seconds = timed_graph(exact, vectors)
+    lsh_graph, lsh_seconds = timed_graph(approximate, vectors)
+    exact_scores, lsh_scores = exact.rank(exact_graph), approximate.rank(lsh_graph)
+    return {
+        'document': name,
+        'sentences': len(doc),
+        'exact_seconds': round(exact_seconds, 3),
+        'lsh_seconds': round(lsh_seconds, 3),
+        'exact_edges': int(exact_graph.nnz),
+        'lsh_edges': int(lsh_graph.nnz),
+        'top10_overlap': round(overlap(exact_scores, lsh_scores, 10), 4),
+        'top1pct_overlap': round(overlap(exact_scores, lsh_scores, len(doc) // 100), 4),
+        'spearman': round(spearman(exact_scores, lsh_scores), 4),
+    }
+
+
+def run(pages=(400, 2000), prose=True, permutations=4, block=512):
+    documents = [(f'synthetic_{count}_pages', ' '.join(synthetic_pages(count))) for count in pages]
+    if prose:
+        documents.append(('pydoc_topics', ' '.join(prose_documents(synthetic=0))))
+    return {
+        'permutations': permutations,
+        'block': block,
+        'results': [compare(name, text, permutations, block) for name, text in documents],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', default='400,2000', help='comma-separated synthetic page counts')
+    parser.add_argument('--permutations', type=int, default=4, help='signature orders per graph')
+    parser.add_argument('--block', type=int, default=512, help='rows compared together')
+    parser.add_argument('--no-prose', action='store_true', help='skip the documentation corpus')
+    args = parser.parse_args(argv)
+    pages = [int(count) for count in args.pages.split(',') if count.strip()]
+    report = run(pages, not args.no_prose, max(1, args.permutations), max(2, args.block))
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Benchmark the tokenizer backends: agreement of the regex tokenizer with NLTK, and throughput
+    python -m benchmarks.tokenization --repeat 3
+
+The corpus is the prose of Python's bundled documentation topics (about 0.3 MB of real English;
+indented code samples are dropped) plus synthetic pages. Agreement is reported as sentence-boundary
+precision/recall against Punkt, the share of sentences whose TF-IDF terms are identical, and the
+overlap of the summaries each backend selects. Throughput is the best of ``--repeat`` runs in MB/s.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_pages  # noqa: E402
+from cleaning import TextCleaner  # noqa: E402
+from document import PreprocessedDocument  # noqa: E402
+from tokenization import NltkTokenizer, RegexTokenizer  # noqa: E402
+
+
+def prose_documents(synthetic=20):
+    """Cleaned documents: one per documentation topic, then ``synthetic`` one-page documents."""
+    from pydoc_data.topics import topics
+    cleaner = TextCleaner(page_numbers=False, fractions=False)
+    documents = []
+    for name in sorted(topics):
+        paragraphs = [
+            p for p in topics[name].split('\n\n')
+            if p.strip() and not p.startswith(' ') and not set(p.strip()) <= set('*=-')
+        ]
+        documents.append(cleaner.clean(' '.join(paragraphs)))
+    documents.extend(cleaner.clean(page) for page in synthetic_pages(synthetic))
+    return [document for document in documents if document]
+
+
+def boundaries(text, sentences):
+    """End offset of each sentence in the text."""
+    ends, position = set(), 0
+    for sentence in sentences:
+        start = text.find(sentence, position)
+        position = (start if start >= 0 else position) + len(sentence)
+        ends.add(position)
+    return ends
+
+
+def terms(sentences, tokenizer):
+    return PreprocessedDocument('', '', sentences, set(), tokenizer).sentence_terms
+
+
+def agreement(documents, reference, candidate):
+    true_positive = found = expected = 0
+    same_terms = sentences = 0
+    for text in documents:
+        expected_sentences = reference.sentences(text)
+        ends = boundaries(text, expected_sentences)
+        candidate_ends = boundaries(text, candidate.sentences(text))
+        true_positive += len(ends & candidate_ends)
+        expected += len(ends)
+        found += len(candidate_ends)
+        # word tokens compared on the same sentences, so boundary errors don't count twice
+        pairs = zip(terms(expected_sentences, reference), terms(expected_sentences, candidate))
+        same_terms += sum(a == b for a, b in pairs)
+        sentences += len(expected_sentences)
+    precision = true_positive / max(found, 1)
+    recall = true_positive / max(expected, 1)
+    return {
+        'sentence_precision': round(precision, 4),
+        'sentence_recall': round(recall, 4),
+        'sentence_f1': round(2 * precision * recall / max(precision + recall, 1e-12), 4),
+        'identical_terms': round(same_terms / max(sentences, 1), 4),
+    }
+
+
+def summary_overlap(documents, reference, candidate, num_sentences=3):
+    """Share of the reference summary sentences each algorithm also selects with the candidate."""
+    from adv_summ import AdvSummarizer
+    summarizer = AdvSummarizer()
+    summarizer.idf_store = None
+    overlap = {}
+    for method in ('frequency', 'tfidf', 'textrank'):
+        shared = total = 0
+        for text in documents:
+            chosen = []
+            for tokenizer in (reference, candidate):
+                summarizer.tokenizer = tokenizer
+                doc = summarizer.preprocess(text)
+                summary = summarizer.generate_summary(
+                    doc, method=method, num_sentences=num_sentences
+                )['summary']
+                chosen.append({s for s in doc.sentences if s in summary})
+            shared += len(chosen[0] & chosen[1])
+            total += len(chosen[0])
+        overlap[method] = round(shared / max(total, 1), 4)
+    return overlap
+
+
+def throughput(tokenizer, documents, repeat):
+    size = sum(len(document.encode('utf-8')) for document in documents)
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for document in documents:
+            tokenizer.words(tokenizer.sentences(document))
+        best = min(best, time.perf_counter() - started)
+    return {'seconds': round(best, 6), 'mb_per_second': round(size / best / 1e6, 2)}
+
+
+def run(repeat=3, synthetic=20, documents=None):
+    documents = documents if documents is not None else prose_documents(synthetic)
+    nltk, regex = NltkTokenizer(), RegexTokenizer()
+    return {
+        'documents': len(documents),
+        'mb': round(sum(len(document.encode('utf-8')) for document in documents) / 1e6, 3),
+        'agreement': agreement(documents, nltk, regex),
+        'summary_overlap': summary_overlap(documents, nltk, regex),
+        'throughput': {
+            tokenizer.name: throughput(tokenizer, documents, repeat) for tokenizer in (nltk, regex)
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per backend')
+    parser.add_argument('--synthetic', type=int, default=20, help='synthetic pages to add')
+    args = parser.parse_args(argv)
+    json.dump(run(max(1, args.repeat), max(0, args.synthetic)), sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
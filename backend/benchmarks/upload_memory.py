@@ -0,0 +1,97 @@
+"""
+Measure the peak RSS of summarizing one upload as its size grows, buffered vs. spooled
+
+    python -m benchmarks.upload_memory --sizes 8 32 128
+
+Each size is a PDF of --pages text pages plus that many MB of embedded binary data, written to a
+temporary file. In a fresh interpreter per run, 'buffered' reads the upload into bytes (as
+``file.read()`` did) and hashes and extracts it from memory; 'spooled' hashes the file in chunks
+and extracts it through a memory map, as /summarize now does with a spooled upload. Reported
+is the growth of peak RSS over the same interpreter after a warm-up extraction.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import build_pdf, synthetic_pages  # noqa: E402
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, os, resource, sys
+os.environ['EXTRACTION_WORKERS'] = '0'
+from benchmarks.synthetic import build_pdf
+from cache import content_hash
+from extraction import extract_pages
+
+def peak_rss_mb():
+    try: # Linux: VmHWM, which reset_peak() clears (ru_maxrss starts at the parent's peak)
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmHWM')) / 1024
+    except OSError:
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / (1024 * 1024)
+
+def reset_peak():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+extract_pages(build_pdf(['warm up']))
+reset_peak()
+before = peak_rss_mb()
+path = {path!r}
+if {buffered}:
+    with open(path, 'rb') as f:
+        source = f.read()
+else:
+    source = path
+content_hash(source)
+pages = extract_pages(source)
+print(json.dumps({{'pages': len(pages), 'rss_growth_mb': peak_rss_mb() - before}}))
+"""
+
+
+def probe(path, buffered):
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE.format(path=path, buffered=buffered)],
+        cwd=BACKEND, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(sizes_mb=(8, 32, 128), page_count=50):
+    pages = synthetic_pages(page_count)
+    results = []
+    for size in sizes_mb:
+        with tempfile.NamedTemporaryFile(suffix='.pdf') as pdf:
+            pdf.write(build_pdf(pages, padding_bytes=int(size * 1024 * 1024)))
+            pdf.flush()
+            entry = {'file_mb': round(os.path.getsize(pdf.name) / (1024 * 1024), 1)}
+            for mode, buffered in (('buffered', True), ('spooled', False)):
+                growth = probe(pdf.name, buffered)['rss_growth_mb']
+                entry[f'{mode}_rss_growth_mb'] = round(growth, 1)
+            results.append(entry)
+    return {'pages': page_count, 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=float, nargs='+', default=[8, 32, 128],
+                        help='embedded data per PDF in MB')
+    parser.add_argument('--pages', type=int, default=50, help='text pages per PDF')
+    args = parser.parse_args(argv)
+    json.dump(run(args.sizes, max(1, args.pages)), sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Content-addressed caches for extracted text and summaries
+An in-process LRU with optional TTL, optionally backed by a SQLite file shared by all workers
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def sqlite_connection(db_path):
+    """A connection to the SQLite file at db_path in one transaction, closed afterwards."""
+    conn = sqlite3.connect(db_path, timeout=5)
+    try:
+        with conn:  # commits on success, rolls back on error
+            yield conn
+    finally:
+        conn.close()
+
+
+def content_hash(data: bytes | str) -> str:
+    """SHA-256 hex digest of the uploaded bytes, or of a spooled upload's file read in chunks."""
+    if isinstance(data, str):
+        with open(data, 'rb') as f:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    """
+    LRU cache of JSON-serializable values.
+
+    ``max_entries`` bounds the in-memory LRU; ``ttl`` (seconds, ``None`` for no expiry) applies to
+    both tiers. With ``db_path`` set, entries are also written to a SQLite table named after the
+    cache so every gunicorn worker sees them; the table is trimmed to ``max_disk_entries`` by
+    least-recent access. ``compress`` zlib-compresses values on disk.
+    """
+
+    def __init__(self, name: str, max_entries: int = 256, ttl: float | None = None,
+                 db_path: str | None = None, max_disk_entries: int = 10_000,
+                 compress: bool = False):
+        if not name.isidentifier():
+            raise ValueError("cache name must be a valid identifier")
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.db_path = db_path or None
+        self.max_disk_entries = max(1, max_disk_entries)
+        self.compress = compress
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float | None, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS {self.name} ('
+                    'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                    'expires_at REAL, accessed_at REAL NOT NULL)'
+                )
+
+    def _connect(self):
+        return sqlite_connection(self.db_path)
+
+    def _expiry(self) -> float | None:
+        return time.time() + self.ttl if self.ttl else None
+
+    def _encode(self, value) -> bytes:
+        data = json.dumps(value).encode('utf-8')
+        return zlib.compress(data) if self.compress else data
+
+    def _decode(self, data: bytes):
+        if self.compress:
+            data = zlib.decompress(data)
+        return json.loads(data)
+
+    def _remember(self, key: str, expires_at: float | None, value) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str, fresh: bool = False):
+        """
+        Return the cached value, or ``None`` on a miss or expired entry.
+        ``fresh`` reads through to the shared SQLite table, for values other workers may update.
+        """
+        now = time.time()
+        with self._lock:
+            entry = None if fresh and self.db_path else self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.db_path:
+            try:
+                value = self._disk_get(key, now)
+            except sqlite3.Error as e:
+                logger.warning(f"{self.name} cache read failed: {e}")
+                value = None
+            if value is not None:
+                self._count(hit=True)
+                return value
+
+        self._count(hit=False)
+        return None
+
+    def _disk_get(self, key: str, now: float):
+        with self._connect() as conn:
+            row = conn.execute(
+                f'SELECT value, expires_at FROM {self.name} WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            data, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                conn.execute(f'DELETE FROM {self.name} WHERE key = ?', (key,))
+                return None
+            conn.execute(f'UPDATE {self.name} SET accessed_at = ? WHERE key = ?', (now, key))
+        value = self._decode(data)
+        self._remember(key, expires_at, value)
+        return value
+
+    def set(self, key: str, value) -> None:
+        expires_at = self._expiry()
+        self._remember(key, expires_at, value)
+        if not self.db_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f'INSERT OR REPLACE INTO {self.name} (key, value, expires_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    (key, self._encode(value), expires_at, time.time()),
+                )
+                conn.execute(
+                    f'DELETE FROM {self.name} WHERE key IN (SELECT key FROM {self.name} '
+                    'ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                    (self.max_disk_entries,),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"{self.name} cache write failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute(f'DELETE FROM {self.name}')
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'backend': 'sqlite' if self.db_path else 'memory',
+            }
@@ -0,0 +1,107 @@
+"""
+Text normalization for extracted PDF pages
+Every artifact is removed by one precompiled pattern in a single scan, then whitespace is collapsed
+by str.split/join; repeated page headers and footers can be dropped as pages stream in
+"""
+import os
+import re
+from collections import Counter, deque
+
+# artifact name -> (pattern, characters a match can start with)
+ARTIFACTS = {
+    'page_numbers': (r'(?i:page)\s+\d+', 'Pp'),
+    'fractions': (r'\d+/\d+', r'\d'), # page counters like 3/12, dates like 12/12
+    # a word broken at a line end ("exam-\nple"); only joined when the next line starts lower case
+    'hyphenation': (r'(?<=\w)-[ \t]*\r?\n\s*(?=[a-z])', '-'),
+}
+
+MAX_EDGE_CHARS = 100 # longer first/last lines are body text, not headers or footers
+_DIGITS = re.compile(r'\d+')
+
+
+def _flag(name, default):
+    return os.getenv(name, str(default)).lower() == 'true'
+
+
+class TextCleaner:
+    """
+    Removes PDF artifacts and normalizes whitespace.
+
+    ``page_numbers`` drops "page 12", ``fractions`` drops "3/12", ``hyphenation`` joins words
+    hyphenated across a line break. With ``repeated_edges``, ``clean_pages`` also drops a page's
+    first or last line when another page, earlier or up to ``edge_window`` pages later, starts
+    or ends with the same line (digits ignored, so "Page 3 of 40" matches "Page 4 of 40").
+    """
+
+    def __init__(self, page_numbers=True, fractions=True, hyphenation=False,
+                 repeated_edges=False, edge_window=4):
+        enabled = [
+            ARTIFACTS[name] for name, on in (
+                ('hyphenation', hyphenation), # before fractions: "-\n" never starts a digit run
+                ('page_numbers', page_numbers),
+                ('fractions', fractions),
+            ) if on
+        ]
+        self._pattern = None
+        if enabled:
+            # the lookahead lets the scan skip every position no artifact can start at
+            first = ''.join(chars for _, chars in enabled)
+            alternatives = '|'.join(pattern for pattern, _ in enabled)
+            self._pattern = re.compile(f"(?=[{first}])(?:{alternatives})")
+        self.repeated_edges = repeated_edges
+        self.edge_window = max(1, edge_window)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            hyphenation=_flag('CLEAN_FIX_HYPHENATION', False),
+            repeated_edges=_flag('CLEAN_STRIP_HEADERS', False),
+        )
+
+    def clean(self, text):
+        """The text without artifacts, whitespace runs collapsed to one space and stripped."""
+        if self._pattern is not None:
+            text = self._pattern.sub('', text)
+        return ' '.join(text.split())
+
+    def clean_pages(self, pages):
+        """Yield ``(page, cleaned)`` for each page of an iterable, consuming it lazily."""
+        if not self.repeated_edges:
+            for page in pages:
+                yield page, self.clean(page)
+            return
+
+        # a page is cleaned once edge_window later pages were seen, so a header that starts
+        # on page 1 is recognized on page 1
+        counts = Counter()
+        window = deque()
+        for page in pages:
+            edges = _edges(page)
+            counts.update({key for _, key in edges})
+            window.append((page, edges))
+            if len(window) > self.edge_window:
+                yield self._without_edges(*window.popleft(), counts)
+        while window:
+            yield self._without_edges(*window.popleft(), counts)
+
+    def _without_edges(self, page, edges, counts):
+        repeated = {index for index, key in edges if counts[key] > 1}
+        if not repeated:
+            return page, self.clean(page)
+        lines = page.split('\n')
+        kept = '\n'.join(line for index, line in enumerate(lines) if index not in repeated)
+        return page, self.clean(kept)
+
+
+def _edges(page):
+    """(line index, key) of the page's first and last non-blank lines, if short enough."""
+    lines = page.split('\n')
+    filled = [index for index, line in enumerate(lines) if line.strip()]
+    if not filled:
+        return []
+    edges = []
+    for index in {filled[0], filled[-1]}:
+        line = lines[index].strip()
+        if len(line) <= MAX_EDGE_CHARS:
+            edges.append((index, _DIGITS.sub('#', line.lower())))
+    return edges
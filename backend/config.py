@@ -0,0 +1,20 @@
+"""
+Environment-driven settings shared by the backend modules
+Kept dependency-free so extraction worker processes can import it cheaply
+"""
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def env_number(name, default, cast=float):
+    """Read a numeric setting from the environment, falling back to the default if malformed."""
+    value = os.getenv(name)
+    if value is None or value.strip() == '':
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"Invalid value {value!r} for {name}; using default {default}")
+        return default
@@ -0,0 +1,86 @@
+"""
+Preprocessed document shared by every summarization algorithm
+The text is cleaned and sentence-split once; token lists are built on first use and reused
+"""
+import re
+from functools import cached_property
+
+from tokenization import NltkTokenizer, RegexTokenizer
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+
+
+class PreprocessedDocument:
+    """Cleaned text, sentence spans and token lists for a single document."""
+
+    def __init__(self, raw_text: str, text: str, sentences: list[str], stop_words: set[str],
+                 tokenizer: NltkTokenizer | RegexTokenizer | None = None):
+        self.raw_text = raw_text
+        self.text = text
+        self.sentences = sentences
+        self.stop_words = stop_words
+        self.tokenizer = tokenizer or NltkTokenizer()
+        # algorithm -> sentence indices best first, filled by the summarizer
+        self.rankings: dict[str, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    @cached_property
+    def spans(self) -> list[tuple[int, int]]:
+        """(start, end) character offsets of each sentence in the cleaned text."""
+        spans = []
+        pos = 0
+        for sentence in self.sentences:
+            start = self.text.find(sentence, pos)
+            if start < 0:
+                start = pos
+            end = start + len(sentence)
+            spans.append((start, end))
+            pos = end
+        return spans
+
+    @cached_property
+    def sentence_tokens(self) -> list[list[str]]:
+        """Lower-cased word tokens of each sentence."""
+        return self.tokenizer.words(self.sentences)
+
+    @cached_property
+    def sentence_terms(self) -> list[list[str]]:
+        """
+        Punctuation-free, stop-word-filtered terms of each sentence (TF-IDF input).
+        Derived from sentence_tokens; clitics such as "n't" and "'s" are glued back onto the
+        preceding word, so "don't" becomes "dont" as if punctuation was stripped first.
+        """
+        terms = []
+        for tokens in self.sentence_tokens:
+            words: list[str] = []
+            for token in tokens:
+                word = _PUNCTUATION.sub('', token)
+                if not word:
+                    continue
+                if words and (token.startswith("'") or token == "n't"):
+                    words[-1] += word
+                else:
+                    words.append(word)
+            terms.append([w for w in words if w not in self.stop_words and w.isalpha()])
+        return terms
+
+    @cached_property
+    def filtered_tokens(self) -> list[str]:
+        """Document-wide alphabetic, non-stop-word tokens."""
+        return [
+            word
+            for tokens in self.sentence_tokens
+            for word in tokens
+            if word.isalpha() and word not in self.stop_words
+        ]
+
+    @cached_property
+    def token_count(self) -> int:
+        return sum(len(tokens) for tokens in self.sentence_tokens)
+
+    @cached_property
+    def word_count(self) -> int:
+        """Whitespace word count of the raw (uncleaned) text, used for statistics."""
+        return len(self.raw_text.split())
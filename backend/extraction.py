@@ -0,0 +1,179 @@
+"""
+PDF text extraction
+Pages are yielded lazily, optionally under a page/character budget; large documents are split
+into page chunks and extracted on a shared, bounded process pool
+A PDF is given as bytes or as the path of a file, which is memory-mapped rather than read; pool
+workers then receive the path instead of a pickled copy of the document
+"""
+import io
+import logging
+import math
+import mmap
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pypdf
+
+from config import env_number
+from pools import SpawnPool
+
+logger = logging.getLogger(__name__)
+
+
+def extraction_workers():
+    """Size of the extraction pool; 0 or 1 disables parallel extraction."""
+    return max(0, env_number('EXTRACTION_WORKERS', min(4, os.cpu_count() or 1), int))
+
+
+def _limit_worker_memory():
+    # Runs in each pool process: cap its address space so one huge upload cannot exhaust the host
+    max_mb = env_number('EXTRACTION_WORKER_MAX_MB', 1024, int)
+    if max_mb <= 0:
+        return
+    try:
+        import resource
+        limit = max_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"Could not limit extraction worker memory: {e}")
+
+
+_pool = SpawnPool(
+    extraction_workers,
+    initializer=_limit_worker_memory,
+    max_tasks_per_child=lambda: env_number('EXTRACTION_TASKS_PER_CHILD', 50, int),
+)
+_get_pool = _pool.get
+shutdown_pool = _pool.shutdown
+
+
+def open_pdf(pdf_stream):
+    """PdfReader over PDF bytes or a PDF file, which is mapped into memory, not copied."""
+    if isinstance(pdf_stream, (bytes, bytearray)):
+        return pypdf.PdfReader(io.BytesIO(pdf_stream))
+    with open(pdf_stream, 'rb') as f:
+        # the mapping outlives the file handle and is released with the reader
+        return pypdf.PdfReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def _page_text(reader, page_num):
+    page_text = ''
+    try:
+        page_text = reader.pages[page_num].extract_text() or ''
+        # Basic cleaning of common PDF artifacts
+        page_text = page_text.replace('\0', '') # remove null bytes
+        logger.debug(f"Extracted {len(page_text)} chars from page {page_num + 1}")
+    except Exception as page_err:
+        logger.warning(f"Failed to extract text from page {page_num + 1}: {page_err}")
+    return page_text
+
+
+def _extract_pages_at(pdf_stream, page_numbers):
+    """Pool task: extract the given (0-based) pages from the PDF bytes or file."""
+    reader = open_pdf(pdf_stream)
+    return [_page_text(reader, page_num) for page_num in page_numbers]
+
+
+def select_pages(page_count, max_pages=None, sampling='first'):
+    """
+    Page numbers to extract under a page budget
+    'first' keeps the first max_pages pages; 'even' spreads max_pages pages across the document
+    """
+    if not max_pages or max_pages >= page_count:
+        return list(range(page_count))
+    if sampling == 'even':
+        step = page_count / max_pages
+        return [int(i * step) for i in range(max_pages)]
+    return list(range(max_pages))
+
+
+def page_chunks(page_numbers, workers, min_pages):
+    """Split page numbers into at most ``workers`` ordered chunks of ``min_pages``+ pages."""
+    count = len(page_numbers)
+    chunks = max(1, min(workers, count // max(1, min_pages)))
+    size = math.ceil(count / chunks) if count else 1
+    return [page_numbers[start:start + size] for start in range(0, count, size)]
+
+
+def _page_span(chunk):
+    return f"{chunk[0] + 1}-{chunk[-1] + 1}"
+
+
+def _iter_parallel(pdf_stream, page_numbers, workers, min_pages):
+    chunks = page_chunks(page_numbers, workers, min_pages)
+    pool = _get_pool()
+    futures = [pool.submit(_extract_pages_at, pdf_stream, chunk) for chunk in chunks]
+    try:
+        for chunk, future in zip(chunks, futures):
+            try:
+                yield from future.result()
+            except BrokenProcessPool as e:
+                # a worker died (e.g. hit its memory cap); drop the pool so it gets rebuilt
+                logger.warning(f"Extraction worker failed on pages {_page_span(chunk)}: {e}")
+                shutdown_pool()
+                yield from [''] * len(chunk)
+            except Exception as e:
+                logger.warning(f"Failed to extract pages {_page_span(chunk)}: {e}")
+                yield from [''] * len(chunk)
+    finally:
+        # the consumer may stop early (character budget); don't extract pages nobody will read
+        for future in futures:
+            future.cancel()
+
+
+def iter_pages(pdf_stream, max_pages=None, max_chars=None, sampling='first'):
+    """
+    Yield page texts in page order, lazily
+    Stops after max_pages pages (chosen by ``sampling``) or once max_chars characters were produced;
+    the page that crosses the character budget is truncated.
+    """
+    try:
+        reader = open_pdf(pdf_stream)
+        page_count = len(reader.pages)
+        page_numbers = select_pages(page_count, max_pages, sampling)
+        workers = extraction_workers()
+        min_pages = max(1, env_number('EXTRACTION_MIN_PAGES_PER_WORKER', 16, int))
+
+        if workers > 1 and len(page_numbers) >= 2 * min_pages:
+            pages = _iter_parallel(pdf_stream, page_numbers, workers, min_pages)
+        else:
+            pages = (_page_text(reader, page_num) for page_num in page_numbers)
+
+        yield from apply_char_budget(pages, max_chars)
+        logger.info(f"Extracted {len(page_numbers)} of {page_count} pages")
+    except Exception as e:
+        logger.error(f"PDF extraction failed: {str(e)}")
+        raise RuntimeError(f"Failed to extract text from PDF: {str(e)}")
+
+
+def apply_char_budget(pages, max_chars=None):
+    """Pass pages through until max_chars characters have been produced."""
+    remaining = max_chars if max_chars else None
+    for page in pages:
+        if remaining is not None:
+            if remaining <= 0:
+                return
+            page = page[:remaining]
+            remaining -= len(page)
+        yield page
+
+
+def count_pages(pdf_stream):
+    return len(open_pdf(pdf_stream).pages)
+
+
+def extract_pages(pdf_stream):
+    """Extract the text of every page; pages that fail or have no text become empty strings."""
+    pages = list(iter_pages(pdf_stream))
+    total_chars = sum(map(len, pages))
+    logger.info(f"Total text extracted: {total_chars} characters from {len(pages)} pages")
+    return pages
+
+
+def join_pages(pages):
+    return "\n".join(page for page in pages if page)
+
+
+def extract_text_from_pdf(pdf_stream):
+    """Surgical extraction of text from PDF bytes (or a PDF file) with fallback and cleaning."""
+    return join_pages(extract_pages(pdf_stream))
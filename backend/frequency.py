@@ -0,0 +1,38 @@
+"""
+Word-frequency sentence scoring in two passes
+The first pass counts terms over the document, the second scores each sentence by the mean count
+of its words
+"""
+from collections import Counter
+
+
+def term_frequencies(token_lists, stop_words):
+    """Counts of the alphabetic, non-stop-word tokens over all sentences (pass 1)."""
+    counts = Counter()
+    for tokens in token_lists:
+        counts.update(word for word in tokens if word.isalpha() and word not in stop_words)
+    return counts
+
+
+def sentence_score(tokens, frequencies):
+    """Mean frequency of the sentence's counted words, 0 when it has none."""
+    score = count = 0
+    for word in tokens:
+        frequency = frequencies.get(word)
+        if frequency is not None:
+            score += frequency
+            count += 1
+    return score / count if count else 0
+
+
+def rank_sentences(sentences, token_lists, frequencies):
+    """
+    Indices of all sentences, best first (pass 2); equal scores go to the earlier sentence and
+    repeats of an earlier sentence are left out, so the first ``k`` are free of duplicates.
+    """
+    scores, seen = [], set()
+    for index, (sentence, tokens) in enumerate(zip(sentences, token_lists)):
+        if sentence not in seen:
+            seen.add(sentence)
+            scores.append((-sentence_score(tokens, frequencies), index))
+    return [index for _, index in sorted(scores)]
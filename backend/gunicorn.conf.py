@@ -0,0 +1,55 @@
+"""
+Gunicorn settings: gunicorn -c gunicorn.conf.py app:app
+With PRELOAD=true the master imports the app and warms up the summarizer (NLTK, SciPy,
+stop words, Punkt) before forking, so workers boot instantly and share those pages copy-on-write.
+Without it each worker warms up after it boots, before taking requests.
+Workers publish /metrics to one SQLite file; unless METRICS_DB_PATH or CACHE_DB_PATH names one,
+a file for this server run is used and removed when the master exits.
+"""
+import gc
+import os
+import tempfile
+
+from dotenv import load_dotenv
+
+load_dotenv() # the same settings the app reads
+
+# each worker would otherwise answer /metrics with only its own counts; named after the master's
+# pid so a restarted server counts from zero
+RUN_METRICS_DB = None
+if not (os.environ.get('METRICS_DB_PATH') or os.environ.get('CACHE_DB_PATH')):
+    RUN_METRICS_DB = os.path.join(tempfile.gettempdir(), f'pdf-summarizer-metrics-{os.getpid()}.db')
+    os.environ['METRICS_DB_PATH'] = RUN_METRICS_DB
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = os.environ.get('PRELOAD', 'False').lower() == 'true'
+
+
+def when_ready(server):
+    # runs in the master once the app is loaded, before any worker is forked
+    if not preload_app:
+        return
+    import app
+    app.warm_up()
+    # keep the warmed objects out of the collector's reach so gc passes in the workers don't
+    # write to (and un-share) their pages
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    if preload_app:
+        return
+    import app
+    app.warm_up()
+
+
+def on_exit(server):
+    if RUN_METRICS_DB is None:
+        return
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove(RUN_METRICS_DB + suffix)
+        except OSError:
+            pass
@@ -0,0 +1,244 @@
+"""
+Corpus-wide document frequencies for TF-IDF, shared by every worker through a memory-mapped file
+Terms are hashed into a fixed number of buckets (the hashing trick), so the store is one flat
+integer array: nothing is loaded per worker and an update is visible to every process at once
+
+    python -m idf_store build corpus/ --path idf.npy    # from .pdf and .txt files
+    python -m idf_store merge other.npy --path idf.npy
+    python -m idf_store stats --path idf.npy
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import zlib
+from contextlib import contextmanager
+from types import ModuleType
+
+import numpy as np
+
+from config import env_number
+
+fcntl: ModuleType | None
+try:
+    import fcntl
+except ImportError: # Windows: updates are only serialized within one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = 1 << 20
+
+
+def term_buckets(terms, buckets):
+    """Stable bucket of each term (crc32, identical in every process, unlike hash())."""
+    mask = buckets - 1
+    return np.fromiter(
+        (zlib.crc32(term.encode('utf-8')) & mask for term in terms), dtype=np.int64,
+        count=len(terms),
+    )
+
+
+class IdfStore:
+    """
+    Document frequencies of hashed terms in a memory-mapped ``.npy`` file.
+
+    Element 0 counts the documents, element ``1 + bucket`` the documents containing a term of
+    that bucket. ``buckets`` must be a power of two. ``idf`` returns None until the corpus has
+    ``min_documents`` documents, so callers fall back to document-local IDF. ``rebuild`` and
+    ``merge`` replace the file atomically; open stores notice and remap it on their next read.
+    The keys of documents added with one (content digests) are kept in ``<path>.keys``, one per
+    line, so each is counted once by every process.
+    """
+
+    def __init__(self, path, buckets=DEFAULT_BUCKETS, min_documents=20):
+        if buckets < 2 or buckets & (buckets - 1):
+            raise ValueError("buckets must be a power of two")
+        self.path = path
+        self.min_documents = max(1, min_documents)
+        self._lock = threading.Lock()
+        self._array = None
+        self._inode = None
+        self._keys = set()
+        self._keys_read = 0 # bytes of the keys file already in _keys
+        if not os.path.exists(path):
+            self._write(np.zeros(buckets + 1, dtype=np.int64))
+        self.buckets = len(self._counts()) - 1
+
+    @classmethod
+    def from_env(cls):
+        """The store at IDF_STORE_PATH, or None when corpus IDF is disabled."""
+        path = os.getenv('IDF_STORE_PATH')
+        if not path:
+            return None
+        try:
+            return cls(
+                path,
+                buckets=env_number('IDF_BUCKETS', DEFAULT_BUCKETS, int),
+                min_documents=env_number('IDF_MIN_DOCUMENTS', 20, int),
+            )
+        except (ValueError, OSError) as e:
+            logger.warning(f"Corpus IDF disabled, cannot open {path}: {e}")
+            return None
+
+    def _counts(self):
+        # remap when rebuild/merge (here or in another worker) replaced the file
+        inode = os.stat(self.path).st_ino
+        if self._array is None or inode != self._inode:
+            self._array = np.load(self.path, mmap_mode='r+')
+            self._inode = inode
+        return self._array
+
+    @contextmanager
+    def _exclusive(self):
+        with self._lock, open(f"{self.path}.lock", 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _write(self, counts):
+        """Atomically replace the file with ``counts``."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.npy')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, counts)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @property
+    def documents(self):
+        return int(self._counts()[0])
+
+    def _claim(self, key):
+        """Record ``key``; False if it was recorded before. Called with the store locked."""
+        with open(f"{self.path}.keys", 'a+', encoding='utf-8') as f:
+            if os.fstat(f.fileno()).st_size < self._keys_read: # emptied by a rebuild
+                self._keys.clear()
+                self._keys_read = 0
+            f.seek(self._keys_read)
+            self._keys.update(f.read().split()) # added by other processes
+            if key not in self._keys:
+                f.write(f"{key}\n")
+                self._keys.add(key)
+                claimed = True
+            else:
+                claimed = False
+            self._keys_read = f.tell()
+        return claimed
+
+    def add_document(self, terms, key=None):
+        """
+        Count one document containing ``terms`` (any iterable; repeats are ignored)
+        A document added with a ``key`` (e.g. its content digest) is only counted the first time.
+        """
+        buckets = np.unique(term_buckets(list(set(terms)), self.buckets)) + 1
+        if not len(buckets):
+            return
+        with self._exclusive():
+            if key is not None and not self._claim(key):
+                return
+            counts = self._counts()
+            # no flush: writes to the shared mapping live in the page cache, where every process
+            # sees them and they survive a worker crash; the kernel writes them back
+            counts[buckets] += 1
+            counts[0] += 1
+
+    def idf(self, terms):
+        """
+        Smoothed corpus IDF of each term, ``ln((1 + N) / (1 + df)) + 1`` as in TfidfVectorizer,
+        or None while the corpus has fewer than ``min_documents`` documents.
+        """
+        counts = self._counts()
+        documents = int(counts[0])
+        if documents < self.min_documents:
+            return None
+        frequency = counts[term_buckets(terms, self.buckets) + 1]
+        return np.log((documents + 1) / (frequency + 1)) + 1
+
+    def rebuild(self, documents):
+        """Replace the corpus with ``documents``, an iterable of term lists."""
+        counts = np.zeros(self.buckets + 1, dtype=np.int64)
+        for terms in documents:
+            counts[np.unique(term_buckets(list(set(terms)), self.buckets)) + 1] += 1
+            counts[0] += 1
+        with self._exclusive():
+            self._write(counts)
+            open(f"{self.path}.keys", 'w').close() # the documents learned so far are gone
+        logger.info(f"Rebuilt corpus IDF from {int(counts[0])} documents")
+
+    def merge(self, other_path):
+        """Add the document frequencies of another store file (same bucket count)."""
+        other = np.load(other_path, mmap_mode='r')
+        if len(other) != self.buckets + 1:
+            raise ValueError(f"{other_path} has {len(other) - 1} buckets, expected {self.buckets}")
+        with self._exclusive():
+            self._write(np.asarray(self._counts()) + other)
+        logger.info(f"Merged {int(other[0])} documents from {other_path}")
+
+    def stats(self):
+        counts = self._counts()
+        return {
+            'path': self.path,
+            'documents': int(counts[0]),
+            'buckets': self.buckets,
+            'buckets_used': int(np.count_nonzero(counts[1:])),
+            'active': int(counts[0]) >= self.min_documents,
+        }
+
+
+def corpus_terms(paths, summarizer):
+    """Term list of every .pdf and .txt file under ``paths`` (files or directories)."""
+    from extraction import extract_pages
+    for root in paths:
+        files = [root] if os.path.isfile(root) else sorted(
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(root) for name in names
+        )
+        for path in files:
+            extension = os.path.splitext(path)[1].lower()
+            if extension not in ('.pdf', '.txt'):
+                continue
+            try:
+                if extension == '.pdf':
+                    with open(path, 'rb') as f:
+                        pages = extract_pages(f.read())
+                else:
+                    with open(path, encoding='utf-8', errors='replace') as f:
+                        pages = [f.read()]
+                doc = summarizer.preprocess_pages(pages)
+            except Exception as e:
+                logger.warning(f"Skipping {path}: {e}")
+                continue
+            yield [term for terms in doc.sentence_terms for term in terms]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', choices=('build', 'merge', 'stats'))
+    parser.add_argument('sources', nargs='*', help='corpus files/directories, or stores to merge')
+    parser.add_argument('--path', default=os.getenv('IDF_STORE_PATH'), required=False,
+                        help='store file (default: IDF_STORE_PATH)')
+    parser.add_argument('--buckets', type=int, default=DEFAULT_BUCKETS)
+    args = parser.parse_args(argv)
+    if not args.path:
+        parser.error('--path or IDF_STORE_PATH is required')
+
+    store = IdfStore(args.path, buckets=args.buckets)
+    if args.command == 'build':
+        from adv_summ import AdvSummarizer
+        store.rebuild(corpus_terms(args.sources, AdvSummarizer()))
+    elif args.command == 'merge':
+        for source in args.sources:
+            store.merge(source)
+    print(store.stats())
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
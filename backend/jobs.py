@@ -0,0 +1,105 @@
+"""
+Background summary jobs
+Work runs on a small bounded thread pool so request threads return immediately; job records live
+in a ResultCache, so with a shared SQLite file any gunicorn worker can answer a status poll
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity."""
+
+
+class JobManager:
+    """
+    Runs ``fn(*args, progress=callback)`` in the background and tracks its status.
+
+    At most ``max_workers`` jobs run at once and at most ``max_pending`` are queued or running;
+    finished job records are kept for ``retention`` seconds (and at most ``max_retained`` of them
+    in memory).
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, retention=3600, max_retained=256,
+                 db_path=None):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='summary-job')
+        self._store = ResultCache('jobs', max_entries=max_retained, ttl=retention, db_path=db_path)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+
+    def submit(self, fn, *args, **kwargs) -> str:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError("Too many summary jobs in progress. Please retry shortly.")
+            self._pending += 1
+
+        job_id = uuid.uuid4().hex
+        record = {
+            'job_id': job_id,
+            'status': 'queued',
+            'progress': {'stage': 'queued', 'fraction': 0.0},
+            'created_at': time.time(),
+        }
+        self._store.set(job_id, record)
+        try:
+            self._executor.submit(self._run, record, fn, args, kwargs)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job_id
+
+    def get(self, job_id: str):
+        """The job record, or ``None`` if the id is unknown or has expired."""
+        return self._store.get(job_id, fresh=True)
+
+    def _save(self, record, **changes):
+        record = {**record, **changes}
+        self._store.set(record['job_id'], record)
+        return record
+
+    def _run(self, record, fn, args, kwargs):
+        with self._lock:
+            self._running += 1
+        record = self._save(record, status='running', started_at=time.time(),
+                            progress={'stage': 'started', 'fraction': 0.0})
+        last = record['progress']
+
+        def progress(stage, fraction):
+            nonlocal record, last
+            fraction = round(min(max(fraction, 0.0), 1.0), 3)
+            # only persist stage changes and 5% steps; every poll-visible write may hit SQLite
+            if stage != last['stage'] or fraction - last['fraction'] >= 0.05:
+                last = {'stage': stage, 'fraction': fraction}
+                record = self._save(record, progress=last)
+
+        try:
+            result = fn(*args, progress=progress, **kwargs)
+            self._save(record, status='succeeded', result=result, finished_at=time.time(),
+                       progress={'stage': 'done', 'fraction': 1.0})
+        except Exception as e:
+            logger.exception(f"Summary job {record['job_id']} failed")
+            self._save(record, status='failed', error=str(e), finished_at=time.time())
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._running -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'running': self._running,
+                'queued': self._pending - self._running,
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+            }
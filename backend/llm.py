@@ -0,0 +1,82 @@
+"""
+Hierarchical (map-reduce) LLM summarization
+Long documents are split into sentence-aligned chunks that are summarized concurrently, then the
+chunk summaries are summarized again, in batches that fit a prompt, until they fit a single prompt
+"""
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4 # rough average for English text with Gemini's tokenizer
+
+
+def estimate_tokens(text):
+    """Approximate model tokens for text, without a count_tokens round trip."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def chunk_sentences(sentences, max_chars):
+    """
+    Group sentences into chunks of at most max_chars characters, never splitting a sentence
+    A single sentence longer than max_chars is cut into max_chars pieces.
+    """
+    chunks, current, size = [], [], 0
+    for sentence in sentences:
+        pieces = [sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars)]
+        for piece in pieces:
+            if current and size + 1 + len(piece) > max_chars:
+                chunks.append(' '.join(current))
+                current, size = [], 0
+            size += len(piece) + (1 if current else 0)
+            current.append(piece)
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+def map_reduce(summarize_chunk, combine, sentences, max_chars, max_concurrency=4):
+    """
+    Summarize sentences that do not fit one prompt.
+
+    ``summarize_chunk(text)`` summarizes one chunk and ``combine(text)`` writes the final summary
+    from the joined chunk summaries; both raise on failure. Summaries that do not fit ``max_chars``
+    together are summarized again in chunks, level by level; a level that does not shorten the
+    text raises RuntimeError. At most ``max_concurrency`` calls are in flight. Returns
+    ``(summary, stats)`` where stats has the chunk counts per level, how many chunks failed and the
+    seconds spent in each stage.
+    """
+    stats = {'mode': 'map_reduce', 'chunks': [], 'failed_chunks': 0, 'timings': {}}
+    units = sentences
+    level = 0
+    with ThreadPoolExecutor(max(1, max_concurrency), thread_name_prefix='llm-chunk') as executor:
+        while True:
+            level += 1
+            chunks = chunk_sentences(units, max_chars)
+            started = time.perf_counter()
+            futures = [executor.submit(summarize_chunk, chunk) for chunk in chunks]
+            summaries = []
+            for index, future in enumerate(futures):
+                try:
+                    summaries.append(future.result())
+                except Exception as e:
+                    # one bad chunk costs its share of detail, not the whole summary
+                    logger.warning(f"LLM chunk {index + 1}/{len(chunks)} failed: {e}")
+                    stats['failed_chunks'] += 1
+            stats['chunks'].append(len(chunks))
+            stats['timings'][f'map_{level}_seconds'] = round(time.perf_counter() - started, 3)
+            if not summaries:
+                raise RuntimeError(f"all {len(chunks)} chunk summaries failed")
+            joined = '\n\n'.join(summaries)
+            if len(joined) <= max_chars:
+                break
+            if len(joined) >= sum(len(chunk) for chunk in chunks):
+                raise RuntimeError(f"chunk summaries at level {level} are no shorter than the text")
+            units = summaries
+
+    started = time.perf_counter()
+    summary = combine(joined)
+    stats['timings']['reduce_seconds'] = round(time.perf_counter() - started, 3)
+    return summary, stats
@@ -0,0 +1,88 @@
+"""
+Approximate cosine neighbours with locality-sensitive hashing
+Rows are sorted by random-hyperplane signatures (SimHash) under a few bit permutations, and
+similarities are computed only within blocks of rows that sort next to each other, so a graph
+costs O(n * block) instead of the O(n^2) of comparing every pair
+"""
+import numpy as np
+
+from tfidf import strongest_per_row
+
+SIGNATURE_BITS = 64
+
+
+def signatures(vectors, seed=0):
+    """
+    64-bit random-hyperplane signature of each row, as uint64: bit b is set when the row lies on
+    the positive side of hyperplane b, so rows at a small angle share most of their bits.
+    """
+    rng = np.random.default_rng(seed)
+    planes = rng.standard_normal((vectors.shape[1], SIGNATURE_BITS)).astype(np.float32)
+    bits = np.asarray(vectors @ planes) > 0
+    return np.packbits(bits, axis=1, bitorder='little').view(np.uint64).ravel()
+
+
+def permute_bits(codes, order):
+    """Signatures with bit ``order[0]`` moved to the most significant place, and so on."""
+    out = np.zeros_like(codes)
+    one = np.uint64(1)
+    for position, bit in enumerate(order):
+        out |= ((codes >> np.uint64(bit)) & one) << np.uint64(SIGNATURE_BITS - 1 - position)
+    return out
+
+
+def _merge(rows, cols, vals, n, max_neighbors):
+    """
+    Edges without repeats (a pair compared in several orders has the same similarity each
+    time), trimmed to the ``max_neighbors`` strongest of each row
+    """
+    keys, first = np.unique(np.concatenate(rows) * n + np.concatenate(cols), return_index=True)
+    rows, cols, vals = keys // n, keys % n, np.concatenate(vals)[first]
+    if max_neighbors is None or len(rows) == 0:
+        return rows, cols, vals
+    return strongest_per_row(rows, cols, vals, n, max_neighbors)
+
+
+def approximate_neighbors(vectors, threshold=0.0, max_neighbors=None, permutations=4, block=512,
+                          seed=0):
+    """
+    Sparse cosine-similarity graph of L2-normalized rows, like ``tfidf.cosine_neighbors``, but
+    each row is only compared with the rows that share its block in one of ``permutations``
+    orders of the signatures (Charikar's sorted-permutation search). A row's strongest
+    neighbours usually sort nearby; those that don't are missed, and weaker ones take their place.
+    """
+    from scipy import sparse  # imported on first use; see adv_summ
+    vectors = sparse.csr_matrix(vectors)
+    n = vectors.shape[0]
+    present = np.flatnonzero(np.diff(vectors.indptr)) # rows without terms have no neighbours
+    codes = signatures(vectors[present], seed)
+    rng = np.random.default_rng(seed + 1)
+
+    rows = cols = np.empty(0, dtype=np.int64)
+    vals = np.empty(0, dtype=vectors.dtype)
+    for p in range(permutations):
+        order = present[np.argsort(permute_bits(codes, rng.permutation(SIGNATURE_BITS)))]
+        # each order's block boundaries are shifted, so rows cut apart once meet in another
+        shift = p * block // permutations
+        starts = [0] + list(range(shift or block, len(order), block))
+        all_rows, all_cols, all_vals = [rows], [cols], [vals]
+        for start, end in zip(starts, starts[1:] + [len(order)]):
+            members = order[start:end]
+            part = vectors[members]
+            sims = (part @ part.T).toarray()
+            np.fill_diagonal(sims, 0)
+            size = len(members)
+            if max_neighbors is not None and max_neighbors < size - 1:
+                top = np.argpartition(sims, size - max_neighbors, axis=1)[:, -max_neighbors:]
+                block_vals = np.take_along_axis(sims, top, axis=1).ravel()
+                block_rows, block_cols = np.repeat(np.arange(size), max_neighbors), top.ravel()
+            else:
+                block_rows, block_cols = np.nonzero(sims)
+                block_vals = sims[block_rows, block_cols]
+            keep = block_vals > threshold
+            all_rows.append(members[block_rows[keep]])
+            all_cols.append(members[block_cols[keep]])
+            all_vals.append(block_vals[keep])
+        # merged after every order, so at most twice the final edges are held at once
+        rows, cols, vals = _merge(all_rows, all_cols, all_vals, n, max_neighbors)
+    return sparse.csr_matrix((vals, (rows, cols)), shape=(n, n))
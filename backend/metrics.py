@@ -0,0 +1,309 @@
+"""
+Request instrumentation
+Per-request stage timings (collected through a context variable, so the summarizer needs no extra
+arguments) and Prometheus text-format metrics. With a SQLite file, every gunicorn worker publishes
+its cumulative counters there and /metrics reports the sum over all workers.
+"""
+import contextvars
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from cache import sqlite_connection
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = ((10_000, '<10k'), (100_000, '10k-100k'), (1_000_000, '100k-1M'))
+
+_current = contextvars.ContextVar('stage_timings', default=None)
+
+
+class StageTimings:
+    """Exclusive seconds per stage: time spent in a nested stage is not counted by its parent."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._children = []
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def as_dict(self):
+        timings = {name: round(seconds, 4) for name, seconds in self.stages.items()}
+        timings['total'] = round(time.perf_counter() - self.started, 4)
+        return timings
+
+
+@contextmanager
+def collect():
+    """Collect stage timings for the enclosed work; reuses the active collector when nested."""
+    timings = _current.get()
+    if timings is not None:
+        yield timings
+        return
+    timings = StageTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as ``name`` in the active collector (no-op without one)."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    timings._children.append(0.0)
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timings.add(name, elapsed - timings._children.pop())
+        if timings._children:
+            timings._children[-1] += elapsed
+
+
+def timed_iter(iterable, name):
+    """Yield from iterable, timing each step as ``name`` (e.g. lazily extracted pages)."""
+    iterator = iter(iterable)
+    while True:
+        with stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def size_bucket(chars):
+    for limit, label in SIZE_BUCKETS:
+        if chars < limit:
+            return label
+    return '>1M'
+
+
+def _key(name, labels):
+    return json.dumps([name, sorted(labels.items())])
+
+
+class Metrics:
+    """
+    Counters, gauges and histograms in Prometheus text format.
+
+    With ``db_path`` set, each process writes its cumulative values to a SQLite table (from a
+    background thread at most every ``flush_interval`` seconds, and when /metrics is rendered)
+    and ``render`` sums the latest values of every process. Gauges of processes silent for
+    ``stale_after`` seconds (e.g. replaced workers) are ignored; their counters keep counting.
+    """
+
+    def __init__(self, prefix='summarizer', db_path=None, flush_interval=1.0, stale_after=300):
+        self.prefix = prefix
+        self.db_path = db_path or None
+        self.flush_interval = flush_interval
+        self.stale_after = stale_after
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._pid = None # process the worker id and flush thread belong to (re-set after fork)
+        self._worker = None
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS metrics ('
+                    'worker TEXT PRIMARY KEY, snapshot TEXT NOT NULL, updated_at REAL NOT NULL)'
+                )
+
+    def _connect(self):
+        return sqlite_connection(self.db_path)
+
+    def inc(self, name, value=1.0, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+        self._changed()
+
+    def gauge_add(self, name, delta, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0.0) + delta
+        self._changed()
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {
+                    'buckets': list(buckets), 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0,
+                }
+            for i, bound in enumerate(histogram['buckets']):
+                if value <= bound:
+                    histogram['counts'][i] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+        self._changed()
+
+    def _snapshot(self):
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'histograms': json.loads(json.dumps(self._histograms)),
+            }
+
+    def _changed(self):
+        if not self.db_path:
+            return
+        with self._lock:
+            self._dirty = True
+            self._claim_process()
+
+    def _claim_process(self):
+        # called with the lock held; gunicorn forks workers after the module is imported
+        if self._pid == os.getpid():
+            return
+        if self._pid is not None: # forked child: the parent already publishes what it counted
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+        self._pid = os.getpid()
+        self._worker = f"{socket.gethostname()}:{self._pid}:{id(self):x}:{time.time():.0f}"
+        threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.flush_interval)
+            if self._dirty:
+                self.flush()
+
+    def flush(self):
+        """Publish this process's values to the shared table now."""
+        if not self.db_path:
+            return
+        with self._lock:
+            self._dirty = False
+            self._claim_process()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO metrics (worker, snapshot, updated_at) '
+                    'VALUES (?, ?, ?)',
+                    (self._worker, json.dumps(self._snapshot()), time.time()),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"metrics write failed: {e}")
+
+    def _snapshots(self):
+        if not self.db_path:
+            return [(self._snapshot(), True)]
+        self.flush()
+        try:
+            with self._connect() as conn:
+                rows = conn.execute('SELECT snapshot, updated_at FROM metrics').fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"metrics read failed: {e}")
+            return [(self._snapshot(), True)]
+        now = time.time()
+        return [(json.loads(snapshot), now - updated_at < self.stale_after)
+                for snapshot, updated_at in rows]
+
+    def merged(self):
+        """Counters, gauges and histograms summed over every (live, for gauges) process."""
+        counters, gauges, histograms = {}, {}, {}
+        for snapshot, live in self._snapshots():
+            for key, value in snapshot['counters'].items():
+                counters[key] = counters.get(key, 0.0) + value
+            if live:
+                for key, value in snapshot['gauges'].items():
+                    gauges[key] = gauges.get(key, 0.0) + value
+            for key, histogram in snapshot['histograms'].items():
+                total = histograms.setdefault(key, {
+                    'buckets': histogram['buckets'], 'counts': [0] * len(histogram['buckets']),
+                    'sum': 0.0, 'count': 0,
+                })
+                total['counts'] = [a + b for a, b in zip(total['counts'], histogram['counts'])]
+                total['sum'] += histogram['sum']
+                total['count'] += histogram['count']
+        return counters, gauges, histograms
+
+    def render(self, derived=None):
+        """
+        Prometheus text exposition of the merged metrics
+        ``derived(total)`` may return extra gauges ``{(name, label_pairs): value}`` computed at
+        scrape time, where ``total(name, **labels)`` sums the merged counters matching the labels.
+        """
+        counters, gauges, histograms = self.merged()
+        if derived is not None:
+            def total(name, **labels):
+                return sum(
+                    value for key, value in counters.items()
+                    if _matches(key, name, labels)
+                )
+            for (name, labels), value in derived(total).items():
+                gauges[_key(name, dict(labels))] = value
+
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {self.prefix}_{name} {kind}")
+
+        def series(name, labels, value):
+            label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels)
+            label_text = f"{{{label_text}}}" if label_text else ''
+            lines.append(f"{self.prefix}_{name}{label_text} {_number(value)}")
+
+        for kind, values in (('counter', counters), ('gauge', gauges)):
+            for key in sorted(values):
+                name, labels = json.loads(key)
+                header(name, kind)
+                series(name, labels, values[key])
+        for key in sorted(histograms):
+            name, labels = json.loads(key)
+            histogram = histograms[key]
+            header(name, 'histogram')
+            for bound, count in zip(histogram['buckets'], histogram['counts']):
+                series(f"{name}_bucket", labels + [['le', _number(bound)]], count)
+            series(f"{name}_bucket", labels + [['le', '+Inf']], histogram['count'])
+            series(f"{name}_sum", labels, histogram['sum'])
+            series(f"{name}_count", labels, histogram['count'])
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute('DELETE FROM metrics')
+
+
+def _matches(key, name, labels):
+    key_name, key_labels = json.loads(key)
+    return key_name == name and all(pair in key_labels for pair in map(list, labels.items()))
+
+
+def _number(value):
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
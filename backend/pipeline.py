@@ -0,0 +1,228 @@
+"""
+Summarization pipeline shared by /summarize, background jobs and batches
+Batches run on a process pool where each worker builds its own AdvSummarizer once
+"""
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import env_number
+from extraction import count_pages, iter_pages, select_pages
+from metrics import collect, stage, timed_iter
+from pools import SpawnPool
+from ranking import ranking_record
+from sections import allocate_sentences, assign_pages, document_sections
+
+logger = logging.getLogger(__name__)
+
+MIN_TEXT_LENGTH = 50
+
+_summarizer = None # per batch worker process
+
+
+class InsufficientTextError(ValueError):
+    """The PDF has too little extractable text to summarize."""
+
+
+def summarize_pages(summarizer, pages, algorithm, num_sentences, progress=None,
+                    llm_prefilter=None, llm_token_budget=None, on_text=None, digest=None):
+    """
+    Preprocess an iterable of page texts and summarize it
+    Returns the cacheable result: the generate_summary output plus the extracted text length,
+    and under ``ranking`` the full sentence ranking of an extractive summary (see ranking.py).
+    ``digest`` identifies the upload, so the corpus IDF learns it only once.
+    """
+    doc = summarizer.preprocess_pages(pages) # sentences are split as pages arrive
+    if len(doc.raw_text.strip()) < MIN_TEXT_LENGTH:
+        raise InsufficientTextError('Insufficient text content in PDF for summarization.')
+
+    if progress is not None:
+        progress('summarizing', 0.5)
+
+    summary_result = summarizer.generate_summary(
+        text=doc,
+        method=algorithm,
+        num_sentences=num_sentences,
+        llm_prefilter=llm_prefilter,
+        llm_token_budget=llm_token_budget,
+        on_text=on_text,
+    )
+    summarizer.learn_document(doc, key=digest)
+    result = {'summary_result': summary_result, 'original_length': len(doc.raw_text)}
+    if algorithm in doc.rankings:
+        result['ranking'] = ranking_record(doc, algorithm, doc.rankings[algorithm])
+    return result
+
+
+def rank_pages(summarizer, pages, algorithm, digest=None):
+    """Preprocess an iterable of page texts and rank all its sentences (a ranking.py record)."""
+    doc = summarizer.preprocess_pages(pages)
+    if len(doc.raw_text.strip()) < MIN_TEXT_LENGTH:
+        raise InsufficientTextError('Insufficient text content in PDF for summarization.')
+    try:
+        ranking = summarizer.sentence_ranking(doc, algorithm)
+    except ValueError as e: # e.g. only stop words left to vectorize
+        raise InsufficientTextError(f'No sentences to rank: {e}')
+    summarizer.learn_document(doc, key=digest)
+    return ranking_record(doc, algorithm, ranking)
+
+
+def compare_pages(summarizer, pages, algorithms, num_sentences, llm_prefilter=None,
+                  llm_token_budget=None, digest=None):
+    """
+    Preprocess an iterable of page texts once and summarize it with every algorithm at once
+    Returns, per algorithm, the summarize_pages result plus its ``seconds``, or an ``error``.
+    """
+    doc = summarizer.preprocess_pages(pages)
+    if len(doc.raw_text.strip()) < MIN_TEXT_LENGTH:
+        raise InsufficientTextError('Insufficient text content in PDF for summarization.')
+    if any(algorithm != 'llm' for algorithm in algorithms) or llm_prefilter not in (None, 'none'):
+        with stage('tokenize'):
+            doc.sentence_terms # tokenized here, once, rather than racing in every thread
+
+    def summarize(algorithm):
+        started = time.perf_counter()
+        try:
+            summary_result = summarizer.generate_summary(
+                text=doc, method=algorithm, num_sentences=num_sentences,
+                llm_prefilter=llm_prefilter, llm_token_budget=llm_token_budget,
+            )
+        except Exception as e:
+            logger.warning(f"Comparison with {algorithm} failed: {e}")
+            return {'error': str(e), 'seconds': round(time.perf_counter() - started, 3)}
+        result = {
+            'summary_result': summary_result,
+            'original_length': len(doc.raw_text),
+            'seconds': round(time.perf_counter() - started, 3),
+        }
+        if algorithm in doc.rankings:
+            result['ranking'] = ranking_record(doc, algorithm, doc.rankings[algorithm])
+        return result
+
+    # the LLM call is submitted first so it waits on the network while the others compute
+    ordered = sorted(algorithms, key=lambda algorithm: algorithm != 'llm')
+    # stage timings are per request and not thread-safe: the workers run untimed
+    with stage('compare'), ThreadPoolExecutor(
+        len(ordered), thread_name_prefix='compare'
+    ) as executor:
+        results = dict(zip(ordered, executor.map(summarize, ordered)))
+    summarizer.learn_document(doc, key=digest)
+    return results
+
+
+def section_workers():
+    """Threads summarizing the sections of one document at once."""
+    return max(1, env_number('SECTION_WORKERS', min(4, os.cpu_count() or 1), int))
+
+
+def summarize_sections(summarizer, pdf_content, pages, page_numbers, algorithm, num_sentences,
+                       sentence_budget, progress=None, llm_prefilter=None,
+                       llm_token_budget=None, digest=None):
+    """
+    Summarize each section of a document (outline entries or page groups) in parallel
+    ``pages`` are the texts of the extracted 0-based ``page_numbers``. Each section asks for
+    num_sentences sentences; sentence_budget caps the total. The combined summary joins the
+    section summaries, and ``sections`` lists each one with its page range.
+    """
+    pages = list(pages)
+    if len(''.join(pages).strip()) < MIN_TEXT_LENGTH:
+        raise InsufficientTextError('Insufficient text content in PDF for summarization.')
+    sections = document_sections(
+        pdf_content, page_numbers[-1] + 1, env_number('SECTION_PAGES', 10, int)
+    )
+    grouped = assign_pages(sections, page_numbers, pages)
+    # sections past a page or character budget were not extracted at all
+    kept = [i for i, texts in enumerate(grouped) if texts]
+    sections, grouped = [sections[i] for i in kept], [grouped[i] for i in kept]
+
+    # stage timings are per request and not thread-safe: the workers run untimed
+    with stage('sections'), ThreadPoolExecutor(
+        min(section_workers(), len(sections)), thread_name_prefix='section'
+    ) as executor:
+        docs = list(executor.map(summarizer.preprocess_pages, grouped))
+        if progress is not None:
+            progress('summarizing', 0.5)
+        allocated = allocate_sentences([len(doc) for doc in docs], num_sentences, sentence_budget)
+
+        def summarize(doc, count):
+            if not count:
+                return None
+            return summarizer.generate_summary(
+                text=doc, method=algorithm, num_sentences=count,
+                llm_prefilter=llm_prefilter, llm_token_budget=llm_token_budget,
+            )
+
+        results = list(executor.map(summarize, docs, allocated))
+    summarizer.learn_document(*docs, key=digest)
+
+    section_results = []
+    for section, doc, count, result in zip(sections, docs, allocated, results):
+        section_results.append({
+            **section,
+            'summary': result['summary'] if result else '',
+            'sentences': count,
+            'original_sentences': len(doc),
+            'failed': bool(result and result['failed']),
+        })
+    summarized = [result for result in results if result]
+    summary = '\n\n'.join(result['summary'] for result in summarized)
+    original_length = sum(len(doc.raw_text) for doc in docs)
+    summary_result = {
+        'summary': summary,
+        'algorithm': summarized[0]['algorithm'] if summarized else algorithm,
+        'sentences_requested': sum(allocated),
+        'original_sentences': sum(len(doc) for doc in docs),
+        'compression_ratio': round(len(summary) / max(original_length, 1) * 100, 2),
+        'summary_word_count': len(summary.split()),
+        'original_word_count': sum(doc.word_count for doc in docs),
+        'failed': any(result['failed'] for result in summarized),
+    }
+    logger.info(f"Summarized {len(summarized)} of {len(sections)} sections")
+    return {
+        'summary_result': summary_result,
+        'original_length': original_length,
+        'sections': section_results,
+    }
+
+
+def batch_workers():
+    """Processes used for batch summarization; 0 or 1 runs batches in the request thread."""
+    return max(0, env_number('BATCH_WORKERS', min(4, os.cpu_count() or 1), int))
+
+
+def _init_worker():
+    global _summarizer
+    # the batch pool already spans the cores; don't nest an extraction pool inside each worker
+    os.environ['EXTRACTION_WORKERS'] = '0'
+    from adv_summ import AdvSummarizer
+    _summarizer = AdvSummarizer()
+
+
+def summarize_pdf_bytes(pdf_content, algorithm, num_sentences, max_pages=None, max_chars=None,
+                        sampling='first', llm_prefilter=None, llm_token_budget=None,
+                        section_budget=None, digest=None):
+    """Pool task: extract and summarize one PDF (by section with a section_budget)."""
+    with collect() as timings:
+        with stage('extraction'):
+            pages = iter_pages(pdf_content, max_pages, max_chars, sampling)
+        pages = timed_iter(pages, 'extraction')
+        if section_budget:
+            page_numbers = select_pages(count_pages(pdf_content), max_pages, sampling)
+            result = summarize_sections(
+                _summarizer, pdf_content, pages, page_numbers, algorithm, num_sentences,
+                section_budget, llm_prefilter=llm_prefilter, llm_token_budget=llm_token_budget,
+                digest=digest,
+            )
+        else:
+            result = summarize_pages(
+                _summarizer, pages, algorithm, num_sentences,
+                llm_prefilter=llm_prefilter, llm_token_budget=llm_token_budget, digest=digest,
+            )
+    result['timings'] = timings.as_dict()
+    return result
+
+
+_pool = SpawnPool(batch_workers, initializer=_init_worker)
+get_batch_pool = _pool.get
+shutdown_batch_pool = _pool.shutdown
@@ -0,0 +1,44 @@
+"""
+Shared process pools
+Extraction and batch summaries each keep one pool per gunicorn worker, created on first use with
+the spawn start method and dropped (to be rebuilt) after a shutdown or a crashed worker
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+class SpawnPool:
+    """
+    A lazily created ``ProcessPoolExecutor`` shared by the threads of one process.
+
+    ``workers()`` and ``max_tasks_per_child()`` are read each time the pool is created, so a
+    rebuilt pool picks up changed settings; ``initializer`` runs in every pool process.
+    """
+
+    def __init__(self, workers, initializer=None, max_tasks_per_child=None):
+        self.workers = workers
+        self.initializer = initializer
+        self.max_tasks_per_child = max_tasks_per_child
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a multi-threaded gunicorn worker is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=max(1, self.workers()),
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=self.initializer,
+                    max_tasks_per_child=(
+                        self.max_tasks_per_child() if self.max_tasks_per_child else None
+                    ),
+                )
+            return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,51 @@
+"""
+Persisted sentence rankings
+An extractive summary of any length is the top of one ranking of all the document's sentences, so a
+ranking stored per document and algorithm answers every later num_sentences by slicing it
+"""
+
+# algorithm -> name reported as algorithm_used, as in AdvSummarizer.generate_summary
+RANKED_ALGORITHMS = {'frequency': 'Frequency Analysis', 'tfidf': 'TF-IDF', 'textrank': 'TextRank'}
+MIN_SENTENCES, MAX_SENTENCES = 2, 10 # generate_summary's clamp
+
+
+def ranking_record(doc, method, ranking):
+    """
+    The cacheable ranking of a preprocessed document: its sentences with their character offsets
+    in the cleaned text, sentence indices best first, and what the summary statistics need.
+    """
+    return {
+        'algorithm': RANKED_ALGORITHMS[method],
+        'sentences': doc.sentences,
+        'offsets': [list(span) for span in doc.spans],
+        'ranking': [int(i) for i in ranking],
+        'original_length': len(doc.raw_text),
+        'original_word_count': doc.word_count,
+    }
+
+
+def selected_sentences(record, num_sentences):
+    """Indices of the ``num_sentences`` best sentences of a ranking record, in document order."""
+    if len(record['sentences']) <= num_sentences:
+        return list(range(len(record['sentences'])))
+    return sorted(record['ranking'][:num_sentences])
+
+
+def ranked_summary(record, num_sentences):
+    """A generate_summary result for ``num_sentences``, sliced from a ranking record."""
+    num_sentences = max(MIN_SENTENCES, min(MAX_SENTENCES, num_sentences))
+    sentences = record['sentences']
+    summary = ' '.join(sentences[i] for i in selected_sentences(record, num_sentences))
+    compression_ratio = (
+        len(summary) / record['original_length'] * 100 if sentences else 0
+    )
+    return {
+        'summary': summary,
+        'algorithm': record['algorithm'],
+        'sentences_requested': num_sentences,
+        'original_sentences': len(sentences),
+        'compression_ratio': round(compression_ratio, 2),
+        'summary_word_count': len(summary.split()),
+        'original_word_count': record['original_word_count'],
+        'failed': False,
+    }
@@ -1,10 +1,24 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import Literal
 
+from config import env_number
+
+
+Algorithm = Literal["frequency", "tfidf", "textrank", "llm"]
+ALGORITHMS: list[Algorithm] = ["frequency", "tfidf", "textrank", "llm"]
+
 
 class SummarizeRequest(BaseModel):
-    algorithm: Literal["frequency", "tfidf", "textrank", "llm"] = "llm"
+    algorithm: Algorithm = "llm"
     num_sentences: int = Field(default=3, ge=2, le=10)
+    max_pages: int | None = Field(default=None, ge=1)
+    max_chars: int | None = Field(default=None, ge=1)
+    page_sampling: Literal["first", "even"] = "first"
+    llm_prefilter: Literal["none", "tfidf", "textrank"] = "none"
+    llm_token_budget: int | None = Field(default=None, ge=100)
+    sections: bool = False
+    section_budget: int | None = Field(default=None, ge=2)
+    timings: bool = False
 
     @field_validator("num_sentences", mode="before")
     @classmethod
@@ -12,11 +26,24 @@ class SummarizeRequest(BaseModel):
         return max(2, min(10, v))
 
 
+class CompareRequest(SummarizeRequest):
+    algorithms: list[Algorithm] = Field(default_factory=lambda: list(ALGORITHMS), min_length=1)
+
+    @field_validator("algorithms")
+    @classmethod
+    def drop_repeats(cls, v: list[str]) -> list[str]:
+        return list(dict.fromkeys(v))
+
+
 class FileValidation:
     ALLOWED_EXTENSIONS = {".pdf"}
-    MAX_SIZE_MB = 10
+    MAX_SIZE_MB = 10 # default for MAX_UPLOAD_SIZE_MB
     MAX_SIZE_BYTES = MAX_SIZE_MB * 1024 * 1024
 
+    @classmethod
+    def max_size_mb(cls) -> float:
+        return float(env_number("MAX_UPLOAD_SIZE_MB", cls.MAX_SIZE_MB))
+
     @classmethod
     def validate_file(cls, filename: str, size: int, content_type: str) -> None:
         if not filename:
@@ -26,7 +53,8 @@ class FileValidation:
             raise ValueError("Invalid file type. Please upload a PDF.")
         if content_type and content_type != "application/pdf":
             raise ValueError("Invalid file type. Please upload a PDF.")
-        if size > cls.MAX_SIZE_BYTES:
-            raise ValueError(f"File too large. Maximum size is {cls.MAX_SIZE_MB}MB.")
+        max_mb = cls.max_size_mb()
+        if size > max_mb * 1024 * 1024:
+            raise ValueError(f"File too large. Maximum size is {max_mb:g}MB.")
         if size < 100:
             raise ValueError("File is empty or unreadable.")
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Document sections for section-aware summaries
+Sections come from the top-level PDF outline (bookmarks) when it has at least two usable entries,
+otherwise from fixed-size groups of pages; each gets a share of a document-wide sentence budget
+"""
+import bisect
+import logging
+
+from extraction import open_pdf
+
+logger = logging.getLogger(__name__)
+
+FRONT_MATTER = 'Front matter'
+
+
+def outline_starts(pdf_stream):
+    """(first page, title) of each top-level outline entry, by page; 0-based page numbers."""
+    try:
+        reader = open_pdf(pdf_stream)
+        outline = reader.outline
+    except Exception as e:
+        logger.warning(f"Could not read the PDF outline: {e}")
+        return []
+    starts = {}
+    for item in outline:
+        if isinstance(item, list): # children of the previous entry
+            continue
+        try:
+            page = reader.get_destination_page_number(item)
+        except Exception:
+            continue
+        if page is not None and page >= 0:
+            starts.setdefault(page, str(item.title or '').strip() or f"Page {page + 1}")
+    return sorted(starts.items())
+
+
+def document_sections(pdf_stream, page_count, pages_per_section=10):
+    """
+    Sections covering all ``page_count`` pages, as dicts with a title and 1-based inclusive
+    ``start_page``/``end_page``. Pages before the first bookmark form a front-matter section.
+    """
+    starts = [(page, title) for page, title in outline_starts(pdf_stream) if page < page_count]
+    if len(starts) >= 2:
+        if starts[0][0] > 0:
+            starts.insert(0, (0, FRONT_MATTER))
+    else:
+        size = max(1, pages_per_section)
+        starts = [
+            (page, f"Pages {page + 1}-{min(page + size, page_count)}")
+            for page in range(0, page_count, size)
+        ]
+    ends = [page for page, _ in starts[1:]] + [page_count]
+    return [
+        {'title': title, 'start_page': start + 1, 'end_page': end}
+        for (start, title), end in zip(starts, ends)
+    ]
+
+
+def assign_pages(sections, page_numbers, pages):
+    """The texts of the extracted (0-based) ``page_numbers`` that fall in each section."""
+    firsts = [section['start_page'] - 1 for section in sections]
+    grouped = [[] for _ in sections]
+    for page_number, text in zip(page_numbers, pages):
+        grouped[bisect.bisect_right(firsts, page_number) - 1].append(text)
+    return grouped
+
+
+def allocate_sentences(sizes, per_section, budget):
+    """
+    Summary sentences for sections of ``sizes`` sentences.
+
+    Every section asks for ``per_section`` (at most its own size). When that exceeds ``budget``,
+    sections get two sentences (the summarizers' minimum) largest first while the budget lasts,
+    then the rest goes one by one to the section with the most sentences per allocated one.
+    """
+    wants = [min(per_section, size) for size in sizes]
+    if sum(wants) <= budget:
+        return wants
+    allocated = [0] * len(sizes)
+    remaining = budget
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i]):
+        first = min(2, wants[i])
+        if first and first <= remaining:
+            allocated[i] = first
+            remaining -= first
+    while remaining > 0:
+        open_sections = [i for i, n in enumerate(allocated) if 0 < n < wants[i]]
+        if not open_sections:
+            break
+        i = max(open_sections, key=lambda i: sizes[i] / (allocated[i] + 1))
+        allocated[i] += 1
+        remaining -= 1
+    return allocated
@@ -0,0 +1,181 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from admission import AdmissionController, OverloadedError, estimate_cost
+
+
+def hold(controller, algorithms, cost, release, admitted=None):
+    """Acquire on a thread and keep the ticket until ``release`` is set."""
+    def run():
+        with controller.admit(algorithms, cost, wait=True):
+            if admitted is not None:
+                admitted.set()
+            release.wait(5)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+class TestEstimateCost:
+    def test_grows_with_pages_size_and_algorithms(self):
+        assert estimate_cost(["frequency"], 10, 0) < estimate_cost(["frequency"], 100, 0)
+        assert estimate_cost(["frequency"], 10, 0) < estimate_cost(["frequency"], 10, 10 << 20)
+        assert estimate_cost(["frequency"], 10, 0) < estimate_cost(["textrank"], 10, 0)
+        assert estimate_cost(["tfidf", "textrank"], 10, 0) < estimate_cost(
+            ["tfidf"], 10, 0) + estimate_cost(["textrank"], 10, 0) # extraction is shared
+
+    def test_an_empty_document_still_costs_something(self):
+        assert estimate_cost(["llm"], 0, 0) > 0
+
+
+class TestAdmissionController:
+    def test_admits_within_budget_and_releases(self):
+        controller = AdmissionController(budget=10, max_active=3)
+        first = controller.acquire(["frequency"], 4)
+        second = controller.acquire(["tfidf"], 4)
+        assert controller.stats()["running_cost"] == 8
+        controller.release(first)
+        controller.release(second)
+        controller.release(second) # a response may be closed twice
+        stats = controller.stats()
+        assert (stats["running"], stats["running_cost"], stats["admitted"]) == (0, 0, 2)
+
+    def test_rejects_when_the_queue_is_full(self):
+        controller = AdmissionController(budget=10, max_active=1, max_queued=0, retry_after=7)
+        ticket = controller.acquire(["frequency"], 1)
+        with pytest.raises(OverloadedError) as excinfo:
+            controller.acquire(["frequency"], 1)
+        assert excinfo.value.retry_after == 7
+        assert excinfo.value.reason == "queue_full"
+        assert controller.stats()["rejected"] == {"queue_full": 1, "timeout": 0}
+        controller.release(ticket)
+        controller.release(controller.acquire(["frequency"], 1))
+
+    def test_queued_request_times_out(self):
+        controller = AdmissionController(budget=10, max_queued=1, queue_timeout=0.05)
+        ticket = controller.acquire(["textrank"], 10)
+        started = time.perf_counter()
+        with pytest.raises(OverloadedError) as excinfo:
+            controller.acquire(["frequency"], 1)
+        assert excinfo.value.reason == "timeout"
+        assert 0.05 <= time.perf_counter() - started < 1
+        assert controller.stats()["queued"] == 0
+        controller.release(ticket)
+
+    def test_queued_request_runs_when_room_frees(self):
+        controller = AdmissionController(budget=10, max_queued=1, queue_timeout=5)
+        release = threading.Event()
+        admitted = threading.Event()
+        thread = hold(controller, ["frequency"], 8, release, admitted)
+        admitted.wait(5)
+        result = {}
+
+        def queued():
+            with controller.admit(["frequency"], 5):
+                result["admitted"] = True
+        waiter = threading.Thread(target=queued)
+        waiter.start()
+        wait_until(lambda: controller.stats()["queued"] == 1)
+        release.set()
+        waiter.join(5)
+        thread.join(5)
+        assert result == {"admitted": True}
+        assert controller.stats()["running"] == 0
+
+    def test_per_algorithm_limit(self):
+        controller = AdmissionController(budget=100, max_active=4, limits={"textrank": 1},
+                                         max_queued=0)
+        ticket = controller.acquire(["textrank"], 1)
+        with pytest.raises(OverloadedError):
+            controller.acquire(["textrank"], 1)
+        with pytest.raises(OverloadedError): # compare requests hold every algorithm they run
+            controller.acquire(["frequency", "textrank"], 1)
+        controller.release(controller.acquire(["frequency"], 1))
+        controller.release(ticket)
+
+    def test_oversized_request_runs_alone(self):
+        controller = AdmissionController(budget=10, max_active=4, max_queued=0)
+        big = controller.acquire(["textrank"], 50)
+        assert controller.stats()["running_cost"] == 10
+        with pytest.raises(OverloadedError):
+            controller.acquire(["frequency"], 1)
+        controller.release(big)
+        small = controller.acquire(["frequency"], 1)
+        with pytest.raises(OverloadedError):
+            controller.acquire(["textrank"], 50)
+        controller.release(small)
+
+    def test_background_work_waits_without_using_the_queue(self):
+        controller = AdmissionController(budget=10, max_active=1, max_queued=0)
+        ticket = controller.acquire(["llm"], 1)
+        release = threading.Event()
+        admitted = threading.Event()
+        thread = hold(controller, ["llm"], 1, release, admitted)
+        wait_until(lambda: controller.stats()["waiting_background"] == 1)
+        assert controller.stats()["queued"] == 0
+        controller.release(ticket)
+        assert admitted.wait(5)
+        release.set()
+        thread.join(5)
+
+    def test_background_work_leaves_a_slot_for_requests(self):
+        controller = AdmissionController(budget=10, max_active=2, max_queued=0)
+        assert controller.max_background == 1
+        release = threading.Event()
+        admitted = threading.Event()
+        job = hold(controller, ["llm"], 1, release, admitted)
+        admitted.wait(5)
+        second = threading.Event()
+        waiting = hold(controller, ["llm"], 1, release, second)
+        wait_until(lambda: controller.stats()["waiting_background"] == 1)
+        assert not second.is_set() # a slot is free, but not for background work
+        controller.release(controller.acquire(["frequency"], 1)) # requests still get it
+        release.set()
+        for thread in (job, waiting):
+            thread.join(5)
+        assert second.is_set()
+        assert controller.stats()["running_background"] == 0
+
+    def test_retry_hint_follows_observed_work(self):
+        controller = AdmissionController(budget=10, max_active=1, max_queued=0, retry_after=30)
+        ticket = controller.acquire(["frequency"], 1)
+        time.sleep(0.05)
+        controller.release(ticket) # about 0.05 s per unit
+        ticket = controller.acquire(["frequency"], 10)
+        with pytest.raises(OverloadedError) as excinfo:
+            controller.acquire(["frequency"], 1)
+        assert 1 <= excinfo.value.retry_after < 30
+        controller.release(ticket)
+
+    def test_records_metrics(self):
+        from metrics import Metrics
+
+        metrics = Metrics()
+        controller = AdmissionController(budget=10, max_active=1, max_queued=0, metrics=metrics)
+        ticket = controller.acquire(["tfidf"], 3)
+        with pytest.raises(OverloadedError):
+            controller.acquire(["tfidf"], 1)
+        text = metrics.render()
+        assert "summarizer_admission_running_cost 3" in text
+        assert ('summarizer_admission_rejections_total{algorithm="tfidf",reason="queue_full"} 1'
+                in text)
+        controller.release(ticket)
+        assert "summarizer_admission_running_cost 0" in metrics.render()
+
+    def test_rejects_invalid_settings(self):
+        with pytest.raises(ValueError):
+            AdmissionController(budget=0)
+        with pytest.raises(ValueError):
+            AdmissionController(max_active=0)
@@ -21,6 +21,68 @@ Natural language processing improved dramatically in the late 2010s, with large
 """
 
 
+class TestPreprocess:
+    def test_builds_sentences_and_spans(self, summarizer):
+        doc = summarizer.preprocess(SAMPLE_TEXT)
+        assert len(doc.sentences) == 6
+        for sentence, (start, end) in zip(doc.sentences, doc.spans):
+            assert doc.text[start:end] == sentence
+
+    def test_token_lists_are_per_sentence(self, summarizer):
+        doc = summarizer.preprocess(SAMPLE_TEXT)
+        assert len(doc.sentence_tokens) == len(doc.sentences)
+        assert len(doc.sentence_terms) == len(doc.sentences)
+        assert "the" not in doc.filtered_tokens
+        assert "intelligence" in doc.filtered_tokens
+
+    def test_terms_match_treebank_tokenization(self, summarizer):
+        doc = summarizer.preprocess("We cannot stop. They don't know John's plan.")
+        assert "cannot" not in doc.sentence_terms[0]
+        assert doc.sentence_terms[1] == ["dont", "know", "johns", "plan"]
+
+    def test_terms_match_legacy_prepare_sentences(self, summarizer):
+        import re
+
+        from nltk.tokenize import word_tokenize
+
+        text = SAMPLE_TEXT + " We cannot stop. They don't know John's plan, gonna try."
+        doc = summarizer.preprocess(text)
+        for sentence, terms in zip(doc.sentences, doc.sentence_terms):
+            words = word_tokenize(re.sub(r"[^\w\s]", "", sentence.lower()))
+            legacy = [w for w in words if w not in summarizer.stop_words and w.isalpha()]
+            assert terms == legacy
+
+    def test_pages_are_split_into_sentences_across_page_breaks(self, summarizer):
+        pages = [
+            "The first sentence is complete. The second sentence continues",
+            "onto the next page. A third one.",
+        ]
+        doc = summarizer.preprocess_pages(iter(pages))
+        assert doc.sentences == [
+            "The first sentence is complete.",
+            "The second sentence continues onto the next page.",
+            "A third one.",
+        ]
+        assert doc.raw_text == "\n".join(pages)
+
+    def test_pages_match_whole_text_preprocessing(self, summarizer):
+        doc = summarizer.preprocess_pages(["", SAMPLE_TEXT, ""])
+        assert doc.sentences == summarizer.preprocess(SAMPLE_TEXT).sentences
+
+    def test_returns_existing_document_unchanged(self, summarizer):
+        doc = summarizer.preprocess(SAMPLE_TEXT)
+        assert summarizer.preprocess(doc) is doc
+
+    def test_generate_summary_splits_sentences_once(self, summarizer, monkeypatch):
+        calls = []
+        original = summarizer.tokenizer.sentences
+        monkeypatch.setattr(
+            summarizer.tokenizer, "sentences", lambda t: calls.append(t) or original(t)
+        )
+        summarizer.generate_summary(SAMPLE_TEXT, method="textrank", num_sentences=2)
+        assert len(calls) == 1
+
+
 class TestFrequencySummarize:
     def test_returns_summary_of_requested_length(self, summarizer):
         result = summarizer.frequency_summarize(SAMPLE_TEXT, num_sentences=2)
@@ -57,6 +119,23 @@ class TestTfidfSummarize:
 
 
 class TestTextRankSummarizer:
+    def test_matches_legacy_ranking_on_sample_text(self, summarizer):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+        from test_textrank import legacy_textrank
+
+        doc = summarizer.preprocess(SAMPLE_TEXT)
+        prepared = [" ".join(terms) for terms in doc.sentence_terms]
+        tfidf_matrix = TfidfVectorizer().fit_transform(prepared)
+        expected = legacy_textrank(cosine_similarity(tfidf_matrix))
+        scores = summarizer.textrank.scores(tfidf_matrix)
+        assert list(scores.argsort()) == list(expected.argsort())
+
+        for n in (2, 3, 4):
+            top = sorted(expected.argsort()[-n:][::-1])
+            legacy_summary = " ".join(doc.sentences[i] for i in top)
+            assert summarizer.textrank_summarizer(SAMPLE_TEXT, num_sentences=n) == legacy_summary
+
     def test_returns_summary(self, summarizer):
         result = summarizer.textrank_summarizer(SAMPLE_TEXT, num_sentences=3)
         assert len(result) > 0
@@ -67,6 +146,20 @@ class TestTextRankSummarizer:
         assert result == short
 
 
+class TestSettings:
+    def test_malformed_textrank_env_falls_back_to_defaults(self, monkeypatch):
+        monkeypatch.setenv("TEXTRANK_DAMPING", "not-a-number")
+        monkeypatch.setenv("TEXTRANK_MAX_ITER", "1.5")
+        summarizer = AdvSummarizer()
+        assert summarizer.textrank.damping == 0.5
+        assert summarizer.textrank.max_iter == 50
+
+    def test_out_of_range_textrank_env_falls_back_to_defaults(self, monkeypatch):
+        monkeypatch.setenv("TEXTRANK_DAMPING", "3")
+        summarizer = AdvSummarizer()
+        assert summarizer.textrank.damping == 0.5
+
+
 class TestGenerateSummary:
     def test_calls_correct_algorithm(self, summarizer):
         result = summarizer.generate_summary(SAMPLE_TEXT, method="frequency", num_sentences=3)
@@ -95,4 +188,39 @@ class TestGenerateSummary:
 
     def test_clamps_sentence_range(self, summarizer):
         result = summarizer.generate_summary(SAMPLE_TEXT, method="frequency", num_sentences=100)
-        assert result["sentences_requested"] == 10
\ No newline at end of file
+        assert result["sentences_requested"] == 10
+
+
+class TestLazyImports:
+    def loaded_modules(self, setup, modules):
+        """Which of ``modules`` a fresh interpreter has imported after running ``setup``."""
+        import subprocess
+        backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = (
+            f"import sys\n{setup}\n"
+            f"print('modules:', *[m for m in {modules!r} if m in sys.modules])"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=backend, capture_output=True, text=True,
+            check=True, env={**os.environ, "GOOGLE_API_KEY": "test-key"},
+        ).stdout
+        # the app logs to stdout as well
+        line = [line for line in output.splitlines() if line.startswith("modules:")][-1]
+        return line.split()[1:]
+
+    def test_importing_the_app_defers_heavy_libraries(self):
+        heavy = ["nltk", "sklearn", "scipy", "google.generativeai"]
+        assert self.loaded_modules("import app", heavy) == []
+
+    def test_warm_up_loads_extractive_libraries_but_not_gemini(self):
+        modules = ["nltk", "scipy", "google.generativeai"]
+        assert self.loaded_modules("import app\napp.warm_up()", modules) == ["nltk", "scipy"]
+
+    def test_model_is_created_on_first_use(self, monkeypatch):
+        monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+        summarizer = AdvSummarizer()
+        assert not summarizer.llm_configured
+        assert summarizer.model is None
+
+        summarizer.model = object()
+        assert summarizer.llm_configured
@@ -2,19 +2,46 @@ import pytest
 import sys
 import os
 import io
+import json
+import time
+import zipfile
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import app
+from app import app, extraction_cache, ranking_cache, summary_cache
+from benchmarks.synthetic import build_pdf
 
 
 @pytest.fixture
 def client():
     app.config["TESTING"] = True
+    summary_cache.clear()
+    extraction_cache.clear()
+    ranking_cache.clear()
     with app.test_client() as client:
         yield client
 
 
+MULTIPART = "multipart/form-data"
+
+PAGE_TEXT = (
+    "Solar panels convert sunlight into electricity using photovoltaic cells.\n"
+    "Wind turbines generate electricity from moving air in open landscapes.\n"
+    "Battery storage smooths the supply of renewable electricity over the day.\n"
+    "Grid operators balance electricity demand against renewable generation.\n"
+)
+
+
+def post_pdf(client, text=PAGE_TEXT, name="report.pdf", **form):
+    return client.post("/summarize", data=pdf_upload(text, name, **form), content_type=MULTIPART)
+
+
+def pdf_upload(text=PAGE_TEXT, name="report.pdf", **form):
+    data = {"file": (io.BytesIO(build_pdf([text, text])), name, "application/pdf")}
+    data.update(form)
+    return data
+
+
 class TestHealth:
     def test_health_returns_200(self, client):
         resp = client.get("/health")
@@ -24,6 +51,13 @@ class TestHealth:
         assert "timestamp" in data
 
 
+class TestStatus:
+    def test_status_reports_cache_counters(self, client):
+        resp = client.get("/status")
+        assert resp.status_code == 200
+        assert "summaries" in resp.get_json()["cache"]
+
+
 class TestSummarize:
     def test_no_file_returns_400(self, client):
         resp = client.post("/summarize")
@@ -60,4 +94,603 @@ class TestSummarize:
         resp = client.post(
             "/summarize", data=data, content_type="multipart/form-data"
         )
-        assert resp.status_code == 400
\ No newline at end of file
+        assert resp.status_code == 400
+
+    def test_repeat_upload_is_served_from_cache(self, client):
+        first = post_pdf(client, algorithm="frequency", num_sentences="2")
+        assert first.status_code == 200
+        assert first.get_json()["cached"] is False
+
+        second = post_pdf(client, name="renamed.pdf", algorithm="frequency", num_sentences="2")
+        assert second.get_json()["cached"] is True
+        assert second.get_json()["filename"] == "renamed.pdf"
+        assert second.get_json()["summary"] == first.get_json()["summary"]
+
+    def test_cache_key_includes_algorithm_and_sentence_count(self, client):
+        post_pdf(client, algorithm="frequency", num_sentences="2")
+        other_algorithm = post_pdf(client, algorithm="tfidf", num_sentences="2")
+        other_length = post_pdf(client, algorithm="frequency", num_sentences="3")
+        assert other_algorithm.get_json()["cached"] is False
+        assert other_length.get_json()["statistics"]["summary_sentences"] == 3
+        assert summary_cache.stats()["entries"] == 2 # the new length is sliced from the ranking
+
+    def test_failed_llm_summary_is_not_cached(self, client):
+        post_pdf(client, algorithm="llm")
+        assert post_pdf(client, algorithm="llm").get_json()["cached"] is False
+
+    def test_algorithm_switch_reuses_extracted_pages(self, client, monkeypatch):
+        import app as app_module
+
+        calls = []
+        original = app_module.extract_pages
+        monkeypatch.setattr(app_module, "extract_pages", lambda b: calls.append(1) or original(b))
+        for algorithm in ("frequency", "tfidf", "textrank"):
+            assert post_pdf(client, algorithm=algorithm).status_code == 200
+        assert len(calls) == 1
+        assert extraction_cache.stats()["hits"] == 2
+
+    def test_page_budget_limits_summarized_text(self, client):
+        full = post_pdf(client, algorithm="frequency").get_json()
+        budgeted = post_pdf(client, algorithm="frequency", max_pages="1").get_json()
+        assert budgeted["cached"] is False
+        assert budgeted["parameters"]["max_pages"] == 1
+        assert budgeted["statistics"]["original_length"] < full["statistics"]["original_length"]
+
+    def test_server_page_limit_caps_request(self, client, monkeypatch):
+        monkeypatch.setenv("MAX_PAGES", "1")
+        resp = post_pdf(client, algorithm="frequency", max_pages="5").get_json()
+        assert resp["parameters"]["max_pages"] == 1
+
+    def test_invalid_page_sampling_returns_400(self, client):
+        assert post_pdf(client, page_sampling="random").status_code == 400
+
+    def test_sections_return_per_section_summaries(self, client, monkeypatch):
+        monkeypatch.setenv("SECTION_PAGES", "1")
+        monkeypatch.setenv("SECTION_SENTENCE_BUDGET", "4")
+        whole = post_pdf(client, algorithm="textrank").get_json()
+        assert "sections" not in whole
+
+        body = post_pdf(client, algorithm="textrank", sections="true", section_budget="9")
+        body = body.get_json()
+        assert body["cached"] is False
+        assert body["parameters"]["sections"] is True
+        assert body["parameters"]["section_budget"] == 4
+        assert [(s["title"], s["start_page"], s["end_page"]) for s in body["sections"]] == [
+            ("Pages 1-1", 1, 1), ("Pages 2-2", 2, 2),
+        ]
+        assert all(s["summary"] and s["sentences"] == 2 for s in body["sections"])
+        assert body["statistics"]["summary_sentences"] == 4
+
+
+class TestCorpusIdf:
+    def test_a_document_is_learned_once_across_algorithms(self, client, tmp_path, monkeypatch):
+        from app import summarizer
+        from idf_store import IdfStore
+
+        monkeypatch.setattr(summarizer, "idf_store", IdfStore(str(tmp_path / "idf.npy"), 1024))
+        monkeypatch.setattr(summarizer, "idf_learn", True)
+        for algorithm in ("tfidf", "textrank"): # two summary-cache misses, one extraction
+            assert post_pdf(client, algorithm=algorithm).status_code == 200
+        assert client.post("/summarize/ranking", data=pdf_upload(algorithm="frequency"),
+                           content_type=MULTIPART).status_code == 200
+        assert summarizer.idf_store.documents == 1
+
+
+class TestRankings:
+    TEXT = (
+        "Solar panels convert sunlight into electricity using photovoltaic cells.\n"
+        "Wind turbines generate electricity from moving air in open landscapes.\n"
+        "Battery storage smooths the supply of renewable electricity over the day.\n"
+        "Grid operators balance electricity demand against renewable generation.\n"
+        "Heat pumps move heat from cold outdoor air into warm houses.\n"
+        "Hydropower dams store water and release it through turbines on demand.\n"
+    )
+
+    def fresh_summaries(self, client, algorithm):
+        summaries = {}
+        for n in range(2, 11):
+            summary_cache.clear()
+            ranking_cache.clear()
+            resp = post_pdf(client, self.TEXT, algorithm=algorithm, num_sentences=str(n))
+            summaries[n] = resp.get_json()
+        return summaries
+
+    @pytest.mark.parametrize("algorithm", ["frequency", "tfidf", "textrank"])
+    def test_other_lengths_are_sliced_from_the_ranking(self, client, monkeypatch, algorithm):
+        import app as app_module
+
+        fresh = self.fresh_summaries(client, algorithm)
+        summary_cache.clear()
+        ranking_cache.clear()
+        post_pdf(client, self.TEXT, algorithm=algorithm, num_sentences="3")
+
+        def no_preprocessing(pages):
+            raise AssertionError("the document was preprocessed again")
+
+        monkeypatch.setattr(app_module.summarizer, "preprocess_pages", no_preprocessing)
+        for n in range(2, 11):
+            sliced = post_pdf(client, self.TEXT, algorithm=algorithm, num_sentences=str(n))
+            data = sliced.get_json()
+            assert data["cached"] is True
+            assert data["summary"] == fresh[n]["summary"]
+            assert data["statistics"] == fresh[n]["statistics"]
+            assert data["algorithm_used"] == fresh[n]["algorithm_used"]
+
+    def test_llm_and_section_summaries_are_not_ranked(self, client):
+        post_pdf(client, algorithm="llm")
+        post_pdf(client, algorithm="textrank", sections="true")
+        assert ranking_cache.stats()["entries"] == 0
+
+    def test_ranking_endpoint_returns_every_sentence_best_first(self, client):
+        resp = client.post(
+            "/summarize/ranking", data=pdf_upload(self.TEXT, algorithm="tfidf"),
+            content_type=MULTIPART,
+        )
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["algorithm_used"] == "TF-IDF" and data["cached"] is False
+        assert sorted(data["ranking"]) == list(range(len(data["sentences"])))
+        assert len(data["offsets"]) == len(data["sentences"]) == 12
+        for n in (2, 5):
+            sliced = " ".join(data["sentences"][i] for i in sorted(data["ranking"][:n]))
+            summary = post_pdf(client, self.TEXT, algorithm="tfidf", num_sentences=str(n))
+            assert summary.get_json()["summary"] == sliced
+
+    def test_ranking_endpoint_reuses_the_summary_ranking(self, client):
+        post_pdf(client, algorithm="textrank")
+        resp = client.post(
+            "/summarize/ranking", data=pdf_upload(algorithm="textrank"), content_type=MULTIPART
+        )
+        assert resp.get_json()["cached"] is True
+
+    def test_ranking_endpoint_rejects_llm(self, client):
+        resp = client.post(
+            "/summarize/ranking", data=pdf_upload(algorithm="llm"), content_type=MULTIPART
+        )
+        assert resp.status_code == 400
+        assert "frequency, tfidf, textrank" in resp.get_json()["error"]
+
+
+class TestCompare:
+    def compare(self, client, **form):
+        return client.post("/summarize/compare", data=pdf_upload(**form), content_type=MULTIPART)
+
+    def test_matches_separate_summaries_with_one_extraction(self, client, monkeypatch):
+        import app as app_module
+
+        separate = {}
+        for algorithm in ("frequency", "tfidf", "textrank", "llm"):
+            separate[algorithm] = post_pdf(client, algorithm=algorithm).get_json()
+        summary_cache.clear()
+        extraction_cache.clear()
+        ranking_cache.clear()
+        calls = []
+        extract = app_module.extract_pages
+        monkeypatch.setattr(app_module, "extract_pages", lambda b: calls.append(1) or extract(b))
+        preprocess = app_module.summarizer.preprocess_pages
+        monkeypatch.setattr(app_module.summarizer, "preprocess_pages",
+                            lambda pages: calls.append(2) or preprocess(pages))
+
+        resp = self.compare(client)
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert calls == [1, 2]
+        assert data["algorithms"] == ["frequency", "tfidf", "textrank", "llm"]
+        for algorithm, result in zip(data["algorithms"], data["results"]):
+            assert result["parameters"]["algorithm"] == algorithm
+            assert result["summary"] == separate[algorithm]["summary"]
+            assert result["statistics"] == separate[algorithm]["statistics"]
+            assert result["seconds"] >= 0
+
+    def test_algorithms_run_at_the_same_time(self, client, monkeypatch):
+        import app as app_module
+
+        generate = app_module.summarizer.generate_summary
+
+        def slow(*args, **kwargs):
+            time.sleep(0.4)
+            return generate(*args, **kwargs)
+
+        monkeypatch.setattr(app_module.summarizer, "generate_summary", slow)
+        data = self.compare(client).get_json()
+        assert all(result["seconds"] >= 0.4 for result in data["results"])
+        assert data["seconds"] < 1.2 # four sequential calls would take 1.6s
+
+    def test_cached_algorithms_are_not_summarized_again(self, client):
+        post_pdf(client, algorithm="tfidf")
+        data = self.compare(client, algorithms="tfidf,textrank").get_json()
+        assert [result["cached"] for result in data["results"]] == [True, False]
+
+    def test_failed_algorithm_is_reported_alone(self, client, monkeypatch):
+        import app as app_module
+
+        generate = app_module.summarizer.generate_summary
+
+        def failing_textrank(*args, method=None, **kwargs):
+            if method == "textrank":
+                raise RuntimeError("graph failed")
+            return generate(*args, method=method, **kwargs)
+
+        monkeypatch.setattr(app_module.summarizer, "generate_summary", failing_textrank)
+        data = self.compare(client, algorithms=["tfidf", "textrank"]).get_json()
+        assert data["results"][0]["success"] is True
+        assert data["results"][1] == {
+            "success": False, "algorithm": "textrank", "error": "graph failed",
+            "seconds": data["results"][1]["seconds"],
+        }
+
+    def test_invalid_requests_return_400(self, client):
+        assert self.compare(client, algorithms="tfidf,lsa").status_code == 400
+        assert self.compare(client, sections="true").status_code == 400
+
+
+def stream_events(resp):
+    return [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+
+
+class TestStreaming:
+    @pytest.fixture
+    def model(self, monkeypatch):
+        import app as app_module
+        from benchmarks.fake_llm import FakeModel
+
+        model = FakeModel(delay=0.6, reply="Renewable electricity is growing on every grid.")
+        monkeypatch.setattr(app_module.summarizer, "_model", model)
+        monkeypatch.setattr(app_module.summarizer, "_model_ready", True)
+        return model
+
+    def test_llm_tokens_arrive_before_the_result(self, client, model):
+        started = time.perf_counter()
+        resp = client.post("/summarize", data=pdf_upload(algorithm="llm", stream="true"),
+                           content_type=MULTIPART, buffered=False)
+        assert resp.mimetype == "application/x-ndjson"
+        lines = iter(resp.response)
+        first = json.loads(next(lines))
+        assert first == {"event": "started", "filename": "report.pdf", "algorithm": "llm"}
+        assert time.perf_counter() - started < 0.5 # before the model has answered
+        events = [json.loads(line) for line in "".join(
+            chunk.decode() if isinstance(chunk, bytes) else chunk for chunk in lines
+        ).splitlines()]
+        kinds = [event["event"] for event in events]
+        assert kinds[-1] == "result" and "error" not in kinds
+        assert kinds.index("progress") < kinds.index("token")
+        tokens = [event["text"] for event in events if event["event"] == "token"]
+        assert len(tokens) == 7
+        result = events[-1]
+        assert "".join(tokens) == result["summary"]
+        assert result["success"] is True and result["cached"] is False
+
+    def test_extractive_summary_streams_progress_then_result(self, client):
+        resp = client.post("/summarize", data=pdf_upload(algorithm="tfidf"),
+                           content_type=MULTIPART, headers={"Accept": "application/x-ndjson"})
+        events = stream_events(resp)
+        assert [e["event"] for e in events] == ["started"] + ["progress"] * 3 + ["result"]
+        assert [e["stage"] for e in events[1:4]] == ["extracting", "extracting", "summarizing"]
+        assert events[-1]["summary"] == post_pdf(client, algorithm="tfidf").get_json()["summary"]
+
+    def test_cached_summary_is_streamed_at_once(self, client):
+        post_pdf(client, algorithm="frequency")
+        events = stream_events(post_pdf(client, algorithm="frequency", stream="true"))
+        assert [e["event"] for e in events] == ["started", "result"]
+        assert events[-1]["cached"] is True
+
+    def test_errors_are_streamed(self, client):
+        events = stream_events(post_pdf(client, text="Too short.", algorithm="tfidf",
+                                        stream="true"))
+        assert events[-1] == {
+            "event": "error", "error": "Insufficient text content in PDF for summarization.",
+        }
+
+    def test_streamed_upload_copy_is_removed(self, client, tmp_path, monkeypatch):
+        monkeypatch.setenv("UPLOAD_SPOOL_DIR", str(tmp_path))
+        pdf = build_pdf([PAGE_TEXT, PAGE_TEXT], padding_bytes=600 * 1024)
+        resp = client.post("/summarize", content_type=MULTIPART, data={
+            "file": (io.BytesIO(pdf), "large.pdf", "application/pdf"),
+            "algorithm": "frequency", "stream": "true",
+        })
+        assert stream_events(resp)[-1]["event"] == "result"
+        assert not os.listdir(tmp_path)
+
+
+class TestSpooledUploads:
+    @pytest.fixture
+    def sources(self, monkeypatch):
+        import app as app_module
+
+        seen = []
+        original = app_module.summarize_upload
+
+        def recording(pdf_content, *args, **kwargs):
+            seen.append((pdf_content, isinstance(pdf_content, str) and os.path.exists(pdf_content)))
+            return original(pdf_content, *args, **kwargs)
+
+        monkeypatch.setattr(app_module, "summarize_upload", recording)
+        return seen
+
+    def large_upload(self, **form):
+        pdf = build_pdf([PAGE_TEXT, PAGE_TEXT], padding_bytes=600 * 1024)
+        return {"file": (io.BytesIO(pdf), "large.pdf", "application/pdf"), **form}
+
+    def test_large_upload_is_summarized_from_its_spool_file(self, client, sources, tmp_path,
+                                                            monkeypatch):
+        monkeypatch.setenv("UPLOAD_SPOOL_DIR", str(tmp_path))
+        resp = client.post("/summarize", data=self.large_upload(algorithm="frequency"),
+                           content_type=MULTIPART)
+        assert resp.status_code == 200
+        ((source, existed),) = sources
+        assert source.startswith(str(tmp_path)) and existed
+        assert not os.listdir(tmp_path) # removed with the request
+        small = post_pdf(client, algorithm="frequency").get_json()
+        assert resp.get_json()["summary"] == small["summary"]
+
+    def test_small_upload_stays_in_memory(self, client, sources):
+        assert post_pdf(client, algorithm="frequency").status_code == 200
+        assert isinstance(sources[0][0], bytes)
+
+    def test_job_keeps_its_own_copy_until_done(self, client, sources, tmp_path, monkeypatch):
+        monkeypatch.setenv("UPLOAD_SPOOL_DIR", str(tmp_path))
+        resp = client.post("/jobs", data=self.large_upload(algorithm="frequency"),
+                           content_type=MULTIPART)
+        status_url = resp.get_json()["status_url"]
+        deadline = time.time() + 10
+        while client.get(status_url).get_json()["status"] != "succeeded":
+            assert time.time() < deadline
+            time.sleep(0.05)
+        ((source, existed),) = sources
+        assert os.path.basename(source).startswith("job-") and existed
+        assert not os.listdir(tmp_path)
+
+
+class TestJobs:
+    def test_job_returns_summarize_payload(self, client):
+        resp = client.post("/jobs", data=pdf_upload(algorithm="frequency"), content_type=MULTIPART)
+        assert resp.status_code == 202
+        status_url = resp.get_json()["status_url"]
+
+        deadline = time.time() + 10
+        job = client.get(status_url).get_json()
+        while job["status"] not in ("succeeded", "failed") and time.time() < deadline:
+            time.sleep(0.05)
+            job = client.get(status_url).get_json()
+
+        assert job["status"] == "succeeded"
+        expected = post_pdf(client, algorithm="frequency").get_json()
+        assert job["result"]["summary"] == expected["summary"]
+        assert job["result"]["statistics"] == expected["statistics"]
+
+    def test_records_are_visible_to_other_workers_by_default(self, client):
+        import app as app_module
+        from jobs import JobManager
+
+        resp = client.post("/jobs", data=pdf_upload(algorithm="frequency"), content_type=MULTIPART)
+        other_worker = JobManager(db_path=app_module.JOB_DB_PATH)
+        assert other_worker.get(resp.get_json()["job_id"]) is not None
+
+    def test_invalid_upload_is_rejected_before_queueing(self, client):
+        data = {"file": (io.BytesIO(b"hello"), "doc.txt")}
+        assert client.post("/jobs", data=data, content_type=MULTIPART).status_code == 400
+
+    def test_unknown_job_returns_404(self, client):
+        assert client.get("/jobs/does-not-exist").status_code == 404
+
+    def test_full_queue_returns_503_with_retry_after(self, client, monkeypatch):
+        import app as app_module
+        from jobs import QueueFullError
+
+        def full(*args, **kwargs):
+            raise QueueFullError("busy")
+
+        monkeypatch.setattr(app_module.job_manager, "submit", full)
+        resp = client.post("/jobs", data=pdf_upload(), content_type=MULTIPART)
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"]
+
+
+OTHER_TEXT = (
+    "Contracts define the obligations of each party to an agreement.\n"
+    "A termination clause explains how either party may end the contract.\n"
+    "Payment terms set the schedule and currency of every invoice.\n"
+    "Liability caps limit the damages a party can claim after a breach.\n"
+)
+
+
+def pdf_file(text=PAGE_TEXT, name="report.pdf"):
+    return (io.BytesIO(build_pdf([text, text])), name, "application/pdf")
+
+
+def zip_file(members, name="batch.zip"):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as bundle:
+        for member, content in members.items():
+            bundle.writestr(member, content)
+    buffer.seek(0)
+    return (buffer, name, "application/zip")
+
+
+@pytest.fixture
+def inline_batch(monkeypatch):
+    monkeypatch.setenv("BATCH_WORKERS", "0")
+
+
+class TestBatch:
+    def test_results_and_errors_are_reported_per_file(self, client, inline_batch):
+        data = {
+            "files": [pdf_file(), pdf_file(OTHER_TEXT, "contract.pdf"),
+                      (io.BytesIO(b"hello"), "notes.txt")],
+            "algorithm": "frequency",
+        }
+        resp = client.post("/summarize/batch", data=data, content_type=MULTIPART)
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert (body["count"], body["succeeded"], body["failed"]) == (3, 2, 1)
+        names = [r["filename"] for r in body["results"]]
+        assert names == ["report.pdf", "contract.pdf", "notes.txt"]
+        assert body["results"][2]["success"] is False
+        single = post_pdf(client, algorithm="frequency").get_json()
+        assert body["results"][0]["summary"] == single["summary"]
+
+    def test_zip_members_are_summarized(self, client, inline_batch):
+        members = {
+            "docs/report.pdf": build_pdf([PAGE_TEXT, PAGE_TEXT]),
+            "docs/contract.pdf": build_pdf([OTHER_TEXT, OTHER_TEXT]),
+            "__MACOSX/docs/._report.pdf": b"metadata",
+        }
+        data = {"files": [zip_file(members)], "algorithm": "textrank"}
+        body = client.post("/summarize/batch", data=data, content_type=MULTIPART).get_json()
+        assert [r["filename"] for r in body["results"]] == ["report.pdf", "contract.pdf"]
+        assert body["succeeded"] == 2
+
+    def test_ndjson_streams_one_line_per_file(self, client, inline_batch):
+        data = {"files": [pdf_file(), pdf_file(OTHER_TEXT, "contract.pdf")], "algorithm": "tfidf"}
+        resp = client.post("/summarize/batch", data=data, content_type=MULTIPART,
+                           headers={"Accept": "application/x-ndjson"})
+        assert resp.mimetype == "application/x-ndjson"
+        lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        assert sorted(line["index"] for line in lines) == [0, 1]
+        assert all(line["success"] for line in lines)
+
+    def test_batch_limits_return_400(self, client, inline_batch, monkeypatch):
+        monkeypatch.setenv("BATCH_MAX_FILES", "1")
+        data = {"files": [pdf_file(), pdf_file(OTHER_TEXT, "contract.pdf")]}
+        assert client.post("/summarize/batch", data=data, content_type=MULTIPART).status_code == 400
+
+        monkeypatch.setenv("BATCH_MAX_FILES", "20")
+        monkeypatch.setenv("BATCH_MAX_TOTAL_MB", "0.001")
+        data = {"files": [zip_file({"big.pdf": b"x" * 4096})]}
+        assert client.post("/summarize/batch", data=data, content_type=MULTIPART).status_code == 400
+
+    def test_no_files_returns_400(self, client):
+        assert client.post("/summarize/batch", data={}, content_type=MULTIPART).status_code == 400
+
+    def test_process_pool_matches_single_uploads(self, client, monkeypatch):
+        import pipeline
+
+        monkeypatch.setenv("BATCH_WORKERS", "2")
+        data = {"files": [pdf_file(), pdf_file(OTHER_TEXT, "contract.pdf")],
+                "algorithm": "textrank"}
+        try:
+            body = client.post("/summarize/batch", data=data, content_type=MULTIPART).get_json()
+        finally:
+            pipeline.shutdown_batch_pool()
+        assert body["succeeded"] == 2
+        assert not any(r["cached"] for r in body["results"])
+        assert body["results"][1]["summary"] == post_pdf(
+            client, OTHER_TEXT, "contract.pdf", algorithm="textrank"
+        ).get_json()["summary"]
+        assert post_pdf(client, algorithm="textrank").get_json()["cached"]
+
+
+class TestAdmission:
+    @pytest.fixture
+    def busy(self, monkeypatch):
+        """A controller whose only slot is taken, with no queue."""
+        import app as app_module
+        from admission import AdmissionController
+
+        controller = AdmissionController(budget=100, max_active=1, max_queued=0, retry_after=7)
+        ticket = controller.acquire(["llm"], 1)
+        monkeypatch.setattr(app_module, "admission", controller)
+        yield controller, ticket
+        if controller.stats()["running"]:
+            controller.release(ticket)
+
+    def test_busy_server_returns_503_with_retry_after(self, client, busy):
+        resp = post_pdf(client, algorithm="frequency")
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "7"
+        assert resp.get_json()["error"]
+        assert busy[0].stats()["rejected"]["queue_full"] == 1
+
+    def test_every_summary_endpoint_is_admitted(self, client, busy):
+        ranking = client.post("/summarize/ranking", data=pdf_upload(algorithm="tfidf"),
+                              content_type=MULTIPART)
+        compare = client.post("/summarize/compare", data=pdf_upload(algorithms="tfidf"),
+                              content_type=MULTIPART)
+        batch = client.post("/summarize/batch", data={"files": [pdf_file()]},
+                            content_type=MULTIPART)
+        assert [r.status_code for r in (ranking, compare, batch)] == [503, 503, 503]
+        assert all(r.headers["Retry-After"] == "7" for r in (ranking, compare, batch))
+
+    def test_cached_summaries_health_and_status_answer_while_busy(self, client, monkeypatch):
+        import app as app_module
+        from admission import AdmissionController
+
+        expected = post_pdf(client, algorithm="frequency").get_json()
+        controller = AdmissionController(budget=100, max_active=1, max_queued=0)
+        ticket = controller.acquire(["textrank"], 1)
+        monkeypatch.setattr(app_module, "admission", controller)
+        try:
+            cached = post_pdf(client, algorithm="frequency")
+            assert cached.status_code == 200
+            assert cached.get_json()["summary"] == expected["summary"]
+            assert client.get("/health").status_code == 200
+            status = client.get("/status").get_json()["admission"]
+            assert (status["running"], status["by_algorithm"]) == (1, {"textrank": 1})
+        finally:
+            controller.release(ticket)
+
+    def test_streamed_request_is_rejected_before_the_stream_starts(self, client, busy):
+        resp = post_pdf(client, algorithm="tfidf", stream="true")
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "7"
+        assert resp.get_json()["error"]
+
+    def test_jobs_wait_for_room_instead_of_failing(self, client, busy):
+        controller, ticket = busy
+        resp = client.post("/jobs", data=pdf_upload(algorithm="frequency"), content_type=MULTIPART)
+        status_url = resp.get_json()["status_url"]
+        deadline = time.time() + 5
+        while controller.stats()["waiting_background"] == 0:
+            assert time.time() < deadline
+            time.sleep(0.01)
+        assert client.get(status_url).get_json()["status"] == "running"
+        controller.release(ticket)
+        job = client.get(status_url).get_json()
+        while job["status"] not in ("succeeded", "failed") and time.time() < deadline:
+            time.sleep(0.02)
+            job = client.get(status_url).get_json()
+        assert job["status"] == "succeeded"
+
+    def test_finished_requests_release_their_tickets(self, client, inline_batch):
+        import app as app_module
+
+        before = app_module.admission.stats()["admitted"]
+        post_pdf(client, algorithm="frequency")
+        client.post("/summarize/ranking", data=pdf_upload(algorithm="textrank"),
+                    content_type=MULTIPART)
+        resp = client.post("/summarize/batch", data={"files": [pdf_file()], "stream": "true"},
+                           content_type=MULTIPART)
+        resp.get_data()
+        events = stream_events(post_pdf(client, algorithm="tfidf", stream="true"))
+        assert events[-1]["event"] == "result"
+        deadline = time.time() + 5 # the stream's thread releases its ticket as it finishes
+        while app_module.admission.stats()["running"] and time.time() < deadline:
+            time.sleep(0.01)
+        stats = app_module.admission.stats()
+        assert stats["admitted"] == before + 4
+        assert (stats["running"], stats["running_cost"]) == (0, 0)
+
+
+class TestMetrics:
+    def test_timings_block_is_optional(self, client):
+        assert "timings" not in post_pdf(client, algorithm="tfidf").get_json()
+
+        timings = post_pdf(client, algorithm="textrank", timings="true").get_json()["timings"]
+        for name in ("upload", "extraction", "sentence_split", "tokenize", "graph", "ranking"):
+            assert name in timings
+        assert timings["total"] >= sum(v for k, v in timings.items() if k != "total") - 1e-3
+
+    def test_metrics_endpoint_exports_latency_cache_and_in_flight(self, client):
+        post_pdf(client, algorithm="frequency")
+        post_pdf(client, algorithm="frequency")
+
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/plain"
+        text = resp.get_data(as_text=True)
+        assert 'summarizer_summary_duration_seconds_bucket{algorithm="frequency"' in text
+        assert 'size="<10k"' in text
+        assert 'summarizer_stage_duration_seconds_count{stage="extraction"}' in text
+        assert 'summarizer_cache_requests_total{cache="summaries",result="hit"}' in text
+        assert 'summarizer_cache_hit_ratio{cache="summaries"}' in text
+        assert 'summarizer_requests_in_flight{endpoint="summarize"} 0' in text
@@ -0,0 +1,90 @@
+import copy
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.run import compare, run
+from benchmarks.synthetic import synthetic_pages
+
+
+class TestSynthetic:
+    def test_pages_are_deterministic_and_sized(self):
+        pages = synthetic_pages(3, chars_per_page=1000)
+        assert pages == synthetic_pages(3, chars_per_page=1000)
+        assert all(1000 <= len(page) < 1400 for page in pages)
+        assert synthetic_pages(1, seed=1) != synthetic_pages(1, seed=2)
+
+
+class TestHarness:
+    def test_reports_every_stage_for_each_size(self):
+        report = run([1], repeat=1)
+        (entry,) = report["results"]
+        assert entry["pages"] == 1 and entry["sentences"] > 0
+        for stage in ("extraction", "word_tokenize", "textrank_graph", "summarize_llm"):
+            assert entry["stages"][stage]["seconds"] >= 0
+            assert entry["stages"][stage]["peak_mb"] >= 0
+
+    def test_compare_flags_only_real_slowdowns(self):
+        baseline = {"results": [{"pages": 10, "stages": {
+            "extraction": {"seconds": 1.0},
+            "cleaning": {"seconds": 0.001},
+            "tfidf_scoring": {"seconds": 0.5},
+        }}]}
+        current = copy.deepcopy(baseline)
+        current["results"][0]["stages"]["extraction"]["seconds"] = 1.5
+        current["results"][0]["stages"]["cleaning"]["seconds"] = 0.003 # noise floor
+        current["results"][0]["stages"]["tfidf_scoring"]["seconds"] = 0.55
+
+        regressions = compare(current, baseline, tolerance=0.25)
+        assert [(r["pages"], r["stage"]) for r in regressions] == [(10, "extraction")]
+
+
+class TestCleaningBenchmark:
+    def test_reports_every_variant(self):
+        from benchmarks.cleaning import run as run_cleaning
+
+        report = run_cleaning(page_count=3, repeat=1)
+        assert set(report["results"]) == {"legacy_chain", "single_pass", "single_pass_all_options"}
+        assert all(r["mb_per_second"] > 0 for r in report["results"].values())
+
+
+class TestUploadMemoryBenchmark:
+    def test_spooled_extraction_does_not_hold_the_file(self):
+        from benchmarks.upload_memory import run as run_upload_memory
+
+        (entry,) = run_upload_memory(sizes_mb=[16], page_count=2)["results"]
+        assert entry["buffered_rss_growth_mb"] >= 16
+        assert entry["spooled_rss_growth_mb"] < 8
+
+
+class TestTextRankLshBenchmark:
+    def test_reports_agreement_with_the_exact_graph(self):
+        from benchmarks.textrank_lsh import run as run_textrank_lsh
+
+        (entry,) = run_textrank_lsh(pages=[20], prose=False, block=64)["results"]
+        assert entry["sentences"] > 64
+        assert 0 < entry["lsh_edges"] <= entry["exact_edges"]
+        assert 0 <= entry["top10_overlap"] <= 1
+        assert entry["spearman"] > 0.5
+
+
+class TestAdmissionBenchmark:
+    def test_reports_health_latency_for_both_runs(self):
+        from benchmarks.admission import run as run_admission
+
+        report = run_admission(requests=3, pages=2, algorithm="frequency", threads=2)
+        assert set(report["results"]) == {"unlimited", "admission"}
+        for result in report["results"].values():
+            assert result["answered"] + result["rejected_503"] == 3
+            assert result["health_max_seconds"] >= result["health_p50_seconds"] >= 0
+        assert report["results"]["unlimited"]["rejected_503"] == 0
+
+
+class TestTokenizationBenchmark:
+    def test_reports_agreement_and_throughput(self):
+        from benchmarks.tokenization import run as run_tokenization
+
+        report = run_tokenization(repeat=1, documents=["Solar panels work. Wind turbines spin."])
+        assert report["agreement"]["sentence_f1"] == 1.0
+        assert set(report["throughput"]) == {"nltk", "regex"}
+        assert all(r["mb_per_second"] > 0 for r in report["throughput"].values())
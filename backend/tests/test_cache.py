@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cache import ResultCache, content_hash
+
+
+class TestContentHash:
+    def test_same_bytes_same_hash(self):
+        assert content_hash(b"pdf") == content_hash(b"pdf")
+        assert content_hash(b"pdf") != content_hash(b"pdf2")
+
+    def test_file_hash_matches_bytes_hash(self, tmp_path):
+        path = tmp_path / "doc.pdf"
+        path.write_bytes(b"pdf" * 100_000)
+        assert content_hash(str(path)) == content_hash(b"pdf" * 100_000)
+
+
+class TestMemoryCache:
+    def test_miss_then_hit(self):
+        cache = ResultCache("summaries")
+        assert cache.get("k") is None
+        cache.set("k", {"summary": "x"})
+        assert cache.get("k") == {"summary": "x"}
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = ResultCache("summaries", max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_entries_expire_after_ttl(self, monkeypatch):
+        cache = ResultCache("summaries", ttl=10)
+        cache.set("k", 1)
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 11)
+        assert cache.get("k") is None
+
+
+class TestSqliteCache:
+    def test_entries_are_shared_between_instances(self, tmp_path):
+        db_path = str(tmp_path / "cache.db")
+        ResultCache("summaries", db_path=db_path).set("k", {"summary": "x"})
+        other_worker = ResultCache("summaries", db_path=db_path)
+        assert other_worker.get("k") == {"summary": "x"}
+        assert other_worker.stats()["backend"] == "sqlite"
+
+    def test_fresh_reads_see_updates_from_other_instances(self, tmp_path):
+        db_path = str(tmp_path / "cache.db")
+        reader = ResultCache("jobs", db_path=db_path)
+        writer = ResultCache("jobs", db_path=db_path)
+        writer.set("k", "queued")
+        assert reader.get("k") == "queued"
+        writer.set("k", "done")
+        assert reader.get("k") == "queued"
+        assert reader.get("k", fresh=True) == "done"
+
+    def test_compressed_values_round_trip(self, tmp_path):
+        db_path = str(tmp_path / "cache.db")
+        ResultCache("pages", db_path=db_path, compress=True).set("k", ["page one", "page two"])
+        assert ResultCache("pages", db_path=db_path, compress=True).get("k") == [
+            "page one",
+            "page two",
+        ]
+
+    def test_disk_is_trimmed_to_max_entries(self, tmp_path):
+        db_path = str(tmp_path / "cache.db")
+        cache = ResultCache("summaries", db_path=db_path, max_disk_entries=2)
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+        assert ResultCache("summaries", db_path=db_path).get("a") is None
+        assert ResultCache("summaries", db_path=db_path).get("c") == "c"
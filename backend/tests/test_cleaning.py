@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from adv_summ import AdvSummarizer
+from benchmarks.cleaning import legacy_clean, pdf_like_pages
+from cleaning import TextCleaner
+
+
+class TestClean:
+    def test_matches_the_legacy_chain_word_for_word(self):
+        cleaner = TextCleaner()
+        for page in pdf_like_pages(20):
+            # the old chain left a double space where an artifact was cut out
+            assert cleaner.clean(page).split() == legacy_clean(page).split()
+
+    @pytest.mark.parametrize("text, expected", [
+        ("  Intro\n\n page 12 \t text ", "Intro text"),
+        ("Due PAGE\n3 on 12/12 and 01/01/2024.", "Due on and /2024."),
+        ("Ratio 3 / 4 stays.", "Ratio 3 / 4 stays."),
+    ])
+    def test_removes_artifacts_and_collapses_whitespace(self, text, expected):
+        assert TextCleaner().clean(text) == expected
+
+    def test_hyphenation_joins_lower_case_continuations_only(self):
+        cleaner = TextCleaner(hyphenation=True)
+        text = "an exam-\n  ple of a well-\nKnown case"
+        assert cleaner.clean(text) == "an example of a well- Known case"
+        assert TextCleaner().clean(text) == "an exam- ple of a well- Known case"
+
+
+class TestCleanPages:
+    def test_strips_repeated_headers_and_footers_from_the_first_page_on(self):
+        pages = [f"Annual Report\nBody of section {i}.\nPage {i} of 9" for i in range(1, 10)]
+        pages[4] = "A unique first line\nBody.\nPage 5 of 9"
+        cleaned = [c for _, c in TextCleaner(repeated_edges=True).clean_pages(pages)]
+        assert cleaned[0] == "Body of section 1."
+        assert cleaned[4] == "A unique first line Body."
+        assert cleaned[-1] == "Body of section 9."
+
+    def test_yields_raw_pages_alongside_and_reads_lazily(self):
+        pulled = []
+
+        def pages():
+            for i in range(20):
+                pulled.append(i)
+                yield f"Header\npage {i} text\nFooter"
+
+        stream = TextCleaner(repeated_edges=True, edge_window=3).clean_pages(pages())
+        raw, cleaned = next(stream)
+        assert raw == "Header\npage 0 text\nFooter" and cleaned == "text"
+        assert len(pulled) == 4
+
+    def test_summarizer_strips_headers_when_enabled(self, monkeypatch):
+        pages = [f"Acme Corp Confidential\nSection {i} describes results." for i in range(5)]
+        assert "Acme" in " ".join(AdvSummarizer().preprocess_pages(pages).sentences)
+
+        monkeypatch.setenv("CLEAN_STRIP_HEADERS", "true")
+        doc = AdvSummarizer().preprocess_pages(pages)
+        assert "Acme" not in " ".join(doc.sentences)
+        assert "Acme" in doc.raw_text # the LLM and statistics still see the extracted text
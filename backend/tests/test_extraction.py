@@ -0,0 +1,127 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import extraction
+from benchmarks.synthetic import build_pdf
+from extraction import (
+    apply_char_budget,
+    extract_pages,
+    iter_pages,
+    join_pages,
+    page_chunks,
+    select_pages,
+)
+
+PAGES = [f"Page {i} discusses topic number {i} in some detail." for i in range(1, 13)]
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    monkeypatch.setenv("EXTRACTION_WORKERS", "2")
+    monkeypatch.setenv("EXTRACTION_MIN_PAGES_PER_WORKER", "3")
+    yield
+    extraction.shutdown_pool()
+
+
+class TestPageChunks:
+    def test_covers_every_page_in_order(self):
+        chunks = page_chunks(list(range(100)), workers=4, min_pages=16)
+        assert len(chunks) == 4
+        assert [page for chunk in chunks for page in chunk] == list(range(100))
+
+    def test_small_documents_use_fewer_chunks(self):
+        assert len(page_chunks(list(range(20)), workers=8, min_pages=10)) == 2
+        assert page_chunks(list(range(5)), workers=8, min_pages=10) == [list(range(5))]
+
+
+class TestPageBudget:
+    def test_first_pages(self):
+        assert select_pages(10, max_pages=3) == [0, 1, 2]
+
+    def test_even_sampling_spreads_pages(self):
+        assert select_pages(10, max_pages=5, sampling="even") == [0, 2, 4, 6, 8]
+
+    def test_no_budget_keeps_every_page(self):
+        assert select_pages(4) == [0, 1, 2, 3]
+        assert select_pages(4, max_pages=10, sampling="even") == [0, 1, 2, 3]
+
+    def test_char_budget_truncates_last_page(self):
+        assert list(apply_char_budget(["abcd", "efgh", "ijkl"], max_chars=6)) == ["abcd", "ef"]
+        assert list(apply_char_budget(["abcd"], max_chars=None)) == ["abcd"]
+
+
+class TestExtractPages:
+    def test_keeps_one_entry_per_page(self):
+        pages = extract_pages(build_pdf(["First page text.", "", "Third page text."]))
+        assert len(pages) == 3
+        assert pages[1].strip() == ""
+
+    def test_removes_null_bytes(self):
+        pages = extract_pages(build_pdf(["Null\0byte page."]))
+        assert "\0" not in pages[0]
+        assert "Nullbyte" in pages[0]
+
+    def test_parallel_matches_serial_page_order(self, parallel, monkeypatch):
+        pdf = build_pdf(PAGES)
+        pages = extract_pages(pdf)
+        monkeypatch.setenv("EXTRACTION_WORKERS", "1")
+        assert pages == extract_pages(pdf)
+        assert [p.strip() for p in pages] == PAGES
+
+    def test_failed_range_becomes_empty_pages(self, parallel, monkeypatch):
+        def broken(*args):
+            raise RuntimeError("boom")
+
+        class InlinePool:
+            def submit(self, fn, *args):
+                from concurrent.futures import Future
+
+                future = Future()
+                try:
+                    future.set_result(broken(*args) if args[1][0] == 0 else fn(*args))
+                except Exception as e:
+                    future.set_exception(e)
+                return future
+
+        monkeypatch.setattr(extraction, "_get_pool", InlinePool)
+        pages = extract_pages(build_pdf(PAGES))
+        assert len(pages) == len(PAGES)
+        assert pages[:6] == [""] * 6
+        assert pages[-1].strip() == PAGES[-1]
+
+    def test_iter_pages_is_lazy(self, monkeypatch):
+        calls = []
+        original = extraction._page_text
+        monkeypatch.setattr(
+            extraction, "_page_text", lambda reader, n: calls.append(n) or original(reader, n)
+        )
+        pages = iter_pages(build_pdf(PAGES))
+        assert next(pages).strip() == PAGES[0]
+        assert calls == [0]
+
+    def test_iter_pages_respects_page_budget(self):
+        pages = list(iter_pages(build_pdf(PAGES), max_pages=3, sampling="even"))
+        assert [p.strip() for p in pages] == [PAGES[0], PAGES[4], PAGES[8]]
+
+    def test_parallel_iter_pages_respects_char_budget(self, parallel):
+        pages = list(iter_pages(build_pdf(PAGES), max_chars=60))
+        assert sum(map(len, pages)) == 60
+        assert pages[0].strip() == PAGES[0]
+
+    def test_reads_files_by_path(self, parallel, tmp_path):
+        path = tmp_path / "doc.pdf"
+        path.write_bytes(build_pdf(PAGES))
+        assert extract_pages(str(path)) == extract_pages(path.read_bytes())
+        assert [p.strip() for p in iter_pages(str(path), max_pages=2)] == PAGES[:2]
+
+    def test_invalid_pdf_raises_runtime_error(self):
+        with pytest.raises(RuntimeError, match="Failed to extract"):
+            extract_pages(b"not a pdf at all" * 10)
+
+
+class TestJoinPages:
+    def test_joined_text_skips_empty_pages(self):
+        assert join_pages(["First page.", "", "Third page."]) == "First page.\nThird page."
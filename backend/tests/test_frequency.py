@@ -0,0 +1,68 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from adv_summ import AdvSummarizer
+from frequency import rank_sentences, sentence_score, term_frequencies
+from tokenization import RegexTokenizer
+
+WORDS = "solar wind grid energy storage battery panel turbine the of and is".split()
+STOP_WORDS = {"the", "of", "and", "is"}
+
+
+def random_sentences(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))).capitalize() + "."
+        for _ in range(count)
+    ]
+
+
+def legacy_top(sentences, token_lists, k):
+    """The selection frequency_summarize made before the two-pass rewrite."""
+    frequencies = term_frequencies(token_lists, STOP_WORDS)
+    scores = {}
+    for sentence, tokens in zip(sentences, token_lists):
+        scores[sentence] = sentence_score(tokens, frequencies)
+    ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    top = [sentence for sentence, _ in ranked[:k]]
+    return [sentence for sentence in sentences if sentence in top]
+
+
+def top(sentences, token_lists, k):
+    frequencies = term_frequencies(token_lists, STOP_WORDS)
+    return sorted(rank_sentences(sentences, token_lists, frequencies)[:k])
+
+
+class TestRankSentences:
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("k", [1, 3, 7])
+    def test_matches_the_previous_selection(self, seed, k):
+        sentences = list(dict.fromkeys(random_sentences(60, seed))) # no duplicates
+        token_lists = RegexTokenizer().words(sentences)
+        selected = [sentences[i] for i in top(sentences, token_lists, k)]
+        assert selected == legacy_top(sentences, token_lists, k)
+
+    def test_duplicates_are_ranked_once(self):
+        sentences = ["Solar grid.", "Solar grid.", "Wind.", "Solar grid.", "Battery storage."]
+        token_lists = RegexTokenizer().words(sentences)
+        ranking = rank_sentences(sentences, token_lists, term_frequencies(token_lists, STOP_WORDS))
+        assert sorted(ranking) == [0, 2, 4]
+        assert top(sentences, token_lists, 2) == [0, 2]
+
+    def test_ties_go_to_the_earlier_sentence(self):
+        token_lists = [["grid"], ["grid"], ["grid"]]
+        assert rank_sentences(["a", "b", "c"], token_lists, {"grid": 1}) == [0, 1, 2]
+
+
+class TestFrequencySummarizer:
+    def test_duplicate_sentences_appear_once_in_the_summary(self):
+        summarizer = AdvSummarizer()
+        text = ("Solar panels feed the grid. Wind is free. Solar panels feed the grid. "
+                "Storage helps. Solar panels feed the grid.")
+        summary = summarizer.frequency_summarize(text, num_sentences=2)
+        assert summary.count("Solar panels feed the grid.") == 1
+        assert len(summarizer.tokenizer.sentences(summary)) == 2
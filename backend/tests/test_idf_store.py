@@ -0,0 +1,122 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import idf_store
+from adv_summ import AdvSummarizer
+from idf_store import IdfStore
+from pipeline import summarize_pages
+from tfidf import tfidf_matrix
+
+DOCUMENTS = [
+    ["solar", "panel", "energy", "grid"],
+    ["wind", "turbine", "energy", "grid"],
+    ["battery", "storage", "energy"],
+    ["court", "ruling", "appeal"],
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return IdfStore(str(tmp_path / "idf.npy"), buckets=1024, min_documents=2)
+
+
+class TestIdfStore:
+    def test_counts_documents_not_occurrences(self, store):
+        store.add_document(["energy", "energy", "grid"])
+        store.add_document(["energy"])
+        assert store.documents == 2
+        idf = store.idf(["energy", "grid", "unseen"])
+        np.testing.assert_allclose(idf, np.log(3 / np.array([3, 2, 1])) + 1)
+
+    def test_no_idf_until_min_documents(self, store):
+        store.add_document(["energy"])
+        assert store.idf(["energy"]) is None
+
+    def test_updates_are_shared_without_reloading(self, store):
+        other = IdfStore(store.path)
+        assert other.buckets == 1024
+        other.idf(["energy"]) # maps the file before the update
+        for terms in DOCUMENTS:
+            store.add_document(terms)
+        assert other.documents == len(DOCUMENTS)
+
+    def test_keyed_documents_are_counted_once_by_every_process(self, store):
+        other = IdfStore(store.path)
+        store.add_document(["energy"], key="digest-1")
+        other.add_document(["energy"], key="digest-1") # e.g. another worker
+        store.add_document(["energy"], key="digest-1")
+        other.add_document(["grid"], key="digest-2")
+        assert store.documents == 2
+        store.rebuild([["court"]])
+        other.add_document(["energy"], key="digest-1") # a rebuilt corpus learns it again
+        assert store.documents == 2
+
+    def test_rebuild_replaces_the_corpus_for_open_stores(self, store):
+        other = IdfStore(store.path, min_documents=2)
+        for terms in DOCUMENTS:
+            store.add_document(terms)
+        store.rebuild([["court"], ["appeal"]])
+        assert other.documents == 2
+        assert other.stats()["buckets_used"] == 2
+
+    def test_merge_adds_document_frequencies(self, store, tmp_path):
+        source = IdfStore(str(tmp_path / "source.npy"), buckets=1024)
+        for terms in DOCUMENTS:
+            source.add_document(terms)
+        store.add_document(["energy"])
+        store.merge(source.path)
+        assert store.documents == len(DOCUMENTS) + 1
+        assert store.idf(["energy"])[0] == pytest.approx(np.log(6 / 5) + 1)
+
+    def test_merge_rejects_other_bucket_counts(self, store, tmp_path):
+        source = IdfStore(str(tmp_path / "source.npy"), buckets=2048)
+        with pytest.raises(ValueError):
+            store.merge(source.path)
+
+    def test_buckets_must_be_a_power_of_two(self, tmp_path):
+        with pytest.raises(ValueError):
+            IdfStore(str(tmp_path / "idf.npy"), buckets=1000)
+
+    def test_cli_builds_from_text_files(self, tmp_path, capsys):
+        corpus = tmp_path / "corpus"
+        corpus.mkdir()
+        for i, terms in enumerate(DOCUMENTS):
+            (corpus / f"{i}.txt").write_text(" ".join(terms) + ". Another sentence here.")
+        (corpus / "notes.md").write_text("ignored")
+        path = str(tmp_path / "built.npy")
+        assert idf_store.main(["build", str(corpus), "--path", path, "--buckets", "1024"]) == 0
+        assert IdfStore(path).documents == len(DOCUMENTS)
+
+
+class TestCorpusTfidf:
+    def test_corpus_idf_replaces_document_idf(self, store):
+        for terms in DOCUMENTS:
+            store.add_document(terms)
+        sentences = [["energy", "court"], ["energy", "grid"]]
+        local = tfidf_matrix(sentences).toarray()
+        corpus = tfidf_matrix(sentences, idf=store.idf).toarray()
+        # columns: court, energy, grid; "court" is rare in the corpus, "energy" is everywhere
+        assert corpus[0, 0] > local[0, 0]
+        np.testing.assert_allclose(tfidf_matrix(sentences, idf=lambda terms: None).toarray(), local)
+
+    def test_summarizer_learns_from_summarized_documents(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("IDF_STORE_PATH", str(tmp_path / "idf.npy"))
+        monkeypatch.setenv("IDF_BUCKETS", "1024")
+        monkeypatch.setenv("IDF_MIN_DOCUMENTS", "1")
+        summarizer = AdvSummarizer()
+        pages = ["Solar panels feed the grid. Wind turbines feed the grid. Batteries store energy."]
+
+        summarize_pages(summarizer, pages, "tfidf", 2)
+        summarize_pages(summarizer, pages, "llm", 2) # never tokenized, so not counted
+        assert summarizer.idf_store.documents == 1
+
+        result = summarize_pages(summarizer, pages, "tfidf", 2)
+        assert result["summary_result"]["summary"]
+
+    def test_disabled_without_a_path(self, monkeypatch):
+        monkeypatch.delenv("IDF_STORE_PATH", raising=False)
+        assert AdvSummarizer().idf_store is None
@@ -0,0 +1,76 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from jobs import JobManager, QueueFullError
+
+
+def wait_for(manager, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+class TestJobManager:
+    def test_runs_job_and_keeps_result(self):
+        manager = JobManager()
+        job_id = manager.submit(lambda x, progress: {"double": x * 2}, 21)
+        job = wait_for(manager, job_id)
+        assert job["status"] == "succeeded"
+        assert job["result"] == {"double": 42}
+        assert job["progress"] == {"stage": "done", "fraction": 1.0}
+
+    def test_records_failures(self):
+        def fail(progress):
+            raise RuntimeError("boom")
+
+        manager = JobManager()
+        job = wait_for(manager, manager.submit(fail))
+        assert job["status"] == "failed"
+        assert job["error"] == "boom"
+
+    def test_reports_progress(self):
+        release = threading.Event()
+
+        def work(progress):
+            progress("extracting", 0.25)
+            release.wait(5)
+            return {}
+
+        manager = JobManager()
+        job_id = manager.submit(work)
+        deadline = time.time() + 5
+        while manager.get(job_id)["progress"]["stage"] != "extracting" and time.time() < deadline:
+            time.sleep(0.01)
+        assert manager.get(job_id)["progress"] == {"stage": "extracting", "fraction": 0.25}
+        release.set()
+        wait_for(manager, job_id)
+
+    def test_rejects_submissions_beyond_queue_size(self):
+        release = threading.Event()
+        manager = JobManager(max_workers=1, max_pending=2)
+        ids = [manager.submit(lambda progress: release.wait(5)) for _ in range(2)]
+        with pytest.raises(QueueFullError):
+            manager.submit(lambda progress: None)
+        assert manager.stats()["running"] + manager.stats()["queued"] == 2
+        release.set()
+        for job_id in ids:
+            wait_for(manager, job_id)
+        assert manager.stats() == {"running": 0, "queued": 0, "max_workers": 1, "max_pending": 2}
+
+    def test_unknown_job_is_none(self):
+        assert JobManager().get("missing") is None
+
+    def test_records_are_visible_to_other_workers(self, tmp_path):
+        db_path = str(tmp_path / "jobs.db")
+        job_id = JobManager(db_path=db_path).submit(lambda progress: {"ok": True})
+        other_worker = JobManager(db_path=db_path)
+        assert wait_for(other_worker, job_id)["result"] == {"ok": True}
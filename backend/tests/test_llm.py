@@ -0,0 +1,161 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from adv_summ import LLM_FAILURE_PREFIX, AdvSummarizer
+from benchmarks.fake_llm import FakeModel
+from llm import chunk_sentences, map_reduce
+
+SENTENCES = [f"Sentence number {i} describes finding {i} of the annual report." for i in range(400)]
+
+
+@pytest.fixture
+def summarizer(monkeypatch):
+    monkeypatch.setenv("LLM_CHUNK_CHARS", "2000")
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "3")
+    summarizer = AdvSummarizer()
+    summarizer.model = FakeModel(delay=0.01)
+    return summarizer
+
+
+class TestChunkSentences:
+    def test_chunks_are_sentence_aligned_and_bounded(self):
+        chunks = chunk_sentences(SENTENCES, 1000)
+        assert all(len(chunk) <= 1000 for chunk in chunks)
+        assert " ".join(chunks) == " ".join(SENTENCES)
+
+    def test_oversized_sentence_is_split(self):
+        chunks = chunk_sentences(["x" * 2500], 1000)
+        assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+
+
+class TestMapReduce:
+    def test_reports_chunk_counts_and_stage_timings(self):
+        summary, stats = map_reduce(lambda chunk: chunk[:99], lambda text: "final", SENTENCES, 5000)
+        assert summary == "final"
+        assert stats["chunks"][0] == len(chunk_sentences(SENTENCES, 5000))
+        assert {"map_1_seconds", "reduce_seconds"} <= set(stats["timings"])
+
+    def test_reduces_again_when_summaries_do_not_fit(self):
+        _, stats = map_reduce(lambda chunk: chunk[:300], lambda text: "final", SENTENCES, 1000)
+        assert len(stats["chunks"]) > 1
+        assert stats["chunks"][1] < stats["chunks"][0]
+
+    def test_combines_summaries_that_fit_one_prompt_however_deep(self):
+        combined = []
+        _, stats = map_reduce(lambda chunk: chunk[:len(chunk) * 2 // 3], combined.append,
+                              SENTENCES, 1000)
+        assert len(stats["chunks"]) > 3
+        assert len(combined[0]) <= 1000 # summarized again rather than cut off
+
+    def test_raises_when_summaries_do_not_shorten_the_text(self):
+        with pytest.raises(RuntimeError):
+            map_reduce(lambda chunk: chunk + "!", lambda text: text, SENTENCES, 1000)
+
+    def test_failed_chunks_are_skipped(self):
+        def flaky(chunk):
+            if "finding 0 " in chunk:
+                raise RuntimeError("boom")
+            return "ok"
+
+        summary, stats = map_reduce(flaky, lambda text: text, SENTENCES, 5000)
+        assert stats["failed_chunks"] == 1
+        assert "ok" in summary
+
+    def test_raises_when_every_chunk_fails(self):
+        def broken(chunk):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            map_reduce(broken, lambda text: text, SENTENCES, 5000)
+
+
+class TestLLMSummarizer:
+    def test_long_documents_use_bounded_map_reduce(self, summarizer):
+        result = summarizer.generate_summary(" ".join(SENTENCES), method="llm", num_sentences=3)
+        assert not result["failed"]
+        assert result["llm"]["mode"] == "map_reduce"
+        chunks = result["llm"]["chunks"][0]
+        assert chunks > 3
+        assert len(summarizer.model.prompts) == sum(result["llm"]["chunks"]) + 1
+        assert summarizer.model.max_in_flight <= 3
+        assert "total_seconds" in result["llm"]["timings"]
+
+    def test_short_documents_use_one_prompt(self, summarizer):
+        result = summarizer.generate_summary(" ".join(SENTENCES[:10]), method="llm")
+        assert result["llm"]["mode"] == "single"
+        assert len(summarizer.model.prompts) == 1
+
+    def test_reduce_failure_is_reported_as_failed_summary(self, summarizer):
+        summarizer.model.fail_on = "summaries of consecutive sections"
+        result = summarizer.generate_summary(" ".join(SENTENCES), method="llm")
+        assert result["failed"]
+        assert result["summary"].startswith(LLM_FAILURE_PREFIX)
+
+
+class TestStreaming:
+    def test_streamed_text_adds_up_to_the_summary(self, summarizer):
+        pieces = []
+        result = summarizer.generate_summary(
+            " ".join(SENTENCES[:10]), method="llm", on_text=pieces.append
+        )
+        assert len(pieces) > 1
+        assert "".join(pieces) == result["summary"]
+
+    def test_map_reduce_streams_only_the_combined_summary(self, summarizer):
+        pieces = []
+        result = summarizer.generate_summary(" ".join(SENTENCES), method="llm",
+                                             on_text=pieces.append)
+        assert result["llm"]["mode"] == "map_reduce"
+        assert "".join(pieces) == result["summary"]
+
+    def test_stream_failure_is_reported_as_failed_summary(self, summarizer):
+        summarizer.model.fail_on = "comprehensive"
+        result = summarizer.generate_summary(" ".join(SENTENCES[:10]), method="llm",
+                                             on_text=lambda text: None)
+        assert result["failed"]
+        assert result["summary"].startswith(LLM_FAILURE_PREFIX)
+
+
+class TestPrefilter:
+    @pytest.mark.parametrize("ranker", ["tfidf", "textrank"])
+    def test_sends_central_sentences_within_budget_in_order(self, summarizer, ranker):
+        result = summarizer.generate_summary(
+            " ".join(SENTENCES), method="llm", llm_prefilter=ranker, llm_token_budget=500
+        )
+        stats = result["llm"]
+        assert stats["prefilter"] == ranker
+        assert stats["mode"] == "single"
+        assert 0 < stats["input_tokens"] <= 500 < stats["full_tokens"]
+
+        prompt = summarizer.model.prompts[0]
+        numbers = [i for i in range(len(SENTENCES)) if f"finding {i} " in prompt]
+        assert len(numbers) == stats["sentences_sent"]
+        positions = [prompt.index(f"finding {i} ") for i in numbers]
+        assert positions == sorted(positions)
+
+    def test_prefiltered_text_is_sent_in_one_call(self, summarizer):
+        # the budget (and the default) is capped at one prompt: LLM_CHUNK_CHARS is 2000 here
+        for budget in (None, 10**6):
+            summarizer.model.prompts.clear()
+            result = summarizer.generate_summary(
+                " ".join(SENTENCES), method="llm", llm_prefilter="tfidf", llm_token_budget=budget
+            )
+            assert result["llm"]["mode"] == "single"
+            assert len(summarizer.model.prompts) == 1
+            assert result["llm"]["input_tokens"] <= 2000 // 4
+
+    def test_prefilter_selection_follows_ranker_scores(self, summarizer):
+        doc = summarizer.preprocess(" ".join(SENTENCES[:50]))
+        scores = summarizer.tfidf_scores(doc)
+        kept = summarizer.prefilter_sentences(doc, "tfidf", token_budget=60)
+        best = doc.sentences[int(scores.argmax())]
+        assert best in kept
+        assert kept == [s for s in doc.sentences if s in kept]
+
+    def test_without_prefilter_full_text_is_sent(self, summarizer):
+        result = summarizer.generate_summary(" ".join(SENTENCES[:10]), method="llm")
+        assert result["llm"]["prefilter"] == "none"
+        assert result["llm"]["input_tokens"] == result["llm"]["full_tokens"]
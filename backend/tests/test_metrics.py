@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from metrics import Metrics, collect, stage, timed_iter
+
+
+class TestStageTimings:
+    def test_nested_stages_report_exclusive_time(self):
+        with collect() as timings:
+            with stage("outer"):
+                time.sleep(0.02)
+                with stage("inner"):
+                    time.sleep(0.05)
+        assert 0.05 <= timings.stages["inner"]
+        assert 0.02 <= timings.stages["outer"] < 0.05
+        assert timings.as_dict()["total"] >= timings.stages["inner"] + timings.stages["outer"]
+
+    def test_timed_iter_accumulates_across_items(self):
+        def slow():
+            for i in range(3):
+                time.sleep(0.01)
+                yield i
+
+        with collect() as timings:
+            assert list(timed_iter(slow(), "extraction")) == [0, 1, 2]
+        assert timings.stages["extraction"] >= 0.03
+
+    def test_stage_without_collector_is_a_no_op(self):
+        with stage("anything"):
+            pass
+
+    def test_nested_collect_reuses_the_active_collector(self):
+        with collect() as outer:
+            with collect() as inner:
+                with stage("work"):
+                    pass
+        assert inner is outer and "work" in outer.stages
+
+
+class TestMetrics:
+    def test_renders_counters_and_cumulative_histograms(self):
+        metrics = Metrics(prefix="t")
+        metrics.inc("requests_total", endpoint="summarize")
+        metrics.inc("requests_total", endpoint="summarize")
+        for seconds in (0.01, 0.3, 7.0):
+            metrics.observe("latency_seconds", seconds, buckets=(0.1, 1.0), algorithm="tfidf")
+
+        text = metrics.render()
+        assert 't_requests_total{endpoint="summarize"} 2' in text
+        assert 't_latency_seconds_bucket{algorithm="tfidf",le="0.1"} 1' in text
+        assert 't_latency_seconds_bucket{algorithm="tfidf",le="1"} 2' in text
+        assert 't_latency_seconds_bucket{algorithm="tfidf",le="+Inf"} 3' in text
+        assert 't_latency_seconds_count{algorithm="tfidf"} 3' in text
+        assert "# TYPE t_latency_seconds histogram" in text
+
+    def test_workers_sharing_a_database_are_summed(self, tmp_path):
+        db = str(tmp_path / "metrics.db")
+        first, second = Metrics(db_path=db), Metrics(db_path=db)
+        first.inc("requests_total", endpoint="summarize")
+        second.inc("requests_total", endpoint="summarize", value=2)
+        first.gauge_add("requests_in_flight", 1, endpoint="summarize")
+        first.flush()
+        second.flush()
+
+        text = second.render()
+        assert 'summarizer_requests_total{endpoint="summarize"} 3' in text
+        assert 'summarizer_requests_in_flight{endpoint="summarize"} 1' in text
+
+    def test_gauge_changes_are_published_in_batches(self, tmp_path):
+        db = str(tmp_path / "metrics.db")
+        worker, scraper = Metrics(db_path=db, flush_interval=60), Metrics(db_path=db)
+        for _ in range(3):
+            worker.gauge_add("requests_in_flight", 1)
+        assert "summarizer_requests_in_flight" not in scraper.render() # no write per change
+        worker.flush() # the flush thread's job
+        assert "summarizer_requests_in_flight 3" in scraper.render()
+        assert "summarizer_requests_in_flight 3" in worker.render()
+
+    def test_gauges_of_silent_workers_are_ignored(self, tmp_path):
+        db = str(tmp_path / "metrics.db")
+        gone, live = Metrics(db_path=db), Metrics(db_path=db, stale_after=0.05)
+        gone.gauge_add("requests_in_flight", 1)
+        gone.inc("requests_total")
+        gone.flush()
+        time.sleep(0.1)
+        text = live.render()
+        assert "summarizer_requests_in_flight" not in text
+        assert "summarizer_requests_total 1" in text
+
+    def test_derived_gauges_use_merged_counters(self):
+        metrics = Metrics()
+        metrics.inc("cache_requests_total", cache="summaries", result="hit")
+        metrics.inc("cache_requests_total", cache="summaries", result="miss", value=3)
+
+        def ratio(total):
+            hits = total("cache_requests_total", cache="summaries", result="hit")
+            return {("cache_hit_ratio", (("cache", "summaries"),)): hits / total(
+                "cache_requests_total", cache="summaries")}
+
+        assert 'summarizer_cache_hit_ratio{cache="summaries"} 0.25' in metrics.render(ratio)
@@ -0,0 +1,24 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pools import SpawnPool
+
+
+class TestSpawnPool:
+    def test_created_once_and_rebuilt_after_shutdown(self):
+        sizes = iter([1, 2])
+        pool = SpawnPool(lambda: next(sizes), max_tasks_per_child=lambda: 5)
+        try:
+            first = pool.get()
+            assert pool.get() is first
+            assert first._max_workers == 1
+            assert first._mp_context.get_start_method() == 'spawn'
+            pool.shutdown()
+            second = pool.get()
+            assert second is not first
+            assert second._max_workers == 2 # settings are read per pool
+            assert second.submit(abs, -3).result(timeout=60) == 3
+        finally:
+            pool.shutdown()
+        pool.shutdown() # no pool: nothing to do
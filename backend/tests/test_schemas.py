@@ -3,7 +3,7 @@ import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from schemas import SummarizeRequest, FileValidation
+from schemas import CompareRequest, SummarizeRequest, FileValidation
 
 
 class TestSummarizeRequest:
@@ -23,11 +23,46 @@ class TestSummarizeRequest:
         req2 = SummarizeRequest(num_sentences=-5)
         assert req2.num_sentences == 2
 
+    def test_page_budget_defaults_to_unlimited(self):
+        req = SummarizeRequest()
+        assert req.max_pages is None
+        assert req.max_chars is None
+        assert req.page_sampling == "first"
+
+    def test_rejects_invalid_page_budget(self):
+        with pytest.raises(Exception):
+            SummarizeRequest(max_pages=0)
+        with pytest.raises(Exception):
+            SummarizeRequest(page_sampling="random")
+
+    def test_rejects_invalid_llm_prefilter(self):
+        assert SummarizeRequest().llm_prefilter == "none"
+        with pytest.raises(Exception):
+            SummarizeRequest(llm_prefilter="lsa")
+        with pytest.raises(Exception):
+            SummarizeRequest(llm_token_budget=10)
+
     def test_rejects_invalid_algorithm(self):
         with pytest.raises(Exception):
             SummarizeRequest(algorithm="invalid")
 
 
+class TestCompareRequest:
+    def test_compares_every_algorithm_by_default(self):
+        assert CompareRequest().algorithms == ["frequency", "tfidf", "textrank", "llm"]
+
+    def test_drops_repeated_algorithms(self):
+        req = CompareRequest(algorithms=["tfidf", "llm", "tfidf"], num_sentences=50)
+        assert req.algorithms == ["tfidf", "llm"]
+        assert req.num_sentences == 10
+
+    def test_rejects_unknown_or_no_algorithms(self):
+        with pytest.raises(Exception):
+            CompareRequest(algorithms=["lsa"])
+        with pytest.raises(Exception):
+            CompareRequest(algorithms=[])
+
+
 class TestFileValidation:
     def test_accepts_valid_pdf_file(self):
         FileValidation.validate_file("doc.pdf", 1024 * 1024, "application/pdf")
@@ -42,6 +77,12 @@ class TestFileValidation:
                 "large.pdf", 11 * 1024 * 1024, "application/pdf"
             )
 
+    def test_size_limit_is_configurable(self, monkeypatch):
+        monkeypatch.setenv("MAX_UPLOAD_SIZE_MB", "100")
+        FileValidation.validate_file("large.pdf", 60 * 1024 * 1024, "application/pdf")
+        with pytest.raises(ValueError, match="Maximum size is 100MB"):
+            FileValidation.validate_file("huge.pdf", 101 * 1024 * 1024, "application/pdf")
+
     def test_rejects_empty_files(self):
         with pytest.raises(ValueError, match="empty or unreadable"):
             FileValidation.validate_file("empty.pdf", 50, "application/pdf")
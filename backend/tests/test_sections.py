@@ -0,0 +1,101 @@
+import io
+import os
+import sys
+
+import pypdf
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from adv_summ import AdvSummarizer
+from benchmarks.synthetic import build_pdf
+from extraction import extract_pages
+from pipeline import InsufficientTextError, summarize_sections
+from sections import allocate_sentences, assign_pages, document_sections
+
+SOLAR = "Solar panels convert sunlight into electricity. Panels last for decades on roofs."
+WIND = "Wind turbines turn moving air into power. Turbines work best on open plains."
+STORAGE = "Batteries store renewable energy for the evening. Storage smooths the daily supply."
+
+
+def outlined_pdf(pages, bookmarks):
+    writer = pypdf.PdfWriter(clone_from=io.BytesIO(build_pdf(pages)))
+    for title, page in bookmarks:
+        writer.add_outline_item(title, page)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class TestDocumentSections:
+    def test_top_level_outline_entries_start_sections(self):
+        pdf = outlined_pdf([SOLAR] * 6, [("Solar", 1), ("Wind", 3), ("Also wind", 3)])
+        assert document_sections(pdf, 6) == [
+            {"title": "Front matter", "start_page": 1, "end_page": 1},
+            {"title": "Solar", "start_page": 2, "end_page": 3},
+            {"title": "Wind", "start_page": 4, "end_page": 6},
+        ]
+
+    def test_falls_back_to_page_groups(self):
+        pdf = outlined_pdf([SOLAR] * 5, [("Only one", 0)])
+        assert document_sections(pdf, 5, pages_per_section=2) == [
+            {"title": "Pages 1-2", "start_page": 1, "end_page": 2},
+            {"title": "Pages 3-4", "start_page": 3, "end_page": 4},
+            {"title": "Pages 5-5", "start_page": 5, "end_page": 5},
+        ]
+
+    def test_outline_entries_past_the_extracted_pages_are_ignored(self):
+        pdf = outlined_pdf([SOLAR] * 6, [("Solar", 0), ("Wind", 2), ("Storage", 5)])
+        assert [s["end_page"] for s in document_sections(pdf, 4)] == [2, 4]
+
+    def test_pages_are_assigned_by_page_number(self):
+        sections = [{"start_page": 1}, {"start_page": 3}, {"start_page": 9}]
+        assert assign_pages(sections, [0, 2, 4], ["a", "b", "c"]) == [["a"], ["b", "c"], []]
+
+
+class TestAllocateSentences:
+    def test_every_section_gets_its_share_within_the_budget(self):
+        assert allocate_sentences([10, 1, 0], 3, 50) == [3, 1, 0]
+
+    def test_budget_goes_to_larger_sections(self):
+        allocated = allocate_sentences([100, 10, 50, 40], 5, 10)
+        assert sum(allocated) == 10
+        assert allocated == [4, 2, 2, 2]
+
+    def test_sections_beyond_the_budget_get_nothing(self):
+        assert allocate_sentences([5, 30, 20, 10], 3, 5) == [0, 3, 2, 0]
+
+
+class TestSummarizeSections:
+    @pytest.fixture
+    def summarizer(self, monkeypatch):
+        monkeypatch.delenv("IDF_STORE_PATH", raising=False)
+        return AdvSummarizer()
+
+    def test_summarizes_each_outline_section(self, summarizer):
+        texts = [SOLAR, SOLAR, WIND, WIND, STORAGE]
+        pdf = outlined_pdf(texts, [("Solar", 0), ("Wind", 2), ("Storage", 4)])
+        result = summarize_sections(
+            summarizer, pdf, extract_pages(pdf), list(range(5)), "textrank", 2, 50,
+        )
+        sections = result["sections"]
+        assert [(s["title"], s["start_page"], s["end_page"]) for s in sections] == [
+            ("Solar", 1, 2), ("Wind", 3, 4), ("Storage", 5, 5),
+        ]
+        assert "urbines" in sections[1]["summary"]
+        assert "olar" not in sections[1]["summary"]
+        assert all(s["sentences"] == 2 and not s["failed"] for s in sections)
+        assert result["summary_result"]["summary"].split("\n\n") == [s["summary"] for s in sections]
+        assert result["summary_result"]["sentences_requested"] == 6
+
+    def test_only_extracted_pages_form_sections(self, summarizer):
+        pdf = outlined_pdf([SOLAR, WIND, STORAGE], [("Solar", 0), ("Wind", 1), ("Storage", 2)])
+        pages = extract_pages(pdf)
+        result = summarize_sections(summarizer, pdf, pages[:2], [0, 1], "frequency", 2, 2)
+        assert [s["title"] for s in result["sections"]] == ["Solar", "Wind"]
+        assert [s["sentences"] for s in result["sections"]] == [2, 0]
+        assert result["sections"][1]["summary"] == ""
+
+    def test_rejects_documents_without_text(self, summarizer):
+        pdf = build_pdf(["", ""])
+        with pytest.raises(InsufficientTextError):
+            summarize_sections(summarizer, pdf, ["", ""], [0, 1], "frequency", 2, 10)
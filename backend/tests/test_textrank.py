@@ -0,0 +1,144 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from textrank import TextRank
+
+
+def legacy_textrank(similarity_matrix):
+    n = len(similarity_matrix)
+    scores = np.ones(n)
+    for _ in range(50):
+        new_scores = np.ones(n)
+        for i in range(n):
+            for j in range(n):
+                if i != j:
+                    new_scores[i] += similarity_matrix[i][j] * scores[j]
+        new_scores = new_scores / np.sum(new_scores)
+        if np.allclose(scores, new_scores, atol=1e-4):
+            break
+        scores = new_scores
+    return scores
+
+
+def random_vectors(n, dim=40, density=0.15, seed=0):
+    vectors = sparse.random(n, dim, density=density, format="csr", random_state=seed)
+    norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1))).ravel()
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ vectors)
+
+
+def zipf_vectors(n, vocab_size=5000, tokens_per_sentence=12, seed=0):
+    """TF-IDF rows for synthetic sentences with Zipf-distributed terms, like real text."""
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, vocab_size + 1)
+    terms = rng.choice(vocab_size, size=(n, tokens_per_sentence), p=weights / weights.sum())
+    counts = sparse.csr_matrix(
+        (np.ones(terms.size), (np.repeat(np.arange(n), tokens_per_sentence), terms.ravel())),
+        shape=(n, vocab_size),
+    )
+    df = np.bincount(counts.indices, minlength=vocab_size)
+    idf = np.log((1 + n) / (1 + df)) + 1
+    tfidf = sparse.csr_matrix(counts @ sparse.diags(idf))
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1))).ravel()
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ tfidf)
+
+
+class TestTextRank:
+    def test_matches_legacy_loop(self):
+        vectors = random_vectors(30)
+        expected = legacy_textrank((vectors @ vectors.T).toarray())
+        scores = TextRank().scores(vectors)
+        np.testing.assert_allclose(scores, expected)
+        assert list(scores.argsort()) == list(expected.argsort())
+
+    def test_graph_has_no_self_loops(self):
+        graph = TextRank().similarity_graph(random_vectors(10))
+        assert graph.diagonal().sum() == 0
+
+    def test_threshold_drops_weak_edges(self):
+        vectors = random_vectors(50)
+        dense_graph = TextRank().similarity_graph(vectors)
+        pruned = TextRank(threshold=0.3).similarity_graph(vectors)
+        assert pruned.nnz < dense_graph.nnz
+        assert pruned.data.min() > 0.3
+
+    def test_rejects_invalid_damping(self):
+        with pytest.raises(ValueError):
+            TextRank(damping=1.5)
+
+    def test_blockwise_graph_matches_full_product(self):
+        vectors = random_vectors(40)
+        expected = (vectors @ vectors.T).toarray()
+        np.fill_diagonal(expected, 0)
+        graph = TextRank(block_elements=100).similarity_graph(vectors)
+        np.testing.assert_allclose(graph.toarray(), expected)
+
+    def test_max_neighbors_caps_edges_per_sentence(self):
+        graph = TextRank(max_neighbors=3).similarity_graph(random_vectors(30))
+        assert np.diff(graph.indptr).max() <= 3
+
+    def test_large_documents_get_a_bounded_graph(self):
+        n = 5000
+        textrank = TextRank(large_size=2000, large_threshold=0.1, large_max_neighbors=50)
+        graph = textrank.similarity_graph(zipf_vectors(n))
+        assert graph.nnz <= n * 50
+        assert graph.data.min() > 0.1
+        assert len(textrank.rank(graph)) == n
+
+    def test_small_documents_keep_every_edge(self):
+        vectors = zipf_vectors(300)
+        graph = TextRank().similarity_graph(vectors)
+        expected = (vectors @ vectors.T).toarray()
+        np.fill_diagonal(expected, 0)
+        assert graph.nnz == np.count_nonzero(expected)
+
+
+class TestApproximateGraph:
+    def test_graph_is_pruned_like_the_exact_one(self):
+        textrank = TextRank(large_size=100, large_max_neighbors=5, approximate_size=100,
+                            lsh_block=64)
+        graph = textrank.similarity_graph(zipf_vectors(1000))
+        assert graph.diagonal().sum() == 0
+        assert np.diff(graph.indptr).max() <= 5
+        assert graph.data.min() > 0.1
+
+    def test_edges_are_exact_similarities(self):
+        vectors = zipf_vectors(500)
+        graph = TextRank(approximate_size=0, lsh_block=32).similarity_graph(vectors)
+        rows, cols = graph.nonzero()
+        expected = np.asarray(vectors[rows].multiply(vectors[cols]).sum(axis=1)).ravel()
+        np.testing.assert_allclose(graph[rows, cols].A1, expected, rtol=1e-5)
+
+    def test_ranking_agrees_with_the_exact_graph(self):
+        vectors = zipf_vectors(5000)
+        exact = TextRank(large_size=2000)
+        approximate = TextRank(large_size=2000, approximate_size=2000, lsh_block=256)
+        exact_scores = exact.rank(exact.similarity_graph(vectors))
+        approximate_scores = approximate.rank(approximate.similarity_graph(vectors))
+        top = set(np.argsort(-exact_scores)[:50])
+        assert len(top & set(np.argsort(-approximate_scores)[:50])) >= 35
+        ranks = [np.argsort(np.argsort(s)) for s in (exact_scores, approximate_scores)]
+        assert np.corrcoef(*ranks)[0, 1] > 0.8
+
+    def test_block_covering_the_document_is_exact(self):
+        vectors = zipf_vectors(300)
+        exact = TextRank().similarity_graph(vectors)
+        approximate = TextRank(approximate_size=0, lsh_block=300).similarity_graph(vectors)
+        np.testing.assert_allclose(approximate.toarray(), exact.toarray(), rtol=1e-5)
+
+    def test_small_documents_are_not_approximated(self):
+        textrank = TextRank(approximate_size=20000)
+        assert not textrank.approximate(19999)
+        assert textrank.approximate(20000)
+        assert not TextRank().approximate(10**6)
+
+    def test_rejects_invalid_lsh_settings(self):
+        with pytest.raises(ValueError):
+            TextRank(lsh_permutations=0)
+        with pytest.raises(ValueError):
+            TextRank(lsh_block=1)
@@ -0,0 +1,77 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tfidf import cosine_neighbors, strongest_per_row, tfidf_matrix
+
+WORDS = "alpha beta gamma delta epsilon zeta theta kappa lambda sigma omega rho x y".split()
+
+
+def random_terms(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # Zipf-like weights give repeated terms and frequency ties, as in real text
+    weights = 1 / np.arange(1, len(WORDS) + 1)
+    return [
+        list(rng.choice(WORDS, size=rng.integers(0, 12), p=weights / weights.sum()))
+        for _ in range(n)
+    ]
+
+
+def sklearn_tfidf(term_lists, **kwargs):
+    return TfidfVectorizer(**kwargs).fit_transform([" ".join(terms) for terms in term_lists])
+
+
+class TestTfidfMatrix:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_sklearn_defaults(self, seed):
+        terms = random_terms(60, seed)
+        ours, expected = tfidf_matrix(terms), sklearn_tfidf(terms)
+        assert ours.shape == expected.shape
+        np.testing.assert_allclose(ours.toarray(), expected.toarray(), rtol=1e-12, atol=1e-15)
+
+    @pytest.mark.parametrize("max_features", [1, 3, 8])
+    def test_max_features_keeps_the_same_terms_as_sklearn(self, max_features):
+        terms = random_terms(80, seed=7)
+        ours = tfidf_matrix(terms, max_features=max_features)
+        expected = sklearn_tfidf(terms, max_features=max_features)
+        np.testing.assert_allclose(ours.toarray(), expected.toarray(), rtol=1e-12, atol=1e-15)
+
+    def test_rows_are_unit_length_or_empty(self):
+        terms = [["alpha", "beta"], [], ["x"], ["gamma", "gamma", "delta"]]
+        norms = np.sqrt(tfidf_matrix(terms).multiply(tfidf_matrix(terms)).sum(axis=1)).A1
+        np.testing.assert_allclose(norms, [1, 0, 0, 1])
+
+    def test_raises_without_terms(self):
+        with pytest.raises(ValueError):
+            tfidf_matrix([[], ["x"]])
+
+
+class TestCosineNeighbors:
+    def test_matches_dense_cosine_similarity(self):
+        vectors = tfidf_matrix(random_terms(50))
+        expected = cosine_similarity(vectors)
+        np.fill_diagonal(expected, 0)
+        graph = cosine_neighbors(vectors, block_elements=200) # several blocks
+        np.testing.assert_allclose(graph.toarray(), expected, atol=1e-12)
+
+    def test_keeps_strongest_neighbors_above_threshold(self):
+        vectors = tfidf_matrix(random_terms(50))
+        dense = cosine_similarity(vectors)
+        np.fill_diagonal(dense, 0)
+        graph = cosine_neighbors(vectors, threshold=0.2, max_neighbors=3).toarray()
+        for row, full in zip(graph, dense):
+            kept = row[row > 0]
+            assert len(kept) == min(3, np.count_nonzero(full > 0.2))
+            if len(kept):
+                assert kept.min() >= np.sort(full)[-len(kept)] - 1e-12
+
+    def test_strongest_per_row_trims_unordered_edges(self):
+        rows, cols = np.array([1, 0, 1, 0, 1]), np.array([0, 2, 2, 1, 3])
+        vals = np.array([0.2, 0.5, 0.9, 0.7, 0.4])
+        kept = strongest_per_row(rows, cols, vals, 4, 2)
+        assert [list(part) for part in kept] == [[0, 0, 1, 1], [1, 2, 2, 3], [0.7, 0.5, 0.9, 0.4]]
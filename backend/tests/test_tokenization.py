@@ -0,0 +1,89 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from adv_summ import AdvSummarizer
+from benchmarks.tokenization import agreement, prose_documents
+from document import PreprocessedDocument
+from tokenization import NltkTokenizer, RegexTokenizer, get_tokenizer
+
+
+@pytest.fixture
+def regex():
+    return RegexTokenizer()
+
+
+class TestRegexSentences:
+    def test_splits_on_terminal_punctuation(self, regex):
+        text = 'Solar panels work. Do they pay off? Yes! "Quite," she said. The end.'
+        assert regex.sentences(text) == [
+            "Solar panels work.", "Do they pay off?", "Yes!", '"Quite," she said.', "The end.",
+        ]
+
+    def test_keeps_abbreviations_initials_and_ellipses(self, regex):
+        text = "Dr. Smith met J. R. Jones at 5 p.m. in the U.S. office, e.g. on Monday... or so."
+        assert regex.sentences(text) == [text]
+
+    def test_number_before_lowercase_word_is_not_a_boundary(self, regex):
+        assert regex.sentences("See section 3. it explains more. In 2020. Prices rose.") == [
+            "See section 3. it explains more.", "In 2020.", "Prices rose.",
+        ]
+
+    def test_closing_quotes_stay_with_the_sentence(self, regex):
+        assert regex.sentences('He said "stop." Then he left (quietly.) Done') == [
+            'He said "stop."', "Then he left (quietly.)", "Done",
+        ]
+
+    def test_empty_and_unterminated_text(self, regex):
+        assert regex.sentences("") == []
+        assert regex.sentences("  no punctuation here ") == ["no punctuation here"]
+
+
+class TestRegexWords:
+    def test_matches_treebank_on_prose(self, regex):
+        sentences = [
+            "We don't know; they're gonna find out who can't.",
+            "The state-of-the-art model, John's design, cost $3.50 in 2020.",
+        ]
+        assert regex.words(sentences) == NltkTokenizer().words(sentences)
+
+    def test_sentences_with_newlines_are_tokenized_separately(self, regex):
+        assert regex.words(["one\ntwo.", "three"]) == [["one", "two", "."], ["three"]]
+
+    def test_terms_glue_clitics_like_the_nltk_backend(self, regex):
+        sentences = ["The panel's output isn't stable.", "Grid operators won't wait."]
+        terms = [
+            PreprocessedDocument("", "", sentences, {"the"}, tokenizer).sentence_terms
+            for tokenizer in (NltkTokenizer(), regex)
+        ]
+        assert terms[0] == terms[1] == [["panels", "output", "isnt", "stable"],
+                                        ["grid", "operators", "wont", "wait"]]
+
+
+class TestSelection:
+    def test_get_tokenizer_reads_the_setting(self, monkeypatch):
+        monkeypatch.setenv("TOKENIZER", "Regex")
+        assert isinstance(get_tokenizer(), RegexTokenizer)
+        assert isinstance(get_tokenizer("nltk"), NltkTokenizer)
+        monkeypatch.setenv("TOKENIZER", "spacy")
+        assert isinstance(get_tokenizer(), NltkTokenizer)
+
+    def test_summarizer_uses_the_configured_backend(self, monkeypatch):
+        monkeypatch.setenv("TOKENIZER", "regex")
+        summarizer = AdvSummarizer()
+        doc = summarizer.preprocess_pages(["Solar panels work. Wind turbines", "spin fast. Done."])
+        assert doc.tokenizer is summarizer.tokenizer
+        assert doc.sentences == ["Solar panels work.", "Wind turbines spin fast.", "Done."]
+        result = summarizer.generate_summary(doc, method="textrank", num_sentences=2)
+        assert result["summary"]
+
+
+class TestAgreement:
+    def test_agrees_with_punkt_on_the_benchmark_corpus(self):
+        # against whichever Punkt model is installed
+        report = agreement(prose_documents(synthetic=5)[:30], NltkTokenizer(), RegexTokenizer())
+        assert report["sentence_precision"] > 0.95
+        assert report["sentence_recall"] > 0.9
+        assert report["identical_terms"] > 0.9
@@ -0,0 +1,90 @@
+"""
+Vectorized TextRank engine
+Builds a sparse sentence-similarity graph and ranks it with a NumPy power iteration
+"""
+import numpy as np
+
+from lsh import approximate_neighbors
+from tfidf import cosine_neighbors
+
+
+class TextRank:
+    """
+    PageRank-style power iteration over a sparse similarity graph.
+
+    Each step computes ``(1 - damping) + damping * W @ scores`` and normalizes it to sum to 1.
+    With ``damping=0.5`` this is exactly the original ``1 + W @ scores`` update.
+
+    Small documents use the full graph (``threshold`` and ``max_neighbors`` as given, which by
+    default keeps every edge). Once a document has ``large_size`` sentences or more, at least
+    ``large_threshold`` and ``large_max_neighbors`` apply, so the graph stays O(n) in size.
+    From ``approximate_size`` sentences (``None`` never) the graph is built with locality-sensitive
+    hashing instead of comparing every pair, so it also takes O(n) time (see ``lsh``).
+    """
+
+    def __init__(self, damping=0.5, tolerance=1e-4, max_iter=50, threshold=0.0,
+                 max_neighbors=None, large_size=2000, large_threshold=0.1,
+                 large_max_neighbors=50, block_elements=4_000_000, approximate_size=None,
+                 lsh_permutations=4, lsh_block=512):
+        if not 0.0 < damping < 1.0:
+            raise ValueError("damping must be between 0 and 1")
+        if tolerance <= 0 or max_iter < 1:
+            raise ValueError("tolerance must be positive and max_iter at least 1")
+        if max_neighbors is not None and max_neighbors < 1:
+            raise ValueError("max_neighbors must be at least 1")
+        if lsh_permutations < 1 or lsh_block < 2:
+            raise ValueError("lsh_permutations must be at least 1 and lsh_block at least 2")
+        self.damping = damping
+        self.tolerance = tolerance
+        self.max_iter = max_iter
+        self.threshold = threshold
+        self.max_neighbors = max_neighbors
+        self.large_size = large_size
+        self.large_threshold = large_threshold
+        self.large_max_neighbors = large_max_neighbors
+        self.block_elements = block_elements
+        self.approximate_size = approximate_size
+        self.lsh_permutations = lsh_permutations
+        self.lsh_block = lsh_block
+
+    def _pruning(self, n):
+        threshold, max_neighbors = self.threshold, self.max_neighbors
+        if n >= self.large_size:
+            threshold = max(threshold, self.large_threshold)
+            if max_neighbors is None or max_neighbors > self.large_max_neighbors:
+                max_neighbors = self.large_max_neighbors
+        return threshold, max_neighbors
+
+    def approximate(self, n):
+        return self.approximate_size is not None and n >= self.approximate_size
+
+    def similarity_graph(self, vectors):
+        """
+        Cosine-similarity graph of L2-normalized row vectors, without self-loops, pruned to the
+        edges this document's size allows (see ``tfidf.cosine_neighbors``), or its LSH
+        approximation for the largest documents.
+        """
+        n = vectors.shape[0]
+        threshold, max_neighbors = self._pruning(n)
+        if n >= self.large_size:
+            vectors = vectors.astype(np.float32) # halves the bandwidth of every block product
+        if self.approximate(n):
+            return approximate_neighbors(vectors, threshold, max_neighbors,
+                                         self.lsh_permutations, self.lsh_block)
+        return cosine_neighbors(vectors, threshold, max_neighbors, self.block_elements)
+
+    def rank(self, graph):
+        """Score every node of the graph; higher is more central."""
+        n = graph.shape[0]
+        scores = np.ones(n)
+        for _ in range(self.max_iter):
+            new_scores = (1.0 - self.damping) + self.damping * (graph @ scores)
+            new_scores /= new_scores.sum()
+
+            if np.allclose(scores, new_scores, atol=self.tolerance):
+                break
+            scores = new_scores
+        return scores
+
+    def scores(self, vectors):
+        return self.rank(self.similarity_graph(vectors))
@@ -0,0 +1,115 @@
+"""
+Sparse TF-IDF vectors and cosine neighbours built straight from tokenized sentences
+Reproduces scikit-learn's TfidfVectorizer defaults (raw counts, smoothed idf, L2-normalized rows)
+without re-joining and re-tokenizing the sentences or holding an n x n similarity matrix
+"""
+import numpy as np
+
+MIN_TERM_LENGTH = 2 # TfidfVectorizer's default token pattern skips one-character words
+
+
+def tfidf_matrix(term_lists, max_features=None, idf=None):
+    """
+    L2-normalized TF-IDF rows (CSR, float64) for each sentence's list of terms.
+
+    Columns are the vocabulary in alphabetical order. With ``max_features`` only the terms most
+    frequent across all sentences are kept, chosen exactly as TfidfVectorizer does. ``idf``, a
+    function from the column terms to their weights (e.g. ``IdfStore.idf``), replaces the IDF
+    computed over these sentences unless it returns None. Raises ValueError when no term is
+    left, e.g. when the sentences only contained stop words.
+    """
+    from scipy import sparse  # imported on first use; see adv_summ
+    n = len(term_lists)
+    index, ids = {}, [] # term -> id in order of appearance; the id of every kept token
+    lengths = np.zeros(n, dtype=np.int64)
+    for i, terms in enumerate(term_lists):
+        before = len(ids)
+        ids.extend(
+            index.setdefault(term, len(index)) for term in terms if len(term) >= MIN_TERM_LENGTH
+        )
+        lengths[i] = len(ids) - before
+    if not index:
+        raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+
+    # renumber the columns in alphabetical order, like sklearn's vocabulary
+    width = len(index)
+    vocabulary = sorted(index)
+    alphabetical = np.empty(width, dtype=np.int64)
+    alphabetical[[index[term] for term in vocabulary]] = np.arange(width)
+    cols = alphabetical[np.array(ids, dtype=np.int64)]
+    rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+    if max_features is not None and width > max_features:
+        totals = np.bincount(cols, minlength=width) # int64, as sklearn's column sums
+        kept = np.zeros(width, dtype=bool)
+        kept[(-totals).argsort()[:max_features]] = True
+        present = kept[cols]
+        rows, cols = rows[present], (np.cumsum(kept) - 1)[cols[present]]
+        vocabulary = [term for term, keep in zip(vocabulary, kept) if keep]
+        width = max_features
+
+    # one entry per (sentence, term) with its count, ordered by row and then column
+    keys, counts = np.unique(rows * width + cols, return_counts=True)
+    rows, cols = np.divmod(keys, width)
+    weights = idf(vocabulary) if idf is not None else None
+    if weights is None:
+        document_frequency = np.bincount(cols, minlength=width)
+        weights = np.log((n + 1) / (document_frequency + 1)) + 1
+
+    data = counts * weights[cols]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    # bincount adds in order, like sklearn's row normalizer
+    norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=n))
+    norms[norms == 0] = 1.0 # rows without terms stay zero
+    data /= norms[rows]
+    return sparse.csr_matrix((data, cols, indptr), shape=(n, width))
+
+
+def strongest_per_row(rows, cols, vals, n, max_neighbors):
+    """
+    The edges ``(rows, cols, vals)`` of an ``n``-row graph trimmed to the ``max_neighbors``
+    strongest of each row, ordered by row; ``vals`` are cosine similarities (at most 1)
+    """
+    # order by row, strongest edge first, then keep each row's first max_neighbors
+    order = np.argsort(rows * 4.0 - vals, kind='stable')
+    rows, cols, vals = rows[order], cols[order], vals[order]
+    row_starts = np.searchsorted(rows, np.arange(n))
+    keep = np.arange(len(rows)) - row_starts[rows] < max_neighbors
+    return rows[keep], cols[keep], vals[keep]
+
+
+def cosine_neighbors(vectors, threshold=0.0, max_neighbors=None, block_elements=4_000_000):
+    """
+    Sparse cosine-similarity graph of L2-normalized rows, without self-loops.
+
+    Only edges above ``threshold`` are kept, and at most the ``max_neighbors`` strongest per
+    row. Similarities are computed in row blocks of about ``block_elements`` values, each pruned
+    before the next is computed, so the full n x n product is never held in memory.
+    """
+    from scipy import sparse
+    vectors = sparse.csr_matrix(vectors)
+    n = vectors.shape[0]
+    rows_per_block = max(1, block_elements // max(n, 1))
+
+    all_rows, all_cols, all_vals = [], [], []
+    for start in range(0, n, rows_per_block):
+        end = min(start + rows_per_block, n)
+        # sparse @ dense keeps the work proportional to nnz; block is n x (end - start)
+        block = np.asarray(vectors @ vectors[start:end].toarray().T)
+        block[np.arange(start, end), np.arange(end - start)] = 0
+        cols, rows = np.nonzero(block > threshold)
+        vals = block[cols, rows]
+
+        if max_neighbors is not None and len(rows) > 0:
+            rows, cols, vals = strongest_per_row(rows, cols, vals, end - start, max_neighbors)
+
+        all_rows.append(rows + start)
+        all_cols.append(cols)
+        all_vals.append(vals)
+
+    if not all_rows:
+        return sparse.csr_matrix((n, n))
+    return sparse.csr_matrix(
+        (np.concatenate(all_vals), (np.concatenate(all_rows), np.concatenate(all_cols))),
+        shape=(n, n),
+    )
@@ -0,0 +1,113 @@
+"""
+Sentence and word tokenizer backends, chosen with the TOKENIZER setting
+'nltk' (default) uses Punkt and the Treebank word tokenizer; 'regex' is a compiled approximation
+of both that splits a whole document in one scan and is several times faster
+"""
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+
+class NltkTokenizer:
+    """Punkt sentence splitting and Treebank word tokens, imported on first use."""
+
+    name = 'nltk'
+
+    def sentences(self, text):
+        from nltk.tokenize import sent_tokenize
+        return sent_tokenize(text)
+
+    def words(self, sentences: list[str]) -> list[list[str]]:
+        """Lower-cased word tokens of each sentence."""
+        from nltk.tokenize import word_tokenize
+        return [word_tokenize(sentence.lower()) for sentence in sentences]
+
+
+# Words Punkt's English model treats as abbreviations: a period after them ends no sentence
+ABBREVIATIONS = frozenset("""
+    mr mrs ms dr prof sr jr st mt rev hon gov sen rep gen col lt sgt capt cmdr
+    inc ltd co corp llc plc dept univ assn bros
+    e.g i.e cf al viz vs approx est fig figs eq eqs no nos vol vols pp ch sec
+    jan feb mar apr jun jul aug sep sept oct nov dec
+    u.s u.k u.n a.m p.m ph.d
+""".split())
+
+# a run of sentence-ending punctuation, closing quotes/brackets, then whitespace; group 1 is
+# the word before it, only tried at word starts so the scan stays linear
+_SENTENCE_END = re.compile(r'(?<!\S)(\S*?)([.!?]+)["\'”’)\]]*(?=\s|$)')
+_OPENING = '"\'“‘([{'
+
+# where the Treebank tokenizer splits a word: clitics ("do|n't", "john|'s") and the
+# contractions it undoes ("can|not", "gon|na", ...)
+_SPLIT_POINTS = re.compile(
+    r"(?=[n'tm])(?:"
+    r"(?<=\w)(?=n't\b)|(?<=\w)(?='(?:s|re|ve|ll|d|m)\b)"
+    r"|(?<=\bcan)(?=not\b)|(?<=\bgon)(?=na\b)|(?<=\bgot)(?=ta\b)|(?<=\bwan)(?=na\s)"
+    r"|(?<=\blem)(?=me\b)|(?<=\bgim)(?=me\b))"
+)
+# clitics, words (with inner hyphens, periods, slashes, apostrophes; a period stays attached
+# unless it ends the sentence, as in "dr. smith"), runs of other punctuation
+_WORD = re.compile(r"n't|'(?:s|re|ve|ll|d|m)\b|\w+(?:[-'./]\w+)*(?:\.(?![.]|\W*$))?|[^\w\s]+")
+
+
+class RegexTokenizer:
+    """
+    Compiled approximation of Punkt and Treebank for English.
+
+    A period ends a sentence unless it follows a known abbreviation, an initial ("J. Smith") or
+    a number followed by a lower-case word, or belongs to an ellipsis, as Punkt decides when it
+    has no evidence either way. Word tokens split clitics like Treebank does, so the terms
+    derived from them agree with the NLTK backend's on ordinary prose.
+    """
+
+    name = 'regex'
+
+    def sentences(self, text):
+        sentences, start = [], 0
+        for match in _SENTENCE_END.finditer(text):
+            if not self._ends_sentence(text, match):
+                continue
+            sentence = text[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        rest = text[start:].strip()
+        if rest:
+            sentences.append(rest)
+        return sentences
+
+    @staticmethod
+    def _ends_sentence(text, match):
+        punctuation = match.group(2)
+        if punctuation != '.':
+            return not punctuation.startswith('..') # "?", "!?" end sentences; ellipses don't
+        word = match.group(1).lstrip(_OPENING).lower()
+        if word in ABBREVIATIONS:
+            return False
+        following = text[match.end():match.end() + 2].strip()[:1]
+        if len(word) == 1 and word.isalpha(): # initial
+            return False
+        if word.isdigit() and (following.islower() or following in ';:,.!?'):
+            return False
+        return True
+
+    def words(self, sentences: list[str]) -> list[list[str]]:
+        """Lower-cased word tokens of each sentence; the whole document is scanned at once."""
+        if any('\n' in sentence for sentence in sentences):
+            return [_WORD.findall(_SPLIT_POINTS.sub(' ', s.lower())) for s in sentences]
+        text = _SPLIT_POINTS.sub(' ', '\n'.join(sentences).lower())
+        return [_WORD.findall(sentence) for sentence in text.split('\n')]
+
+
+TOKENIZERS = {backend.name: backend for backend in (NltkTokenizer, RegexTokenizer)}
+
+
+def get_tokenizer(name=None):
+    """The backend called ``name``, or the TOKENIZER setting; NLTK when unknown."""
+    name = (name or os.getenv('TOKENIZER') or 'nltk').strip().lower()
+    if name not in TOKENIZERS:
+        logger.warning(f"Unknown tokenizer {name!r}; using nltk")
+        name = 'nltk'
+    return TOKENIZERS[name]()
@@ -0,0 +1,71 @@
+"""
+Upload spooling
+Uploads larger than SPOOL_MEMORY_BYTES are written to a named temporary file while the request body
+is parsed; the summarizer then reads the PDF from that file (hashed in chunks, parsed through a
+memory map) instead of copying the whole upload into a bytes object
+"""
+import io
+import os
+import shutil
+import tempfile
+
+from flask import Request
+
+SPOOL_MEMORY_BYTES = 500 * 1024 # smaller request bodies stay in memory, as werkzeug does by default
+
+
+def spool_dir():
+    """Directory for spooled uploads (UPLOAD_SPOOL_DIR, else the system temp directory)."""
+    return os.getenv('UPLOAD_SPOOL_DIR') or None
+
+
+class SpoolingRequest(Request):
+    """Flask request whose large file uploads are spooled to named temporary files."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None,
+                         content_length=None):
+        if total_content_length is not None and total_content_length <= SPOOL_MEMORY_BYTES:
+            return io.BytesIO()
+        # removed when werkzeug closes the upload at the end of the request
+        return tempfile.NamedTemporaryFile('wb+', dir=spool_dir(), prefix='upload-',
+                                           suffix='.pdf')
+
+
+def upload_source(file):
+    """
+    The PDF of an uploaded FileStorage as the extraction functions take it: the path of its
+    spool file, or the bytes of a small upload kept in memory.
+    """
+    stream = file.stream
+    path = getattr(stream, 'name', None)
+    if isinstance(path, str) and os.path.isfile(path):
+        stream.flush()
+        return path
+    stream.seek(0)
+    return stream.read()
+
+
+def keep_upload(source):
+    """
+    An upload that outlives the request, for background jobs: bytes as they are, a spool file
+    copied (in the kernel, not through memory) to a new file the caller removes with
+    ``discard_upload``.
+    """
+    if not isinstance(source, str):
+        return source
+    fd, path = tempfile.mkstemp(dir=spool_dir(), prefix='job-', suffix='.pdf')
+    os.close(fd)
+    try:
+        shutil.copyfile(source, path)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def discard_upload(source):
+    if isinstance(source, str):
+        try:
+            os.unlink(source)
+        except FileNotFoundError:
+            pass
@@ -10,9 +10,49 @@ export interface SummaryStats {
   compression_ratio: number;
 }
 
+export type PageSampling = "first" | "even";
+export type LLMPrefilter = "none" | "tfidf" | "textrank";
+
 export interface SummaryRequest {
   algorithm: Algorithm;
   num_sentences: number;
+  max_pages?: number;
+  max_chars?: number;
+  page_sampling?: PageSampling;
+  llm_prefilter?: LLMPrefilter;
+  llm_token_budget?: number;
+  sections?: boolean;
+  section_budget?: number;
+  timings?: boolean;
+  stream?: boolean;
+}
+
+export interface LLMStats {
+  mode: "single" | "map_reduce";
+  chunks: number[];
+  failed_chunks: number;
+  timings: Record<string, number>;
+  prefilter?: LLMPrefilter;
+  sentences_sent?: number;
+  input_tokens?: number;
+  full_tokens?: number;
+}
+
+export type SummaryStreamEvent =
+  | { event: "started"; filename: string; algorithm: Algorithm }
+  | { event: "progress"; stage: "extracting" | "summarizing"; fraction: number }
+  | { event: "token"; text: string }
+  | ({ event: "result" } & SummaryResponse)
+  | { event: "error"; error: string; status?: number; retry_after?: number };
+
+export interface SectionSummary {
+  title: string;
+  start_page: number;
+  end_page: number;
+  summary: string;
+  sentences: number;
+  original_sentences: number;
+  failed: boolean;
 }
 
 export interface SummaryResponse {
@@ -20,11 +60,83 @@ export interface SummaryResponse {
   filename: string;
   summary: string;
   algorithm_used: string;
+  cached?: boolean;
   statistics: SummaryStats;
   parameters: {
     algorithm: string;
     num_sentences: number;
+    max_pages?: number | null;
+    max_chars?: number | null;
+    page_sampling?: PageSampling;
+    llm_prefilter?: LLMPrefilter;
+    llm_token_budget?: number | null;
+    sections?: boolean;
+    section_budget?: number | null;
+  };
+  llm?: LLMStats;
+  sections?: SectionSummary[];
+  timings?: Record<string, number>;
+}
+
+export interface SentenceRankingResponse {
+  success: boolean;
+  filename: string;
+  algorithm_used: string;
+  cached: boolean;
+  sentences: string[];
+  offsets: [number, number][];
+  ranking: number[];
+  statistics: {
+    original_length: number;
+    original_word_count: number;
+    original_sentences: number;
   };
+  parameters: {
+    algorithm: Exclude<Algorithm, "llm">;
+    max_pages: number | null;
+    max_chars: number | null;
+    page_sampling: PageSampling;
+  };
+  timings?: Record<string, number>;
+}
+
+export interface CompareRequest
+  extends Omit<SummaryRequest, "algorithm" | "sections" | "section_budget"> {
+  algorithms?: Algorithm[];
+}
+
+export interface CompareItemError {
+  success: false;
+  algorithm: Algorithm;
+  error: string;
+  seconds: number;
+}
+
+export type CompareItem = (SummaryResponse & { seconds: number }) | CompareItemError;
+
+export interface CompareResponse {
+  success: boolean;
+  filename: string;
+  algorithms: Algorithm[];
+  results: CompareItem[];
+  seconds: number;
+  timings?: Record<string, number>;
+}
+
+export interface BatchItemError {
+  success: false;
+  filename: string;
+  error: string;
+}
+
+export type BatchItem = SummaryResponse | BatchItemError;
+
+export interface BatchSummaryResponse {
+  success: boolean;
+  count: number;
+  succeeded: number;
+  failed: number;
+  results: BatchItem[];
 }
 
 export interface AlgorithmInfo {